@@ -1,25 +1,37 @@
 import os
+import hmac
 import logging
 from pathlib import Path
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, send_file, jsonify
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
+import time
 import uuid
 from datetime import datetime
 
 # Import our custom modules
-from src import PDFExtractor, MCQParser, QuestionClassifier, DataExporter
+from src import PDFExtractor, TextExtractor, MCQParser, QuestionClassifier, DataExporter
+from src.pdf_extractor import parse_page_range
+from src.layout import WordBoxCache
+from src.dedup import DuplicateIndex
+from src.artifacts import ArtifactStore
+from src.refine import PageRefiner
+from src.downloads import ExportDownloads
+from src.upload_store import UploadStore, UploadError, hash_file
+from src.result_cache import ResultCache
+from src.retention import RetentionManager
+from src.admission import AdmissionController, AdmissionRejected
+from src.log_queue import QueueLogging
 from config import Config
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('mcq_extractor.log'),
-        logging.StreamHandler()
-    ]
+# Configure logging: records are queued, and written and rotated by a background thread
+queue_logging = QueueLogging(
+    log_file=Config.LOG_FILE or None,
+    level=Config.LOG_LEVEL,
+    max_bytes=Config.LOG_MAX_BYTES,
+    backup_count=Config.LOG_BACKUP_COUNT
 )
+queue_logging.install()
 logger = logging.getLogger(__name__)
 
 def create_app():
@@ -38,32 +50,152 @@ def create_app():
 app = create_app()
 
 # Initialize components
+word_cache = WordBoxCache(
+    cache_folder=app.config['WORD_CACHE_FOLDER'],
+    max_size_bytes=app.config['WORD_CACHE_MAX_BYTES']
+)
+
 pdf_extractor = PDFExtractor(
     ocr_languages=app.config['OCR_LANGUAGES'],
-    dpi=app.config['DPI']
+    dpi=app.config['DPI'],
+    ocr_backend=app.config['OCR_BACKEND'],
+    adaptive_ocr=app.config['OCR_ADAPTIVE'],
+    use_mmap=app.config['PDF_USE_MMAP'],
+    layout_mode=app.config['PDF_LAYOUT_MODE'],
+    word_cache=word_cache
+)
+
+text_extractor = TextExtractor(
+    encoding=app.config['TEXT_ENCODING'],
+    max_text_bytes=app.config['MAX_TEXT_SIZE']
 )
 
 mcq_parser = MCQParser(
     min_options=app.config['MIN_OPTIONS'],
-    max_options=app.config['MAX_OPTIONS']
+    max_options=app.config['MAX_OPTIONS'],
+    workers=app.config['PARSER_WORKERS'],
+    parallel_min_blocks=app.config['PARSER_PARALLEL_MIN_BLOCKS'],
+    chunk_blocks=app.config['PARSER_CHUNK_BLOCKS'],
+    min_confidence=app.config['PARSE_MIN_CONFIDENCE'],
+    block_time_budget=app.config['PARSE_BLOCK_TIME_BUDGET'],
+    document_time_budget=app.config['PARSE_DOCUMENT_TIME_BUDGET'],
+    max_regex_block_chars=app.config['PARSE_MAX_REGEX_BLOCK_CHARS']
+)
+
+page_refiner = PageRefiner(
+    pdf_extractor=pdf_extractor,
+    parser=mcq_parser,
+    confidence_threshold=app.config['REOCR_CONFIDENCE'],
+    min_page_chars=app.config['REOCR_MIN_PAGE_CHARS'],
+    max_pages=app.config['REOCR_MAX_PAGES'],
+    attempts=app.config['REOCR_ATTEMPTS']
+) if app.config['REOCR_ENABLED'] else None
+
+artifact_store = ArtifactStore(
+    artifact_folder=app.config['ARTIFACT_FOLDER'],
+    max_size_bytes=app.config['ARTIFACT_MAX_BYTES']
 )
 
 # Initialize classifier with keywords file
 keywords_path = Path(app.config['UPLOAD_FOLDER']).parent / 'data' / 'keywords.json'
 question_classifier = QuestionClassifier(
     keywords_path=keywords_path,
-    confidence_threshold=app.config['CONFIDENCE_THRESHOLD']
+    confidence_threshold=app.config['CONFIDENCE_THRESHOLD'],
+    cache_size=app.config['CLASSIFICATION_CACHE_SIZE'],
+    cache_file=app.config['CLASSIFICATION_CACHE_FILE'] if app.config['CLASSIFICATION_CACHE_PERSIST'] else None,
+    backend=app.config['CLASSIFIER_BACKEND'],
+    model_path=app.config['CLASSIFIER_MODEL_PATH']
 )
 
+duplicate_index = DuplicateIndex(
+    index_folder=app.config['DEDUP_INDEX_FOLDER'],
+    threshold=app.config['DEDUP_THRESHOLD'],
+    max_documents=app.config['DEDUP_MAX_DOCUMENTS'],
+    max_age=app.config['DEDUP_MAX_AGE']
+) if app.config['DEDUP_MODE'] != 'off' else None
+
 data_exporter = DataExporter(
     json_indent=app.config['JSON_INDENT'],
     csv_encoding=app.config['CSV_ENCODING']
 )
 
+upload_store = UploadStore(
+    upload_folder=app.config['UPLOAD_FOLDER'],
+    max_upload_size=app.config['MAX_UPLOAD_SIZE'],
+    session_ttl=app.config['UPLOAD_SESSION_TTL']
+)
+
+retention_manager = RetentionManager(
+    output_folder=app.config['OUTPUT_FOLDER'],
+    max_age_seconds=app.config['OUTPUT_MAX_AGE'],
+    max_total_bytes=app.config['OUTPUT_MAX_BYTES'],
+    sweep_interval=app.config['OUTPUT_SWEEP_INTERVAL'],
+    extra_sweeps=[upload_store.expire_sessions] + ([duplicate_index.evict] if duplicate_index else [])
+)
+
+export_downloads = ExportDownloads(
+    min_compress_size=app.config['DOWNLOAD_MIN_COMPRESS_SIZE'],
+    brotli_quality=app.config['DOWNLOAD_BROTLI_QUALITY']
+)
+
+def remove_export(path):
+    """Delete an export file together with its precompressed variants."""
+    for file_path in [path, *export_downloads.variant_paths(path)]:
+        retention_manager.remove(file_path)
+
+admission_controller = AdmissionController(
+    # Each serving process admits on its own, so each gets its share of the container's budget
+    max_cost=app.config['ADMISSION_MAX_COST'] / app.config['ADMISSION_PROCESSES'],
+    max_queue_depth=app.config['ADMISSION_MAX_QUEUE'],
+    queue_timeout=app.config['ADMISSION_QUEUE_TIMEOUT']
+)
+
+result_cache = ResultCache(
+    cache_folder=app.config['RESULT_CACHE_FOLDER'],
+    output_folder=app.config['OUTPUT_FOLDER'],
+    ttl_seconds=app.config['RESULT_CACHE_TTL'],
+    max_size_bytes=app.config['RESULT_CACHE_MAX_BYTES'],
+    file_remover=remove_export
+)
+
+def start_background_tasks():
+    """
+    Start this process's background threads (output sweeper, keyword watcher).
+    
+    Threads do not survive fork, so a server that preloads the app calls this
+    in each worker after forking (see gunicorn.conf.py).
+    """
+    retention_manager.start()
+    start_keyword_watcher()
+
+def start_keyword_watcher():
+    """
+    Start only the keyword watcher, for processes that classify but serve no requests.
+    
+    The asgi pool processes run this instead of start_background_tasks: sweeping
+    outputs, upload sessions and the duplicate index once, in the event-loop
+    process, is enough.
+    """
+    if app.config['KEYWORDS_RELOAD_INTERVAL']:
+        question_classifier.start_watching(keywords_path, interval=app.config['KEYWORDS_RELOAD_INTERVAL'])
+
+if not app.config['DEFER_BACKGROUND_TASKS']:
+    start_background_tasks()
+
+def file_extension(filename):
+    """Lowercase extension of a filename; gzip'd text keeps both suffixes ('txt.gz')."""
+    suffixes = [suffix.lower() for suffix in Path(filename).suffixes]
+    if suffixes[-2:] == ['.txt', '.gz']:
+        return 'txt.gz'
+    return suffixes[-1].lstrip('.') if suffixes else ''
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    return file_extension(filename) in app.config['ALLOWED_EXTENSIONS']
+
+def is_text_file(path):
+    """Check if an uploaded file is a pre-extracted text dump."""
+    return file_extension(path.name) in app.config['TEXT_EXTENSIONS']
 
 @app.route('/')
 def index():
@@ -88,7 +220,7 @@ def upload():
         
         # Validate file
         if not file or not allowed_file(file.filename):
-            flash('Please upload a valid PDF file', 'error')
+            flash('Please upload a valid PDF or text file', 'error')
             return redirect(url_for('index'))
         
         # Generate unique filename
@@ -96,25 +228,19 @@ def upload():
         unique_id = str(uuid.uuid4())[:8]
         filename = f"{unique_id}_{original_filename}"
         
-        # Save uploaded file
-        upload_path = app.config['UPLOAD_FOLDER'] / filename
-        file.save(upload_path)
+        # Copy the upload (spooled by Werkzeug, at most MAX_CONTENT_LENGTH) into place,
+        # hashing it on the way; larger files arrive through the chunked upload API
+        stored = upload_store.save_stream(file.stream, filename)
         
         logger.info(f"File uploaded: {filename}")
         
         # Get processing options
         use_ocr = request.form.get('use_ocr') == 'on'
         auto_classify = request.form.get('auto_classify') == 'on'
+        page_range = request.form.get('page_range', '').strip() or None
         
-        # Process the PDF
-        results = process_pdf(upload_path, use_ocr, auto_classify, unique_id)
-        
-        if results['success']:
-            logger.info(f"Successfully processed {filename}")
-            return render_template('results.html', **results['data'])
-        else:
-            flash(f"Error processing PDF: {results['error']}", 'error')
-            return redirect(url_for('index'))
+        # Process the PDF or text dump
+        return render_processing_results(stored, use_ocr, auto_classify, unique_id, page_range)
             
     except RequestEntityTooLarge:
         flash('File too large. Maximum size is 16MB.', 'error')
@@ -124,85 +250,554 @@ def upload():
         flash('An unexpected error occurred. Please try again.', 'error')
         return redirect(url_for('index'))
 
-def process_pdf(pdf_path, use_ocr=True, auto_classify=True, session_id=None):
-    """Process PDF file and extract MCQs."""
+@app.route('/api/uploads', methods=['POST'])
+def create_chunked_upload():
+    """Start a resumable chunked upload for files larger than a single request."""
+    data = request.get_json(silent=True) or {}
+    original_filename = secure_filename(data.get('filename', ''))
+    
+    if not original_filename or not allowed_file(original_filename):
+        return jsonify({'error': 'Please upload a valid PDF or text file'}), 400
+    
     try:
-        # Extract text from PDF
-        logger.info(f"Extracting text from {pdf_path}")
-        text_content = pdf_extractor.extract_text(pdf_path)
+        session = upload_store.create_session(original_filename, int(data.get('size', 0)))
+    except (TypeError, ValueError) as e:
+        status_code = e.status_code if isinstance(e, UploadError) else 400
+        return jsonify({'error': str(e)}), status_code
+    
+    return jsonify({**session, 'chunk_size': app.config['UPLOAD_CHUNK_SIZE']}), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Report how many bytes of a chunked upload were received, for resuming."""
+    try:
+        return jsonify(upload_store.get_session(upload_id))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def append_chunked_upload(upload_id):
+    """Append one chunk, streamed from the raw request body straight to disk."""
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return jsonify({'error': 'Missing or invalid Upload-Offset header'}), 400
+    
+    try:
+        session = upload_store.append_chunk(upload_id, offset, request.stream)
+        return jsonify(session)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+@app.route('/upload/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Finalize a chunked upload and process it like a regular upload."""
+    try:
+        session = upload_store.get_session(upload_id)
+        unique_id = str(uuid.uuid4())[:8]
+        filename = f"{unique_id}_{session['filename']}"
+        
+        stored = upload_store.complete_session(upload_id, filename)
+        logger.info(f"File uploaded in chunks: {filename}")
+        
+        use_ocr = request.form.get('use_ocr') == 'on'
+        auto_classify = request.form.get('auto_classify') == 'on'
+        page_range = request.form.get('page_range', '').strip() or None
         
-        if not text_content.strip():
+        return render_processing_results(stored, use_ocr, auto_classify, unique_id, page_range)
+    
+    except UploadError as e:
+        flash(f"Upload failed: {str(e)}", 'error')
+        return redirect(url_for('index'))
+    except Exception as e:
+        logger.error(f"Error completing chunked upload {upload_id}: {str(e)}")
+        flash('An unexpected error occurred. Please try again.', 'error')
+        return redirect(url_for('index'))
+
+@app.route('/api/preview', methods=['POST'])
+def preview():
+    """Extract and parse a sample of pages to estimate yield, OCR need and processing time."""
+    file = request.files.get('file')
+    if not file or not file.filename or not allowed_file(file.filename):
+        return jsonify({'error': 'Please upload a valid PDF or text file'}), 400
+    
+    filename = f"preview_{str(uuid.uuid4())[:8]}_{secure_filename(file.filename)}"
+    if is_text_file(Path(filename)):
+        return jsonify({'error': 'Preview is only available for PDF files'}), 400
+    
+    stored = upload_store.save_stream(file.stream, filename)
+    try:
+        use_ocr = request.form.get('use_ocr') == 'on'
+        page_range = request.form.get('page_range', '').strip() or None
+        results = preview_pdf(stored.path, use_ocr, page_range)
+    finally:
+        remove_upload(stored.path)
+    
+    if results['success']:
+        return jsonify(results['data'])
+    elif 'retry_after' in results:
+        return jsonify({'error': results['error']}), 429, {'Retry-After': str(results['retry_after'])}
+    else:
+        return jsonify({'error': results['error']}), 400
+
+@app.route('/reprocess/<document_hash>', methods=['POST'])
+def reprocess(document_hash):
+    """Re-run parsing, classification and export over a processed document's stored artifacts."""
+    use_ocr = request.form.get('use_ocr') == 'on'
+    auto_classify = request.form.get('auto_classify') == 'on'
+    page_range = request.form.get('page_range', '').strip() or None
+    
+    results = reprocess_document(document_hash, use_ocr, auto_classify, page_range)
+    
+    if results['success']:
+        return render_template('results.html', **results['data'])
+    elif 'retry_after' in results:
+        flash(results['error'], 'error')
+        return render_template('upload.html'), 429, {'Retry-After': str(results['retry_after'])}
+    else:
+        flash(f"Error processing file: {results['error']}", 'error')
+        return redirect(url_for('index'))
+
+def render_processing_results(stored, use_ocr, auto_classify, session_id, page_range=None):
+    """Process a stored upload and render the results page."""
+    results = process_pdf(stored.path, use_ocr, auto_classify, session_id,
+                          document_hash=stored.sha256, page_range=page_range)
+    
+    if results['success']:
+        logger.info(f"Successfully processed {stored.path.name}")
+        return render_template('results.html', **results['data'])
+    elif 'retry_after' in results:
+        flash(results['error'], 'error')
+        return render_template('upload.html'), 429, {'Retry-After': str(results['retry_after'])}
+    else:
+        flash(f"Error processing file: {results['error']}", 'error')
+        return redirect(url_for('index'))
+
+def pipeline_settings(use_ocr, auto_classify, pages=None):
+    """Settings that change the pipeline output, used to key the result cache."""
+    return {
+        'pages': pages,
+        'layout_mode': pdf_extractor.layout_mode,
+        'dedup_mode': app.config['DEDUP_MODE'],
+        'min_options': mcq_parser.min_options,
+        'max_options': mcq_parser.max_options,
+        'min_confidence': mcq_parser.min_confidence,
+        'classifier_version': question_classifier.version if auto_classify else None,
+        'confidence_threshold': question_classifier.confidence_threshold,
+        'use_ocr': use_ocr,
+        'auto_classify': auto_classify
+    }
+
+def extraction_settings(path, use_ocr, pages=None):
+    """Settings that change the extracted text, used to key stored artifacts."""
+    if is_text_file(path):
+        return {'source': 'text', 'encoding': text_extractor.encoding}
+    
+    return {
+        'source': 'pdf',
+        'pages': pages,
+        'page_break': pdf_extractor.PAGE_BREAK,
+        'layout_mode': pdf_extractor.layout_mode,
+        'use_ocr': use_ocr,
+        'dpi': pdf_extractor.dpi,
+        'ocr_languages': pdf_extractor.ocr_languages,
+        'refine': page_refiner.settings() if use_ocr and page_refiner is not None else None
+    }
+
+def cache_results(document_hash, settings, data):
+    """Cache results under the keyword set or model version their classifications were made with."""
+    if settings['auto_classify']:
+        if data['classifier_version'] is None:
+            # Keywords were swapped mid-run; the results match neither version
+            return
+        settings = {**settings, 'classifier_version': data['classifier_version']}
+    
+    result_cache.put(
+        result_cache.make_key(document_hash, **settings),
+        data,
+        [data['json_file'], data['csv_file'], data['summary_file']]
+    )
+
+def remove_upload(path):
+    """Delete an uploaded file once it has been processed."""
+    try:
+        path.unlink()
+    except Exception as e:
+        logger.warning(f"Could not remove uploaded file: {e}")
+
+def resolve_pages(path, page_range):
+    """Turn a page range string into page numbers; None selects every page."""
+    if not page_range or is_text_file(path):
+        return None
+    
+    return parse_page_range(page_range, pdf_extractor.get_pdf_info(path)['num_pages'])
+
+def no_progress(stage):
+    """Default progress callback of the pipeline: stage changes are not reported."""
+
+def process_pdf(pdf_path, use_ocr=True, auto_classify=True, session_id=None, document_hash=None,
+                page_range=None, progress=no_progress):
+    """
+    Process a PDF file (or pre-extracted text dump) and extract MCQs.
+    
+    progress is called with the name of each pipeline stage as it starts
+    ('queued', 'extracting', 'parsing', ...), e.g. to stream job progress.
+    """
+    try:
+        try:
+            pages = resolve_pages(pdf_path, page_range)
+        except ValueError as e:
+            remove_upload(pdf_path)
             return {
                 'success': False,
-                'error': 'No text could be extracted from the PDF. The file might be empty or contain only images.'
+                'error': str(e)
             }
         
-        # Parse MCQs
-        logger.info("Parsing MCQ questions")
-        mcqs = mcq_parser.parse_mcqs(text_content)
+        # Identical documents processed with identical settings reuse earlier exports
+        document_hash = document_hash or hash_file(pdf_path)
+        settings = pipeline_settings(use_ocr, auto_classify, pages)
+        cached = result_cache.get(result_cache.make_key(document_hash, **settings))
         
-        if not mcqs:
+        if cached is not None:
+            logger.info(f"Result cache hit for {pdf_path.name}")
+            remove_upload(pdf_path)
+            return {
+                'success': True,
+                'data': {**cached, 'filename': pdf_path.name}
+            }
+        
+        # Budget concurrent runs by estimated cost so OCR bursts queue instead of exhausting memory
+        progress('queued')
+        try:
+            ticket = admission_controller.acquire(estimate_processing_cost(pdf_path, use_ocr, pages))
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected {pdf_path.name}: {str(e)}")
+            remove_upload(pdf_path)
             return {
                 'success': False,
-                'error': 'No multiple-choice questions found in the PDF. Please check the content format.'
+                'error': 'The server is busy processing other files. Please try again shortly.',
+                'retry_after': e.retry_after
             }
         
-        # Classify questions if enabled
-        if auto_classify:
-            logger.info("Classifying questions")
-            for mcq in mcqs:
-                options_text = ' '.join([opt.text for opt in mcq.options])
-                classification = question_classifier.classify_question(
-                    mcq.question_text, options_text
-                )
-                mcq.subject = classification.subject
-                mcq.topic = classification.topic
-                # Update confidence to include classification confidence
-                mcq.confidence = (mcq.confidence + classification.confidence) / 2
-        
-        # Generate export files
-        session_id = session_id or str(uuid.uuid4())[:8]
-        base_filename = f"mcq_export_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        base_path = app.config['OUTPUT_FOLDER'] / base_filename
-        
-        export_files = data_exporter.export_multiple_formats(
-            mcqs, base_path, ['json', 'csv', 'summary']
+        try:
+            results = run_pipeline(pdf_path, use_ocr, auto_classify, session_id, pages, document_hash,
+                                   progress)
+        finally:
+            admission_controller.release(ticket)
+        
+        if results['success']:
+            data = results['data']
+            cache_results(document_hash, settings, data)
+            
+            # Clean up uploaded file
+            remove_upload(pdf_path)
+        
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error processing PDF: {str(e)}")
+        return {
+            'success': False,
+            'error': f'Processing failed: {str(e)}'
+        }
+
+def estimate_processing_cost(path, use_ocr, pages=None):
+    """Estimate the cost of processing a file for admission control."""
+    if is_text_file(path):
+        # Decompressed size, so .txt.gz uploads are not underestimated by their compression ratio
+        return admission_controller.estimate_cost(text_bytes=text_extractor.text_size(path))
+    
+    num_pages = len(pages) if pages else pdf_extractor.get_pdf_info(path)['num_pages']
+    cost = admission_controller.estimate_cost(
+        num_pages=num_pages,
+        ocr_dpi=pdf_extractor.dpi if use_ocr else None
+    )
+    
+    # Re-OCR of weak pages, if every attempt retries the most pages it may
+    if use_ocr and page_refiner is not None:
+        for dpi, retried in page_refiner.worst_case_pages(num_pages):
+            cost += admission_controller.estimate_cost(num_pages=retried, ocr_dpi=dpi)
+    return cost
+
+def preview_pdf(pdf_path, use_ocr=True, page_range=None):
+    """Estimate question yield, OCR need and processing time from a sample of pages."""
+    try:
+        pages = resolve_pages(pdf_path, page_range)
+    except ValueError as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+    
+    # Budget the sample like a small job: a few text pages, or a couple of OCR'd ones
+    if use_ocr:
+        cost = admission_controller.estimate_cost(
+            num_pages=app.config['PREVIEW_OCR_SAMPLE_PAGES'], ocr_dpi=pdf_extractor.dpi
+        )
+    else:
+        cost = admission_controller.estimate_cost(num_pages=app.config['PREVIEW_SAMPLE_PAGES'])
+    
+    try:
+        ticket = admission_controller.acquire(cost)
+    except AdmissionRejected as e:
+        return {
+            'success': False,
+            'error': 'The server is busy processing other files. Please try again shortly.',
+            'retry_after': e.retry_after
+        }
+    
+    try:
+        sample = pdf_extractor.preview(
+            pdf_path,
+            sample_size=app.config['PREVIEW_SAMPLE_PAGES'],
+            use_ocr=use_ocr,
+            ocr_sample_size=app.config['PREVIEW_OCR_SAMPLE_PAGES'],
+            pages=pages
         )
         
-        # Generate statistics
-        stats = generate_statistics(mcqs)
-        
-        # Prepare results data
-        results_data = {
-            'filename': pdf_path.name,
-            'total_questions': len(mcqs),
-            'mcqs': [mcq_to_dict(mcq) for mcq in mcqs],
-            'json_file': export_files['json'].name,
-            'csv_file': export_files['csv'].name,
-            'summary_file': export_files['summary'].name,
-            **stats
+        started = time.perf_counter()
+        mcqs = mcq_parser.parse_mcqs(sample['text'], sample['sampled_pages'])
+        parse_seconds = time.perf_counter() - started
+    except Exception as e:
+        logger.error(f"Error previewing {pdf_path.name}: {str(e)}")
+        return {
+            'success': False,
+            'error': f'Preview failed: {str(e)}'
         }
+    finally:
+        admission_controller.release(ticket)
+    
+    # Scale the sample up to the full page selection
+    scale = sample['selected_pages'] / max(len(sample['sampled_pages']), 1)
+    
+    return {
+        'success': True,
+        'data': {
+            'num_pages': sample['num_pages'],
+            'selected_pages': sample['selected_pages'],
+            'sampled_pages': sample['sampled_pages'],
+            'needs_ocr': sample['needs_ocr'],
+            'questions_in_sample': len(mcqs),
+            'estimated_questions': round(len(mcqs) * scale),
+            'estimated_seconds': round(sample['estimated_extraction_seconds'] + parse_seconds * scale, 1),
+            'sample_questions': [mcq_to_dict(mcq) for mcq in mcqs[:3]]
+        }
+    }
+
+def reprocess_document(document_hash, use_ocr=True, auto_classify=True, page_range=None):
+    """Re-run the stages after extraction over a document's stored artifacts, without the upload."""
+    try:
+        meta = artifact_store.get_meta(document_hash)
+        if meta is None:
+            return {
+                'success': False,
+                'error': 'This document has no stored artifacts. Please upload it again.'
+            }
+        
+        try:
+            pages = parse_page_range(page_range, meta['num_pages']) if page_range and meta['num_pages'] else None
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        
+        settings = pipeline_settings(use_ocr, auto_classify, pages)
+        cached = result_cache.get(result_cache.make_key(document_hash, **settings))
+        if cached is not None:
+            return {
+                'success': True,
+                'data': {**cached, 'filename': meta['filename']}
+            }
         
-        logger.info(f"Processing complete: {len(mcqs)} questions extracted")
+        key = artifact_store.make_key(**extraction_settings(Path(meta['filename']), use_ocr, pages))
+        raw = load_stored_parse(document_hash, key, pages)
+        if raw is None:
+            return {
+                'success': False,
+                'error': 'This document was not processed with these options. Please upload it again.'
+            }
+        
+        try:
+            ticket = admission_controller.acquire(admission_controller.estimate_cost())
+        except AdmissionRejected as e:
+            return {
+                'success': False,
+                'error': 'The server is busy processing other files. Please try again shortly.',
+                'retry_after': e.retry_after
+            }
         
-        # Clean up uploaded file
         try:
-            pdf_path.unlink()
-        except Exception as e:
-            logger.warning(f"Could not remove uploaded file: {e}")
+            results = run_downstream(raw, meta['filename'], auto_classify, None, document_hash)
+        finally:
+            admission_controller.release(ticket)
         
-        return {
-            'success': True,
-            'data': results_data
-        }
+        if results['success']:
+            data = results['data']
+            cache_results(document_hash, settings, data)
         
+        return results
+    
     except Exception as e:
-        logger.error(f"Error processing PDF: {str(e)}")
+        logger.error(f"Error reprocessing document {document_hash[:12]}: {str(e)}")
         return {
             'success': False,
             'error': f'Processing failed: {str(e)}'
         }
 
+def run_pipeline(pdf_path, use_ocr, auto_classify, session_id, pages=None, document_hash=None,
+                 progress=no_progress):
+    """Run extraction, parsing, classification and export for one file."""
+    raw = load_raw_parse(pdf_path, use_ocr, pages, document_hash, progress)
+    
+    if raw is None:
+        return {
+            'success': False,
+            'error': 'No text could be extracted from the file. The file might be empty or contain only images.'
+        }
+    
+    return run_downstream(raw, pdf_path.name, auto_classify, session_id, document_hash, progress)
+
+def load_raw_parse(pdf_path, use_ocr, pages=None, document_hash=None, progress=no_progress):
+    """Extract and split a file into parsed blocks, reusing stored artifacts; None if it has no text."""
+    key = artifact_store.make_key(**extraction_settings(pdf_path, use_ocr, pages))
+    
+    if document_hash:
+        raw = load_stored_parse(document_hash, key, pages)
+        if raw is not None:
+            logger.info(f"Reusing stored artifacts of {pdf_path.name}")
+            return raw
+    
+    # Text dumps skip PDF extraction entirely
+    progress('extracting')
+    if is_text_file(pdf_path):
+        logger.info(f"Loading pre-extracted text from {pdf_path}")
+        text_content = text_extractor.extract_text(pdf_path)
+        num_pages = None
+        ocr_pages = []
+    else:
+        logger.info(f"Extracting text from {pdf_path}")
+        extraction = pdf_extractor.extract(
+            pdf_path, use_ocr=use_ocr, pages=pages, document_hash=document_hash
+        )
+        text_content, num_pages, ocr_pages = extraction.text, extraction.num_pages, extraction.ocr_pages
+    
+    if not text_content.strip():
+        return None
+    
+    logger.info("Parsing MCQ questions")
+    progress('parsing')
+    raw = mcq_parser.parse_raw(text_content, pages)
+    
+    # Second pass: re-OCR only the OCR'd pages whose questions came out weak
+    if use_ocr and page_refiner is not None and ocr_pages:
+        progress('refining')
+        refined = page_refiner.refine(pdf_path, text_content, raw, pages, set(ocr_pages))
+        if refined is not None:
+            text_content, raw = refined
+    
+    if document_hash:
+        artifact_store.put_text(
+            document_hash, key, text_content, {'filename': pdf_path.name, 'num_pages': num_pages}
+        )
+        artifact_store.put_parse(document_hash, key, raw, MCQParser.RAW_PARSE_VERSION)
+        artifact_store.evict()
+    
+    return raw
+
+def load_stored_parse(document_hash, key, pages=None):
+    """Load stored parsed blocks, re-splitting the stored text if the parser format changed."""
+    raw = artifact_store.get_parse(document_hash, key, MCQParser.RAW_PARSE_VERSION)
+    if raw is not None:
+        return raw
+    
+    text_content = artifact_store.get_text(document_hash, key)
+    if text_content is None:
+        return None
+    
+    logger.info("Parsing MCQ questions from stored text")
+    raw = mcq_parser.parse_raw(text_content, pages)
+    artifact_store.put_parse(document_hash, key, raw, MCQParser.RAW_PARSE_VERSION)
+    return raw
+
+def run_downstream(raw, filename, auto_classify, session_id, document_hash=None, progress=no_progress):
+    """Run validation, duplicate detection, classification and export over parsed blocks."""
+    progress('validating')
+    mcqs = mcq_parser.finalize(raw)
+    
+    if not mcqs:
+        return {
+            'success': False,
+            'error': 'No multiple-choice questions found in the file. Please check the content format.'
+        }
+    
+    # Flag or drop questions already seen earlier in this or another document
+    if duplicate_index is not None and document_hash:
+        progress('deduplicating')
+        duplicates = duplicate_index.find_duplicates(document_hash, mcqs)
+        for mcq, duplicate_of in zip(mcqs, duplicates):
+            mcq.duplicate_of = duplicate_of
+        
+        if app.config['DEDUP_MODE'] == 'drop':
+            mcqs = [mcq for mcq in mcqs if not mcq.duplicate_of]
+            if not mcqs:
+                return {
+                    'success': False,
+                    'error': 'All questions in the file duplicate previously processed questions.'
+                }
+    
+    # Classify questions if enabled
+    classifier_versions = set()
+    if auto_classify:
+        logger.info("Classifying questions")
+        progress('classifying')
+        classifications = question_classifier.classify_batch(
+            [(mcq.question_text, ' '.join([opt.text for opt in mcq.options])) for mcq in mcqs]
+        )
+        for mcq, classification in zip(mcqs, classifications):
+            classifier_versions.add(classification.classifier_version)
+            mcq.subject = classification.subject
+            mcq.topic = classification.topic
+            # Update confidence to include classification confidence
+            mcq.confidence = (mcq.confidence + classification.confidence) / 2
+    
+    # Generate export files
+    progress('exporting')
+    session_id = session_id or str(uuid.uuid4())[:8]
+    base_filename = f"mcq_export_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    base_path = app.config['OUTPUT_FOLDER'] / base_filename
+    
+    export_files = data_exporter.export_multiple_formats(
+        mcqs, base_path, ['json', 'csv', 'summary']
+    )
+    # Compress once here rather than on every download
+    variants = export_downloads.precompress(export_files.values())
+    retention_manager.register([*export_files.values(), *variants])
+    
+    # Generate statistics
+    stats = generate_statistics(mcqs)
+    
+    # Prepare results data
+    results_data = {
+        'filename': filename,
+        'document_hash': document_hash,
+        'total_questions': len(mcqs),
+        'mcqs': [mcq_to_dict(mcq) for mcq in mcqs],
+        'json_file': export_files['json'].name,
+        'csv_file': export_files['csv'].name,
+        'summary_file': export_files['summary'].name,
+        'export_name': base_filename,
+        'classifier_version': classifier_versions.pop() if len(classifier_versions) == 1 else None,
+        **stats
+    }
+    
+    logger.info(f"Processing complete: {len(mcqs)} questions extracted")
+    
+    return {
+        'success': True,
+        'data': results_data
+    }
+
 def mcq_to_dict(mcq):
     """Convert MCQuestion object to dictionary for template rendering."""
     return {
@@ -213,7 +808,9 @@ def mcq_to_dict(mcq):
         'subject': mcq.subject,
         'topic': mcq.topic,
         'confidence': mcq.confidence,
-        'page_number': mcq.page_number
+        'page_number': mcq.page_number,
+        'question_number': mcq.question_number,
+        'duplicate_of': mcq.duplicate_of
     }
 
 def generate_statistics(mcqs):
@@ -223,6 +820,7 @@ def generate_statistics(mcqs):
             'subjects_count': 0,
             'avg_confidence': 0,
             'questions_with_answers': 0,
+            'duplicate_questions': 0,
             'subject_breakdown': {}
         }
     
@@ -245,6 +843,7 @@ def generate_statistics(mcqs):
         'subjects_count': len(subjects),
         'avg_confidence': round(avg_confidence, 1),
         'questions_with_answers': questions_with_answers,
+        'duplicate_questions': sum(1 for mcq in mcqs if mcq.duplicate_of),
         'subject_breakdown': dict(sorted(subject_counts.items(), key=lambda x: x[1], reverse=True))
     }
 
@@ -252,23 +851,105 @@ def generate_statistics(mcqs):
 def download(filename):
     """Download generated files."""
     try:
-        file_path = app.config['OUTPUT_FOLDER'] / filename
+        # Resolve through the retention index instead of probing the folder
+        file_path = retention_manager.lookup(filename)
         
-        if not file_path.exists():
+        if file_path is None:
             flash('File not found', 'error')
             return redirect(url_for('index'))
         
-        return send_file(
-            file_path,
+        # Precompressed variant if the client accepts one; each has its own content ETag
+        send_path, encoding, etag = export_downloads.select(file_path, request.headers.get('Accept-Encoding'))
+        
+        # Handles If-None-Match (304) and Range (206) against the representation sent
+        response = send_file(
+            send_path,
+            mimetype=export_downloads.mimetype(file_path),
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            conditional=True,
+            etag=etag,
+            last_modified=file_path.stat().st_mtime,
+            max_age=app.config['DOWNLOAD_MAX_AGE']
         )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
         
+    except FileNotFoundError:
+        # Evicted by another worker since it was indexed here
+        remove_export(app.config['OUTPUT_FOLDER'] / filename)
+        flash('File not found', 'error')
+        return redirect(url_for('index'))
     except Exception as e:
         logger.error(f"Error downloading file {filename}: {str(e)}")
         flash('Error downloading file', 'error')
         return redirect(url_for('index'))
 
+@app.route('/download/bundle/<export_name>')
+def download_bundle(export_name):
+    """Stream all formats of one export as a single zip archive."""
+    names = [f"{export_name}.json", f"{export_name}.csv", f"{export_name}_summary.json"]
+    paths = [path for path in map(retention_manager.lookup, names) if path is not None]
+    
+    if not paths:
+        flash('File not found', 'error')
+        return redirect(url_for('index'))
+    
+    try:
+        etag = export_downloads.bundle_etag(paths)
+    except FileNotFoundError:
+        flash('File not found', 'error')
+        return redirect(url_for('index'))
+    
+    # Built while it is sent, so its length is unknown and ranges are not offered
+    response = Response(export_downloads.iter_bundle(paths), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_name}.zip"'
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = app.config['DOWNLOAD_MAX_AGE']
+    return response.make_conditional(request)
+
+@app.route('/api/admin/keywords', methods=['POST'])
+def update_keywords():
+    """Reload classifier keywords from disk, or replace them with a posted keyword set."""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    previous_version = question_classifier.keywords_version
+    keywords_data = request.get_json(silent=True)
+    
+    if keywords_data is None:
+        question_classifier.reload_keywords(keywords_path)
+    else:
+        try:
+            # Saved to the keywords file, so other workers' watchers pick it up
+            question_classifier.replace_keywords(keywords_data, keywords_path)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'previous_version': previous_version,
+        'keywords_version': question_classifier.keywords_version,
+        'changed': question_classifier.keywords_version != previous_version
+    })
+
+def is_admin_request():
+    """Check the request's admin token; admin endpoints are disabled without ADMIN_TOKEN."""
+    token = app.config['ADMIN_TOKEN']
+    if not token:
+        return False
+    
+    supplied = request.headers.get('X-Admin-Token', '')
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        supplied = authorization[len('Bearer '):]
+    
+    return hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8'))
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint."""
@@ -286,11 +967,23 @@ def get_stats():
         
         return jsonify({
             'classifier': classifier_stats,
+            'result_cache': result_cache.get_stats(),
+            'word_cache': word_cache.get_stats(),
+            'artifacts': artifact_store.get_stats(),
+            'page_refiner': page_refiner.get_stats() if page_refiner else None,
+            'downloads': export_downloads.get_stats(),
+            'duplicate_index': duplicate_index.get_stats() if duplicate_index else None,
+            'outputs': retention_manager.get_stats(),
+            'admission': admission_controller.get_stats(),
             'supported_formats': list(app.config['ALLOWED_EXTENSIONS']),
             'max_file_size': app.config['MAX_CONTENT_LENGTH'],
+            'max_chunked_upload_size': app.config['MAX_UPLOAD_SIZE'],
             'features': {
                 'pdf_extraction': True,
+                'text_input': True,
                 'ocr_fallback': True,
+                'ocr_backend': pdf_extractor.ocr.name,
+                'layout_mode': pdf_extractor.layout_mode,
                 'auto_classification': True,
                 'export_formats': ['json', 'csv', 'summary']
             }
@@ -0,0 +1,207 @@
+"""
+Asynchronous serving mode for the MCQ extractor.
+
+Request I/O (uploads, downloads, progress streams) is handled on an event
+loop, while extraction, parsing and classification run in a pool of
+processes, so one instance can hold thousands of idle connections. The job
+endpoints are served natively; every other route is the Flask app, mounted
+unchanged.
+
+Usage:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+Endpoints:
+    POST /api/jobs                  Upload a file (multipart 'file' field, or the raw body
+                                    with a 'filename' query parameter) and queue it
+    GET  /api/jobs/<job_id>         Job status, and its results once done
+    GET  /api/jobs/<job_id>/events  Progress as server-sent events
+"""
+
+import os
+import json
+import uuid
+import logging
+import multiprocessing
+from contextlib import asynccontextmanager
+
+# Background threads are started by the lifespan handler; pool processes only watch keywords
+os.environ.setdefault('DEFER_BACKGROUND_TASKS', 'true')
+
+# Pool processes run jobs and this process runs the Flask routes; all of them
+# admit jobs on their own and split the container's admission budget. Read
+# before config is imported, which fixes ADMISSION_PROCESSES
+JOB_WORKERS = int(os.environ.get('ASYNC_JOB_WORKERS') or 0) or multiprocessing.cpu_count()
+os.environ.setdefault('ADMISSION_PROCESSES', str(JOB_WORKERS + 1))
+
+from a2wsgi import WSGIMiddleware  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse  # noqa: E402
+from starlette.routing import Mount, Route  # noqa: E402
+from werkzeug.utils import secure_filename  # noqa: E402
+
+import app as pipeline  # noqa: E402
+from src.jobs import JobManager  # noqa: E402
+from src.admission import AdmissionRejected  # noqa: E402
+from src.upload_store import UploadError  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+config = pipeline.app.config
+
+job_manager = JobManager(
+    workers=JOB_WORKERS,
+    max_pending=config['ASYNC_MAX_PENDING_JOBS'],
+    job_ttl=config['ASYNC_JOB_TTL'],
+    preload=['app'],
+    initializer=pipeline.start_keyword_watcher
+)
+
+def is_enabled(value):
+    """Interpret a form checkbox or query parameter."""
+    return (value or '').lower() in ('on', 'true', '1')
+
+async def create_job(request):
+    """Stream an upload to disk and queue it for processing."""
+    unique_id = str(uuid.uuid4())[:8]
+    
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        # Multipart bodies are spooled by the form parser, as posted by the upload form
+        options = await request.form()
+        file = options.get('file')
+        original_filename = secure_filename(getattr(file, 'filename', None) or '')
+        chunks = iter_upload(file) if original_filename else None
+    else:
+        # Raw bodies go straight to disk as they arrive
+        options = request.query_params
+        original_filename = secure_filename(options.get('filename', ''))
+        chunks = request.stream()
+    
+    if not original_filename or not pipeline.allowed_file(original_filename):
+        return JSONResponse({'error': 'Please upload a valid PDF or text file'}, status_code=400)
+    
+    try:
+        stored = await pipeline.upload_store.save_chunks(chunks, f"{unique_id}_{original_filename}")
+    except UploadError as e:
+        return JSONResponse({'error': str(e)}, status_code=e.status_code)
+    
+    try:
+        job = job_manager.submit(
+            pipeline.process_pdf, stored.path,
+            use_ocr=is_enabled(options.get('use_ocr')),
+            auto_classify=is_enabled(options.get('auto_classify')),
+            session_id=unique_id,
+            document_hash=stored.sha256,
+            page_range=(options.get('page_range') or '').strip() or None
+        )
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected {stored.path.name}: {str(e)}")
+        pipeline.remove_upload(stored.path)
+        return JSONResponse(
+            {'error': 'The server is busy processing other files. Please try again shortly.'},
+            status_code=429, headers={'Retry-After': str(e.retry_after)}
+        )
+    
+    logger.info(f"Queued {stored.path.name} as job {job.job_id}")
+    return JSONResponse({
+        **job.to_dict(),
+        'status_url': request.url_for('job_status', job_id=job.job_id).path,
+        'events_url': request.url_for('job_events', job_id=job.job_id).path
+    }, status_code=202)
+
+async def iter_upload(file, chunk_size=1024 * 1024):
+    """Read a spooled multipart upload in chunks."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+async def job_status(request):
+    """Report a job's status, and its results or error once it has finished."""
+    job = job_manager.get(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'error': 'Unknown job'}, status_code=404)
+    
+    payload = job.to_dict()
+    if job.status == 'failed':
+        payload['error'] = job.error
+    elif job.status == 'done':
+        results = job.result
+        if results['success']:
+            payload['data'] = results['data']
+        else:
+            # The pipeline ran but found nothing usable (or its worker was saturated)
+            payload['status'] = 'failed'
+            payload['error'] = results['error']
+    return JSONResponse(payload)
+
+async def job_events(request):
+    """Stream a job's progress as server-sent events until it finishes."""
+    job = job_manager.get(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'error': 'Unknown job'}, status_code=404)
+    
+    async def stream():
+        async for event in job_manager.events(job, keepalive=config['ASYNC_EVENTS_KEEPALIVE']):
+            if event is None:
+                # Comment line keeping proxies from closing an idle stream
+                yield ': keepalive\n\n'
+            else:
+                yield f"id: {event['seq']}\nevent: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(stream(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+async def download(request):
+    """Send an export file from the event loop instead of a WSGI thread."""
+    filename = request.path_params['filename']
+    file_path = pipeline.retention_manager.lookup(filename)
+    if file_path is None:
+        return JSONResponse({'error': 'File not found'}, status_code=404)
+    
+    try:
+        # Same representations and ETags as the Flask route; FileResponse handles Range
+        send_path, encoding, etag = pipeline.export_downloads.select(file_path, request.headers.get('accept-encoding'))
+        # Stat once here, so FileResponse does not find the file gone later and fail with a 500
+        stat_result = os.stat(send_path)
+    except FileNotFoundError:
+        # Evicted by another worker since it was indexed here
+        pipeline.remove_export(config['OUTPUT_FOLDER'] / filename)
+        return JSONResponse({'error': 'File not found'}, status_code=404)
+    
+    headers = {
+        'ETag': f'"{etag}"',
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': f"private, max-age={config['DOWNLOAD_MAX_AGE']}"
+    }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    
+    if_none_match = request.headers.get('if-none-match', '')
+    if headers['ETag'] in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        return Response(status_code=304, headers=headers)
+    
+    return FileResponse(send_path, filename=filename, headers=headers, stat_result=stat_result,
+                        media_type=pipeline.export_downloads.mimetype(file_path))
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the process pool and this process's background threads."""
+    pipeline.start_background_tasks()
+    job_manager.start()
+    try:
+        yield
+    finally:
+        job_manager.stop()
+
+app = Starlette(
+    routes=[
+        Route('/api/jobs', create_job, methods=['POST']),
+        Route('/api/jobs/{job_id}', job_status, methods=['GET']),
+        Route('/api/jobs/{job_id}/events', job_events, methods=['GET']),
+        Route('/download/{filename}', download, methods=['GET']),
+        # Everything else, including the HTML upload form, is served by the Flask app
+        Mount('/', WSGIMiddleware(pipeline.app))
+    ],
+    lifespan=lifespan
+)
\ No newline at end of file
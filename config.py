@@ -7,23 +7,103 @@ class Config:
     # Basic Flask configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+    DEFER_BACKGROUND_TASKS = os.environ.get('DEFER_BACKGROUND_TASKS', 'False').lower() == 'true'  # Set by gunicorn.conf.py
+    
+    # Logging configuration (handlers run in a background thread per process)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = os.environ.get('LOG_FILE', 'mcq_extractor.log')  # Empty logs to stderr only
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024))  # Rotate the log file at this size
+    LOG_BACKUP_COUNT = 5  # Rotated log files kept
     
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = Path(__file__).parent / 'uploads'
     OUTPUT_FOLDER = Path(__file__).parent / 'outputs'
-    ALLOWED_EXTENSIONS = {'pdf'}
+    ALLOWED_EXTENSIONS = {'pdf', 'txt', 'txt.gz'}
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Chunk size for resumable uploads (below MAX_CONTENT_LENGTH)
+    MAX_UPLOAD_SIZE = 512 * 1024 * 1024  # 512MB max size for chunked uploads
+    UPLOAD_SESSION_TTL = 24 * 3600  # Seconds without a chunk before an unfinished chunked upload is removed
+    TEXT_EXTENSIONS = {'txt', 'txt.gz'}  # Pre-extracted text, parsed without PDF processing (gzip only as .txt.gz)
+    MAX_TEXT_SIZE = MAX_UPLOAD_SIZE  # Largest decompressed size of a .txt.gz upload
     
     # PDF processing configuration
     OCR_LANGUAGES = 'eng'  # Language for OCR processing
     DPI = 300  # DPI for image conversion when using OCR
+    OCR_ADAPTIVE = os.environ.get('OCR_ADAPTIVE', 'True').lower() == 'true'  # OCR only text regions at adaptive DPI
+    OCR_BACKEND = os.environ.get('OCR_BACKEND', 'auto')  # 'tesserocr' (in-process), 'pytesseract' or 'auto'
+    PDF_USE_MMAP = os.environ.get('PDF_USE_MMAP', 'False').lower() == 'true'  # Parse PDFs from a memory map
+    PDF_LAYOUT_MODE = os.environ.get('PDF_LAYOUT_MODE', 'columns')  # 'columns' reads multi-column pages in order, 'plain'
+    TEXT_ENCODING = 'utf-8'  # Encoding of uploaded text dumps
+    PREVIEW_SAMPLE_PAGES = 5  # Pages extracted and parsed by the preview endpoint
+    PREVIEW_OCR_SAMPLE_PAGES = 2  # Sampled pages OCR'd when the preview finds no embedded text
+    
+    # Second OCR pass over pages that parsed poorly (only when OCR is enabled for the upload)
+    REOCR_ENABLED = os.environ.get('REOCR_ENABLED', 'True').lower() == 'true'
+    REOCR_CONFIDENCE = 0.5  # Pages with a question below this parse confidence are re-OCR'd
+    REOCR_MIN_PAGE_CHARS = 200  # ...as are pages with this much text but no valid question
+    REOCR_MAX_PAGES = 20  # Weakest pages re-OCR'd per document, bounding the extra cost
+    REOCR_ATTEMPTS = ((400, 6), (400, 4))  # (DPI, tesseract page segmentation mode) tried in order
     
     # MCQ parsing configuration
     MIN_OPTIONS = 2  # Minimum number of options for a valid MCQ
     MAX_OPTIONS = 6  # Maximum number of options for a valid MCQ
+    PARSE_MIN_CONFIDENCE = 0.1  # Minimum parse confidence for a valid MCQ
+    PARSER_WORKERS = int(os.environ.get('PARSER_WORKERS', 0))  # Processes for block parsing; 0 parses serially
+    PARSER_PARALLEL_MIN_BLOCKS = 4000  # Smaller documents are parsed serially (dispatch costs ~15-35us of ~45us per block)
+    PARSER_CHUNK_BLOCKS = 500  # Question blocks per worker task
+    PARSE_BLOCK_TIME_BUDGET = 0.5  # Seconds per question block before the rest use the linear scanner
+    PARSE_DOCUMENT_TIME_BUDGET = 60.0  # Seconds of block parsing per document before the same fallback
+    PARSE_MAX_REGEX_BLOCK_CHARS = 50000  # Longer question blocks always use the linear scanner
+    
+    # Near-duplicate detection across documents
+    DEDUP_MODE = os.environ.get('DEDUP_MODE', 'flag')  # 'flag' marks duplicates, 'drop' removes them, 'off'
+    DEDUP_INDEX_FOLDER = Path(__file__).parent / 'cache' / 'dedup'  # MinHash signatures per document
+    DEDUP_THRESHOLD = 0.8  # Estimated Jaccard similarity of question shingles
+    DEDUP_MAX_DOCUMENTS = 10000  # Least recently indexed documents are dropped above this
+    DEDUP_MAX_AGE = 180 * 24 * 3600  # Seconds since a document was last indexed before it is dropped
     
     # Classification configuration
     CONFIDENCE_THRESHOLD = 0.3  # Minimum confidence score for classification
+    CLASSIFIER_BACKEND = os.environ.get('CLASSIFIER_BACKEND', 'keywords')  # 'keywords' or 'naive_bayes'
+    CLASSIFIER_MODEL_PATH = Path(__file__).parent / 'data' / 'classifier_model.npz'  # Trained by tools/train_classifier.py
+    CLASSIFICATION_CACHE_SIZE = 10000  # Classifications memoized in memory per worker; 0 disables
+    CLASSIFICATION_CACHE_PERSIST = os.environ.get('CLASSIFICATION_CACHE_PERSIST', 'True').lower() == 'true'  # Share via SQLite
+    CLASSIFICATION_CACHE_FILE = Path(__file__).parent / 'cache' / 'classifications.sqlite3'
+    KEYWORDS_RELOAD_INTERVAL = int(os.environ.get('KEYWORDS_RELOAD_INTERVAL', 5))  # Seconds between keyword file checks; 0 disables
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')  # Enables admin endpoints such as keyword reloads
+    
+    # Admission control (cost unit: one page OCR'd at 300 DPI, scaling with pages x DPI^2)
+    ADMISSION_MAX_COST = 200  # Estimated cost allowed to run concurrently in the whole container
+    # Processes with their own admission controller, which split ADMISSION_MAX_COST;
+    # gunicorn.conf.py and asgi.py set it
+    ADMISSION_PROCESSES = max(int(os.environ.get('ADMISSION_PROCESSES', 1)), 1)
+    ADMISSION_MAX_QUEUE = 8  # Jobs waiting beyond this are rejected with 429
+    ADMISSION_QUEUE_TIMEOUT = 60  # Seconds a queued job waits before being rejected
+    
+    # Async front end (asgi.py)
+    ASYNC_JOB_WORKERS = int(os.environ.get('ASYNC_JOB_WORKERS', 0))  # Pipeline processes; 0 uses one per core
+    ASYNC_MAX_PENDING_JOBS = 64  # Unfinished jobs beyond this are rejected with 429
+    ASYNC_JOB_TTL = 3600  # Seconds finished jobs and their results stay queryable
+    ASYNC_EVENTS_KEEPALIVE = 15  # Seconds between keepalive comments on idle progress streams
+    
+    # Output retention configuration
+    OUTPUT_MAX_AGE = 24 * 3600  # Seconds to keep export files
+    OUTPUT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # Oldest exports are removed above this size
+    OUTPUT_SWEEP_INTERVAL = 300  # Seconds between background cleanup sweeps
+    
+    # Download configuration
+    DOWNLOAD_MAX_AGE = 3600  # Seconds browsers may reuse a download; export files never change
+    DOWNLOAD_MIN_COMPRESS_SIZE = 1024  # Smaller exports get no precompressed gzip/brotli variants
+    DOWNLOAD_BROTLI_QUALITY = 9  # Brotli variants need the optional brotli package
+    
+    # Result cache configuration
+    RESULT_CACHE_FOLDER = Path(__file__).parent / 'cache' / 'results'
+    RESULT_CACHE_TTL = 7 * 24 * 3600  # Seconds before a cached result expires
+    RESULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Cache entries plus their export files
+    WORD_CACHE_FOLDER = Path(__file__).parent / 'cache' / 'words'  # Per-page word boxes for layout mode
+    WORD_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    ARTIFACT_FOLDER = Path(__file__).parent / 'cache' / 'artifacts'  # Extracted text and raw parses per document
+    ARTIFACT_MAX_BYTES = 1024 * 1024 * 1024
     
     # Export configuration
     JSON_INDENT = 2
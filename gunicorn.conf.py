@@ -0,0 +1,99 @@
+"""
+Production gunicorn configuration.
+
+The app is imported once in the master process: regex patterns, the keyword
+index and any classifier model are built before fork and shared by all
+workers copy-on-write. Worker and thread counts follow the CPU cores and
+memory available to the container.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Environment:
+    PORT                Port to bind (default 5000)
+    WEB_CONCURRENCY     Worker processes (default: derived from cores and memory)
+    GUNICORN_THREADS    Threads per worker (default 4)
+    WORKER_MEMORY_MB    Memory budgeted per worker, which bounds the worker count (default 512)
+"""
+
+import gc
+import os
+
+def _available_cores():
+    """CPU cores this process may run on, honouring affinity masks."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _available_memory():
+    """Memory limit of the container (cgroup v2 or v1), else physical memory, in bytes."""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # Unlimited cgroups report 'max' (v2) or a near-2^63 sentinel (v1)
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def _default_workers():
+    """One worker per core plus one, as far as the memory budget allows."""
+    workers = _available_cores() + 1
+    memory = _available_memory()
+    if memory:
+        per_worker = int(os.environ.get('WORKER_MEMORY_MB', 512)) * 1024 * 1024
+        workers = min(workers, memory // per_worker)
+    return max(int(workers), 1)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY') or _default_workers())
+
+# Extraction and OCR run in native code that releases the GIL; threads keep
+# uploads and downloads flowing while other requests are busy
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Large documents with OCR take minutes
+timeout = 300
+graceful_timeout = 60
+keepalive = 5
+
+# Heartbeat files on tmpfs, so a slow disk cannot get workers killed
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Recycle workers now and then to bound fragmentation from large documents
+max_requests = 1000
+max_requests_jitter = 100
+
+preload_app = True
+
+# Background threads start in each worker (post_fork), never in the master
+os.environ.setdefault('DEFER_BACKGROUND_TASKS', 'true')
+
+# Every worker admits jobs on its own; they split the container's admission budget
+os.environ.setdefault('ADMISSION_PROCESSES', str(workers))
+
+# Avoid collections in the master while the app is imported: freed objects
+# would leave holes in pages that workers then copy on write
+gc.disable()
+
+def when_ready(server):
+    """After the app is preloaded and before workers fork: move its objects out of the collector's reach."""
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Preloaded app with {gc.get_freeze_count()} frozen objects; "
+                    f"starting {workers} workers x {threads} threads")
+
+def post_fork(server, worker):
+    """In each new worker: resume garbage collection and start its background threads."""
+    gc.enable()
+    
+    from app import start_background_tasks
+    start_background_tasks()
\ No newline at end of file
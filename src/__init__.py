@@ -2,15 +2,16 @@
 MCQ Extraction Package
 
 This package provides tools for extracting, parsing, classifying, and exporting
-multiple-choice questions from PDF files.
+multiple-choice questions from PDF files and pre-extracted text dumps.
 """
 
 __version__ = "1.0.0"
 __author__ = "MCQ Extraction Team"
 
 from .pdf_extractor import PDFExtractor
+from .text_extractor import TextExtractor
 from .mcq_parser import MCQParser
 from .classifier import QuestionClassifier
 from .exporter import DataExporter
 
-__all__ = ['PDFExtractor', 'MCQParser', 'QuestionClassifier', 'DataExporter']
\ No newline at end of file
+__all__ = ['PDFExtractor', 'TextExtractor', 'MCQParser', 'QuestionClassifier', 'DataExporter']
\ No newline at end of file
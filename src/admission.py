@@ -0,0 +1,162 @@
+import math
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when a job cannot be admitted within the queueing limits."""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+@dataclass(eq=False)
+class AdmissionTicket:
+    """An admitted or queued job; compared by identity."""
+    cost: float
+    started: Optional[float] = None
+
+class AdmissionController:
+    """Limit concurrent pipeline runs by estimated cost, queueing or rejecting the excess."""
+    
+    def __init__(self, max_cost: float = 200.0, max_queue_depth: int = 8,
+                 queue_timeout: float = 60.0, text_page_cost: float = 0.05,
+                 text_mb_cost: float = 1.0):
+        """
+        Initialize admission controller.
+        
+        Cost is measured in pages OCR'd at 300 DPI; OCR cost scales with pages x DPI^2.
+        
+        Args:
+            max_cost: Total estimated cost allowed to run at once
+            max_queue_depth: Maximum number of jobs waiting for budget
+            queue_timeout: Seconds a job waits for budget before it is rejected
+            text_page_cost: Cost of a PDF page extracted without OCR
+            text_mb_cost: Cost per megabyte of an uploaded text dump
+        """
+        self.max_cost = max_cost
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.text_page_cost = text_page_cost
+        self.text_mb_cost = text_mb_cost
+        
+        self.in_flight = 0
+        self.in_flight_cost = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        
+        # Running average of seconds per unit of cost, used for Retry-After hints
+        self._seconds_per_cost = 1.0
+        self._queue: Deque[AdmissionTicket] = deque()
+        self._condition = threading.Condition()
+    
+    def estimate_cost(self, num_pages: int = 0, ocr_dpi: Optional[int] = None,
+                      text_bytes: int = 0) -> float:
+        """
+        Estimate the cost of a job.
+        
+        Args:
+            num_pages: Number of PDF pages to process
+            ocr_dpi: Rasterization DPI if the pages may be OCR'd, None for text extraction only
+            text_bytes: Size of a pre-extracted text dump
+        
+        Returns:
+            Estimated cost in 300-DPI OCR page units
+        """
+        page_cost = (ocr_dpi / 300) ** 2 if ocr_dpi else self.text_page_cost
+        cost = num_pages * page_cost + text_bytes / (1024 * 1024) * self.text_mb_cost
+        return max(cost, self.text_page_cost)
+    
+    def acquire(self, cost: float) -> AdmissionTicket:
+        """
+        Wait for budget to run a job, in arrival order.
+        
+        Args:
+            cost: Estimated job cost from estimate_cost
+        
+        Returns:
+            Ticket to pass to release
+        
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        ticket = AdmissionTicket(cost=cost)
+        
+        with self._condition:
+            if self._fits(cost) and not self._queue:
+                return self._admit(ticket)
+            
+            if len(self._queue) >= self.max_queue_depth:
+                self.rejected += 1
+                raise AdmissionRejected('Processing queue is full', self._retry_after())
+            
+            self._queue.append(ticket)
+            deadline = time.monotonic() + self.queue_timeout
+            
+            try:
+                while not (self._queue[0] is ticket and self._fits(cost)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise AdmissionRejected('Timed out waiting for processing capacity',
+                                                self._retry_after())
+                    self._condition.wait(remaining)
+                
+                return self._admit(ticket)
+            finally:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                self._condition.notify_all()
+    
+    def release(self, ticket: AdmissionTicket):
+        """
+        Return a job's budget and wake queued jobs.
+        
+        Args:
+            ticket: Ticket returned by acquire
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self.in_flight_cost -= ticket.cost
+            
+            elapsed = time.monotonic() - ticket.started
+            observed = elapsed / max(ticket.cost, self.text_page_cost)
+            self._seconds_per_cost = 0.8 * self._seconds_per_cost + 0.2 * observed
+            
+            self._condition.notify_all()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics, including queue depth."""
+        with self._condition:
+            return {
+                'in_flight': self.in_flight,
+                'in_flight_cost': round(self.in_flight_cost, 2),
+                'queue_depth': len(self._queue),
+                'queued_cost': round(sum(t.cost for t in self._queue), 2),
+                'max_cost': self.max_cost,
+                'admitted': self.admitted,
+                'rejected': self.rejected
+            }
+    
+    def _fits(self, cost: float) -> bool:
+        """Whether a job fits the remaining budget; oversized jobs run alone."""
+        return self.in_flight == 0 or self.in_flight_cost + cost <= self.max_cost
+    
+    def _admit(self, ticket: AdmissionTicket) -> AdmissionTicket:
+        """Account for an admitted job. Caller holds the condition lock."""
+        ticket.started = time.monotonic()
+        self.in_flight += 1
+        self.in_flight_cost += ticket.cost
+        self.admitted += 1
+        return ticket
+    
+    def _retry_after(self) -> int:
+        """Estimate seconds until the current backlog drains. Caller holds the condition lock."""
+        backlog = self.in_flight_cost + sum(t.cost for t in self._queue)
+        estimate = backlog * self._seconds_per_cost
+        return int(min(max(math.ceil(estimate), 1), 300))
\ No newline at end of file
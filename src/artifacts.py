@@ -0,0 +1,217 @@
+import os
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+from pathlib import Path
+from dataclasses import asdict
+
+from .mcq_parser import MCQOption, MCQuestion, RawParse
+
+logger = logging.getLogger(__name__)
+
+class ArtifactStore:
+    """Persist intermediate pipeline stages per document, so later stages can re-run alone."""
+    
+    def __init__(self, artifact_folder: Path, max_size_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize artifact store.
+        
+        Each document gets a directory holding its metadata, and for every set of
+        extraction settings the extracted text and the raw parse of its blocks.
+        
+        Args:
+            artifact_folder: Directory holding one subdirectory per document
+            max_size_bytes: Least recently used documents are evicted above this size
+        """
+        self.artifact_folder = Path(artifact_folder)
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        
+        self.artifact_folder.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(**settings: Any) -> str:
+        """
+        Build a key from the extraction settings that produced the text.
+        
+        Args:
+            **settings: Extraction settings (page selection, OCR, layout mode)
+        
+        Returns:
+            Short hex digest identifying the artifacts within a document
+        """
+        payload = json.dumps(settings, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def get_meta(self, document_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored metadata of a document (original filename, page count).
+        
+        Args:
+            document_hash: SHA-256 of the document
+        
+        Returns:
+            Metadata dictionary, or None if the document has no artifacts
+        """
+        if not self._valid_hash(document_hash):
+            return None
+        return self._read_json(self.artifact_folder / document_hash / 'meta.json')
+    
+    def get_text(self, document_hash: str, key: str) -> Optional[str]:
+        """
+        Return the extracted text stored for a document and extraction settings.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            key: Key from make_key
+        
+        Returns:
+            Extracted text, or None if it was not stored
+        """
+        if not self._valid_hash(document_hash):
+            return None
+        
+        try:
+            with gzip.open(self.artifact_folder / document_hash / f"{key}.txt.gz", 'rt', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, EOFError, UnicodeDecodeError):
+            return None
+    
+    def get_parse(self, document_hash: str, key: str, version: int) -> Optional[RawParse]:
+        """
+        Return the stored raw parse of a document's text.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            key: Key from make_key
+            version: Raw parse format the caller expects; other versions are ignored
+        
+        Returns:
+            Raw parse, or None if missing or produced by another parser version
+        """
+        data = None
+        if self._valid_hash(document_hash):
+            data = self._read_json(self.artifact_folder / document_hash / f"{key}.parse.json.gz")
+        
+        if data is None or data.get('version') != version:
+            self.misses += 1
+            return None
+        
+        blocks = [
+            (position, MCQuestion(**{**mcq, 'options': [MCQOption(**opt) for opt in mcq['options']]}))
+            for position, mcq in data['blocks']
+        ]
+        answer_keys = [
+            (position, [(number, answer) for number, answer in entries])
+            for position, entries in data['answer_keys']
+        ]
+        
+        # Record the access so eviction removes least recently used documents first
+        try:
+            os.utime(self.artifact_folder / document_hash)
+        except OSError:
+            pass
+        
+        self.hits += 1
+        return RawParse(blocks=blocks, answer_keys=answer_keys)
+    
+    def put_text(self, document_hash: str, key: str, text: str, meta: Dict[str, Any]):
+        """
+        Store extracted text and the document's metadata.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            key: Key from make_key
+            text: Extracted text
+            meta: Document metadata returned by get_meta
+        """
+        document_folder = self.artifact_folder / document_hash
+        try:
+            document_folder.mkdir(exist_ok=True)
+            self._write(document_folder / f"{key}.txt.gz", text)
+            self._write(document_folder / 'meta.json', json.dumps(meta), compress=False)
+        except Exception as e:
+            logger.warning(f"Could not store extracted text: {e}")
+    
+    def put_parse(self, document_hash: str, key: str, raw: RawParse, version: int):
+        """
+        Store the raw parse of a document's text.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            key: Key from make_key
+            raw: Result of MCQParser.parse_raw
+            version: Raw parse format, MCQParser.RAW_PARSE_VERSION
+        """
+        payload = {
+            'version': version,
+            'blocks': [(position, asdict(mcq)) for position, mcq in raw.blocks],
+            'answer_keys': raw.answer_keys
+        }
+        
+        document_folder = self.artifact_folder / document_hash
+        try:
+            document_folder.mkdir(exist_ok=True)
+            self._write(document_folder / f"{key}.parse.json.gz", json.dumps(payload))
+        except Exception as e:
+            logger.warning(f"Could not store parsed blocks: {e}")
+    
+    def evict(self):
+        """Remove least recently used documents until the store is under its size limit."""
+        documents = []
+        total_size = 0
+        
+        with os.scandir(self.artifact_folder) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    last_access = entry.stat().st_mtime
+                except OSError:
+                    continue
+                documents.append((last_access, entry.path, size))
+                total_size += size
+        
+        documents.sort()
+        for _, path, size in documents:
+            if total_size <= self.max_size_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+            logger.info(f"Evicted artifacts of document {Path(path).name}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        documents = sum(1 for entry in os.scandir(self.artifact_folder) if entry.is_dir())
+        return {
+            'documents': documents,
+            'hits': self.hits,
+            'misses': self.misses,
+            'max_size_bytes': self.max_size_bytes
+        }
+    
+    def _write(self, path: Path, content: str, compress: bool = True):
+        """Write a file atomically, so concurrent readers never see a partial artifact."""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        data = content.encode('utf-8')
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=6) if compress else data)
+        tmp_path.replace(path)
+    
+    def _read_json(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Read a JSON artifact, gzip-compressed if its name says so."""
+        try:
+            opener = gzip.open if path.suffix == '.gz' else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, EOFError, ValueError):
+            return None
+    
+    def _valid_hash(self, document_hash: str) -> bool:
+        """Whether a document hash is safe to use as a directory name."""
+        return bool(document_hash) and all(c in '0123456789abcdef' for c in document_hash)
\ No newline at end of file
@@ -1,10 +1,18 @@
+import os
 import json
+import time
+import sqlite3
+import hashlib
 import logging
-from typing import Dict, List, Tuple, Optional
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Tuple, Optional
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import re
 
+from .naive_bayes import NaiveBayesModel
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -14,39 +22,313 @@ class ClassificationResult:
     topic: str
     confidence: float
     matched_keywords: List[str]
+    classifier_version: Optional[str] = None  # Keyword set or model the result was computed with
+
+class KeywordIndex:
+    """Immutable keyword set compiled for matching against cleaned text."""
+    
+    def __init__(self, keywords_data: Dict[str, Dict[str, List[str]]]):
+        """
+        Compile a keyword set.
+        
+        Single-word keywords are looked up in the text's word counts; only
+        phrases need a regular expression. Keywords with characters that
+        cleaned text never contains cannot match and are left out.
+        
+        Args:
+            keywords_data: Keywords per topic per subject
+        
+        Raises:
+            ValueError: If the keyword set is not shaped {subject: {topic: [keyword, ...]}}
+        """
+        if not isinstance(keywords_data, dict) or not all(
+            isinstance(topics, dict) and all(
+                isinstance(keywords, list) and all(isinstance(k, str) for k in keywords)
+                for keywords in topics.values()
+            )
+            for topics in keywords_data.values()
+        ):
+            raise ValueError('Keywords must map subjects to topics to lists of keywords')
+        
+        self.keywords_data = keywords_data
+        canonical = json.dumps(keywords_data, sort_keys=True, ensure_ascii=False)
+        self.version = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+        
+        # Topics in keyword-set order, which breaks ties between equal scores
+        self._topic_order: Dict[Tuple[str, str], int] = {}
+        
+        # word -> [(topic key, position in topic list, keyword)]
+        self._words: Dict[str, List[Tuple[Tuple[str, str], int, str]]] = {}
+        # first word -> [(topic key, position, keyword, pattern)]
+        self._phrases: Dict[str, List[Tuple[Tuple[str, str], int, str, re.Pattern]]] = {}
+        
+        for subject, topics in keywords_data.items():
+            for topic, keywords in topics.items():
+                self._topic_order[(subject, topic)] = len(self._topic_order)
+                for position, keyword in enumerate(keywords):
+                    keyword_lower = keyword.lower()
+                    if not re.fullmatch(r'[a-z0-9]+(?: [a-z0-9]+)*', keyword_lower):
+                        continue
+                    
+                    entry = ((subject, topic), position, keyword)
+                    if ' ' in keyword_lower:
+                        pattern = re.compile(r'\b' + re.escape(keyword_lower) + r'\b')
+                        self._phrases.setdefault(keyword_lower.split(' ', 1)[0], []).append(entry + (pattern,))
+                    else:
+                        self._words.setdefault(keyword_lower, []).append(entry)
+    
+    def match(self, text: str) -> Tuple[Dict[Tuple[str, str], List[str]], Dict[str, int]]:
+        """
+        Find keyword matches in cleaned text.
+        
+        Args:
+            text: Lowercase text of single-space separated alphanumeric words
+        
+        Returns:
+            Matched keywords per (subject, topic) in keyword-list order, and the
+            number of occurrences of each matched keyword (lowercased)
+        """
+        word_counts = Counter(text.split())
+        hits: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        counts: Dict[str, int] = {}
+        
+        for word, count in word_counts.items():
+            for topic_key, position, keyword in self._words.get(word, ()):
+                hits.setdefault(topic_key, []).append((position, keyword))
+                counts[word] = count
+            
+            for topic_key, position, keyword, pattern in self._phrases.get(word, ()):
+                count = counts.get(keyword.lower())
+                if count is None:
+                    count = len(pattern.findall(text))
+                if count:
+                    hits.setdefault(topic_key, []).append((position, keyword))
+                    counts[keyword.lower()] = count
+        
+        matches = {
+            topic_key: [keyword for _, keyword in sorted(hits[topic_key])]
+            for topic_key in sorted(hits, key=self._topic_order.__getitem__)
+        }
+        return matches, counts
 
 class QuestionClassifier:
-    """Classify MCQ questions by subject and topic using keyword matching."""
+    """Classify MCQ questions by subject and topic using keyword matching or a trained model."""
+    
+    BACKENDS = ('keywords', 'naive_bayes')
     
-    def __init__(self, keywords_path: Optional[Path] = None, confidence_threshold: float = 0.3):
+    def __init__(self, keywords_path: Optional[Path] = None, confidence_threshold: float = 0.3,
+                 cache_size: int = 10000, cache_file: Optional[Path] = None,
+                 cache_file_max_entries: int = 200000, backend: str = 'keywords',
+                 model_path: Optional[Path] = None):
         """
         Initialize question classifier.
         
         Args:
             keywords_path: Path to keywords JSON file
             confidence_threshold: Minimum confidence for classification
+            cache_size: Classifications kept in the in-memory LRU cache; 0 disables caching
+            cache_file: SQLite file shared by all workers as a second cache level, or None
+            cache_file_max_entries: Oldest entries of the cache file are pruned above this count
+            backend: 'keywords' for keyword scoring, 'naive_bayes' for the model at model_path;
+                falls back to keywords if the model cannot be loaded
+            model_path: Path of a model trained with tools/train_classifier.py
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown classifier backend: {backend}")
+        
         self.confidence_threshold = confidence_threshold
-        self.keywords_data = {}
+        self._index: Optional[KeywordIndex] = None
+        self.model: Optional[NaiveBayesModel] = None
+        
+        if backend == 'naive_bayes':
+            try:
+                self.model = NaiveBayesModel.load(model_path)
+            except (TypeError, OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not load classifier model {model_path}, using keywords: {e}")
+                backend = 'keywords'
+        self.backend = backend
+        
+        # Results keyed by keyword version and normalized text; recurring
+        # questions across books skip keyword matching
+        self.cache_size = cache_size
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.cache_file_max_entries = cache_file_max_entries
+        self.cache_hits = 0
+        self.cache_file_hits = 0
+        self.cache_misses = 0
+        self._cache: 'OrderedDict[str, ClassificationResult]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._file_inserts = 0
+        
+        # Keyword file watcher
+        self._watch_path: Optional[Path] = None
+        self._watch_signature: Optional[Tuple[int, int]] = None
+        self._watch_stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._reload_lock = threading.Lock()
+        
+        if self.cache_file:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
         
         if keywords_path and keywords_path.exists():
             self.load_keywords(keywords_path)
         else:
             self._create_default_keywords()
     
+    @property
+    def keywords_data(self) -> Dict[str, Dict[str, List[str]]]:
+        """Keywords per topic per subject of the active keyword set."""
+        return self._index.keywords_data
+    
+    @property
+    def keywords_version(self) -> str:
+        """Content hash of the active keyword set, so caches can key on it."""
+        return self._index.version
+    
+    @property
+    def version(self) -> str:
+        """Version of the keyword set or model that classifies questions."""
+        return f"nb-{self.model.version}" if self.model else self._index.version
+    
     def load_keywords(self, keywords_path: Path):
         """Load keywords from JSON file."""
         try:
-            with open(keywords_path, 'r', encoding='utf-8') as f:
-                self.keywords_data = json.load(f)
-            logger.info(f"Loaded keywords from {keywords_path}")
+            self._install(self._read_keywords(keywords_path))
+            logger.info(f"Loaded keywords from {keywords_path} (version {self.keywords_version})")
         except Exception as e:
             logger.error(f"Error loading keywords: {str(e)}")
             self._create_default_keywords()
     
+    def reload_keywords(self, keywords_path: Path) -> bool:
+        """
+        Rebuild the keyword index from a file and swap it in without blocking classification.
+        
+        Questions being classified finish with the index they started with. An
+        invalid file is logged and the active keyword set is kept.
+        
+        Args:
+            keywords_path: Path to keywords JSON file
+        
+        Returns:
+            True if the keyword version changed
+        """
+        with self._reload_lock:
+            # Remember the file state even if it is invalid, so it is reported once per edit
+            if keywords_path == self._watch_path:
+                try:
+                    self._watch_signature = self._file_signature(keywords_path)
+                except OSError:
+                    pass
+            
+            try:
+                index = KeywordIndex(self._read_keywords(keywords_path))
+            except Exception as e:
+                logger.error(f"Keeping keywords version {self.keywords_version}, could not reload: {str(e)}")
+                return False
+            
+            if index.version == self.keywords_version:
+                return False
+            
+            previous = self.keywords_version
+            self._install(index)
+            logger.info(f"Reloaded keywords from {keywords_path}: version {previous} -> {index.version}")
+            return True
+    
+    def start_watching(self, keywords_path: Path, interval: float = 5.0):
+        """
+        Reload keywords in the background whenever the file changes.
+        
+        Args:
+            keywords_path: Path to keywords JSON file
+            interval: Seconds between checks of the file's modification time
+        """
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        
+        self._watch_path = Path(keywords_path)
+        try:
+            self._watch_signature = self._file_signature(self._watch_path)
+        except OSError:
+            self._watch_signature = None
+        
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch, args=(interval,), name='keyword-watcher', daemon=True
+        )
+        self._watch_thread.start()
+    
+    def stop_watching(self):
+        """Stop the keyword file watcher."""
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
+    
+    def _watch(self, interval: float):
+        """Watcher loop."""
+        while not self._watch_stop.wait(interval):
+            try:
+                signature = self._file_signature(self._watch_path)
+            except OSError:
+                continue
+            
+            if signature != self._watch_signature:
+                # Let a non-atomic editor finish writing before reading
+                time.sleep(min(interval, 0.5))
+                self.reload_keywords(self._watch_path)
+    
+    def _file_signature(self, path: Path) -> Tuple[int, int]:
+        """Modification time and size of a file, to detect changes cheaply."""
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_keywords(self, keywords_path: Path) -> Dict[str, Dict[str, List[str]]]:
+        """Read a keywords JSON file."""
+        with open(keywords_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def replace_keywords(self, keywords_data: Dict[str, Dict[str, List[str]]],
+                         keywords_path: Optional[Path] = None) -> str:
+        """
+        Compile and swap in a new keyword set, saving it for other workers to pick up.
+        
+        Args:
+            keywords_data: Keywords per topic per subject
+            keywords_path: File to save the keywords to, or None to keep them in memory only
+        
+        Returns:
+            Version of the new keyword set
+        
+        Raises:
+            ValueError: If the keyword set is malformed
+        """
+        index = KeywordIndex(keywords_data)
+        
+        with self._reload_lock:
+            self._install(index)
+            if keywords_path:
+                self.save_keywords(keywords_path)
+                if keywords_path == self._watch_path:
+                    self._watch_signature = self._file_signature(keywords_path)
+        
+        logger.info(f"Replaced keywords (version {index.version})")
+        return index.version
+    
+    def _install(self, keywords):
+        """Swap in a keyword set, compiling it first if needed."""
+        index = keywords if isinstance(keywords, KeywordIndex) else KeywordIndex(keywords)
+        
+        # A single reference assignment, so readers see the old or the new index, never a mix
+        self._index = index
+        
+        # Entries of the previous version can no longer be hit
+        with self._cache_lock:
+            self._cache.clear()
+    
     def _create_default_keywords(self):
         """Create default keyword mappings based on technical subjects."""
-        self.keywords_data = {
+        self._install({
             "Electronics": {
                 "Basic Electronics": [
                     "resistor", "capacitor", "inductor", "diode", "transistor", "voltage", "current",
@@ -147,7 +429,7 @@ class QuestionClassifier:
                     "radioactivity", "particle", "wave-particle duality", "uncertainty"
                 ]
             }
-        }
+        })
     
     def classify_question(self, question_text: str, options_text: str = "") -> ClassificationResult:
         """
@@ -160,6 +442,12 @@ class QuestionClassifier:
         Returns:
             Classification result with subject, topic, and confidence
         """
+        if self.model is not None:
+            return self.classify_batch([(question_text, options_text)])[0]
+        
+        # The whole question is classified with one keyword set, even if a reload swaps it meanwhile
+        index = self._index
+        
         try:
             # Combine question and options text for analysis
             full_text = f"{question_text} {options_text}".lower()
@@ -167,31 +455,193 @@ class QuestionClassifier:
             # Clean text for keyword matching
             cleaned_text = self._clean_text_for_matching(full_text)
             
+            # Classification depends only on the cleaned text and the keyword set
+            cache_key = self._cache_key(cleaned_text, index.version)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Find keyword matches for each subject and topic
-            matches = self._find_keyword_matches(cleaned_text)
+            matches, counts = index.match(cleaned_text)
             
             if not matches:
-                return ClassificationResult(
+                best_match = ClassificationResult(
                     subject="General",
                     topic="Miscellaneous",
                     confidence=0.0,
-                    matched_keywords=[]
+                    matched_keywords=[],
+                    classifier_version=index.version
                 )
+            else:
+                # Calculate scores and find best match
+                best_match = self._calculate_best_match(matches, cleaned_text, counts)
+                best_match.classifier_version = index.version
             
-            # Calculate scores and find best match
-            best_match = self._calculate_best_match(matches, cleaned_text)
-            
+            self._cache_put(cache_key, best_match)
             return best_match
             
         except Exception as e:
-            logger.error(f"Error classifying question: {str(e)}")
+            logger.error("Error classifying question: %s", e)
             return ClassificationResult(
                 subject="General",
                 topic="Miscellaneous", 
                 confidence=0.0,
-                matched_keywords=[]
+                matched_keywords=[],
+                classifier_version=index.version
             )
     
+    def classify_batch(self, questions: List[Tuple[str, str]]) -> List[ClassificationResult]:
+        """
+        Classify many questions at once.
+        
+        With the naive Bayes backend, all questions missing from the cache are
+        scored in a single product with the model's log-likelihood matrix.
+        
+        Args:
+            questions: (question text, combined options text) per question
+        
+        Returns:
+            Classification result per question, in order
+        """
+        model = self.model
+        if model is None:
+            return [self.classify_question(question, options) for question, options in questions]
+        
+        version = f"nb-{model.version}"
+        results: List[Optional[ClassificationResult]] = [None] * len(questions)
+        
+        try:
+            pending = []
+            for i, (question_text, options_text) in enumerate(questions):
+                cleaned_text = self._clean_text_for_matching(f"{question_text} {options_text}")
+                cache_key = self._cache_key(cleaned_text, version)
+                results[i] = self._cache_get(cache_key)
+                if results[i] is None:
+                    pending.append((i, cache_key, cleaned_text))
+            
+            predictions = model.predict([cleaned_text for _, _, cleaned_text in pending]) if pending else []
+            
+            for (i, cache_key, _), (label, probability) in zip(pending, predictions):
+                subject, topic = label or ("General", "Miscellaneous")
+                results[i] = ClassificationResult(
+                    subject=subject,
+                    topic=topic,
+                    confidence=probability,
+                    matched_keywords=[],
+                    classifier_version=version
+                )
+                self._cache_put(cache_key, results[i])
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Error classifying questions: {str(e)}")
+            return [
+                result or ClassificationResult(
+                    subject="General",
+                    topic="Miscellaneous",
+                    confidence=0.0,
+                    matched_keywords=[],
+                    classifier_version=version
+                )
+                for result in results
+            ]
+    
+    def _cache_key(self, cleaned_text: str, version: str) -> str:
+        """Cache key of a cleaned question text under a keyword set or model."""
+        payload = f"{version}\0{cleaned_text}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[ClassificationResult]:
+        """Look a classification up in memory, then in the shared cache file."""
+        if not self.cache_size:
+            return None
+        
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return result
+        
+        connection = self._cache_connection()
+        if connection is not None:
+            try:
+                row = connection.execute(
+                    'SELECT result FROM classifications WHERE key = ?', (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read classification cache file: {e}")
+                row = None
+            
+            if row is not None:
+                result = ClassificationResult(**json.loads(row[0]))
+                self._remember(key, result)
+                with self._cache_lock:
+                    self.cache_file_hits += 1
+                return result
+        
+        with self._cache_lock:
+            self.cache_misses += 1
+        return None
+    
+    def _cache_put(self, key: str, result: ClassificationResult):
+        """Store a classification in memory and in the shared cache file."""
+        if not self.cache_size:
+            return
+        
+        self._remember(key, result)
+        
+        connection = self._cache_connection()
+        if connection is None:
+            return
+        
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO classifications (key, result) VALUES (?, ?)',
+                    (key, json.dumps(asdict(result)))
+                )
+                self._file_inserts += 1
+                
+                # Prune the oldest entries now and then rather than on every insert
+                if self._file_inserts % 1000 == 0:
+                    connection.execute(
+                        'DELETE FROM classifications WHERE rowid <= (SELECT MAX(rowid) FROM classifications) - ?',
+                        (self.cache_file_max_entries,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write classification cache file: {e}")
+    
+    def _remember(self, key: str, result: ClassificationResult):
+        """Add a result to the in-memory LRU cache, evicting the least recently used."""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _cache_connection(self) -> Optional[sqlite3.Connection]:
+        """Return this thread's connection to the cache file, opening it on first use in this process."""
+        if self.cache_file is None:
+            return None
+        
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.pid = pid
+            self._local.connection = None
+            try:
+                connection = sqlite3.connect(self.cache_file, timeout=5)
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('PRAGMA synchronous=NORMAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS classifications (key TEXT PRIMARY KEY, result TEXT NOT NULL)'
+                )
+                self._local.connection = connection
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open classification cache file {self.cache_file}: {e}")
+        return self._local.connection
+    
     def _clean_text_for_matching(self, text: str) -> str:
         """Clean text for better keyword matching."""
         # Convert to lowercase
@@ -205,27 +655,8 @@ class QuestionClassifier:
         
         return text.strip()
     
-    def _find_keyword_matches(self, text: str) -> Dict[Tuple[str, str], List[str]]:
-        """Find keyword matches for each subject-topic combination."""
-        matches = {}
-        
-        for subject, topics in self.keywords_data.items():
-            for topic, keywords in topics.items():
-                matched_keywords = []
-                
-                for keyword in keywords:
-                    keyword_lower = keyword.lower()
-                    # Use word boundaries to avoid partial matches
-                    pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-                    if re.search(pattern, text):
-                        matched_keywords.append(keyword)
-                
-                if matched_keywords:
-                    matches[(subject, topic)] = matched_keywords
-        
-        return matches
-    
-    def _calculate_best_match(self, matches: Dict[Tuple[str, str], List[str]], text: str) -> ClassificationResult:
+    def _calculate_best_match(self, matches: Dict[Tuple[str, str], List[str]], text: str,
+                              counts: Dict[str, int]) -> ClassificationResult:
         """Calculate the best subject-topic match based on keyword frequency and relevance."""
         
         scored_matches = []
@@ -235,10 +666,7 @@ class QuestionClassifier:
             base_score = len(matched_keywords)
             
             # Calculate frequency score (how often keywords appear)
-            frequency_score = 0
-            for keyword in matched_keywords:
-                keyword_pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                frequency_score += len(re.findall(keyword_pattern, text))
+            frequency_score = sum(counts[keyword.lower()] for keyword in matched_keywords)
             
             # Calculate length bonus (longer keywords are more specific)
             length_bonus = sum(len(keyword.split()) for keyword in matched_keywords) * 0.1
@@ -290,7 +718,7 @@ class QuestionClassifier:
             matched_keywords=best['matched_keywords']
         )
     
-    def get_classification_stats(self) -> Dict[str, int]:
+    def get_classification_stats(self) -> Dict[str, Any]:
         """Get statistics about available classifications."""
         stats = {
             'total_subjects': len(self.keywords_data),
@@ -299,15 +727,32 @@ class QuestionClassifier:
                 len(keywords) 
                 for topics in self.keywords_data.values() 
                 for keywords in topics.values()
-            )
+            ),
+            'keywords_version': self.keywords_version,
+            'backend': self.backend,
+            'model': self.model.get_stats() if self.model else None
         }
+        
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_file_hits + self.cache_misses
+            stats['cache'] = {
+                'entries': len(self._cache),
+                'max_entries': self.cache_size,
+                'hits': self.cache_hits,
+                'file_hits': self.cache_file_hits,
+                'misses': self.cache_misses,
+                'hit_rate': round((self.cache_hits + self.cache_file_hits) / lookups, 3) if lookups else 0.0,
+                'shared_file': str(self.cache_file) if self.cache_file else None
+            }
         return stats
     
     def save_keywords(self, keywords_path: Path):
-        """Save current keywords to JSON file."""
+        """Save current keywords to JSON file, atomically so watchers never read a partial file."""
+        tmp_path = keywords_path.with_name(f"{keywords_path.name}.{os.getpid()}.tmp")
         try:
-            with open(keywords_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(self.keywords_data, f, indent=2, ensure_ascii=False)
+            tmp_path.replace(keywords_path)
             logger.info(f"Saved keywords to {keywords_path}")
         except Exception as e:
             logger.error(f"Error saving keywords: {str(e)}")
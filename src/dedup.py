@@ -0,0 +1,305 @@
+import os
+import re
+import time
+import zlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+from pathlib import Path
+import numpy as np
+
+from .mcq_parser import MCQuestion
+
+logger = logging.getLogger(__name__)
+
+class DuplicateIndex:
+    """Find near-duplicate questions across documents with MinHash signatures and an LSH index."""
+    
+    _MERSENNE_PRIME = (1 << 31) - 1
+    _NON_WORD = re.compile(r'[\W_]+')
+    
+    def __init__(self, index_folder: Path, num_perm: int = 128, bands: int = 16,
+                 threshold: float = 0.8, shingle_size: int = 5, seed: int = 1,
+                 max_documents: int = 10000, max_age: Optional[float] = None):
+        """
+        Initialize duplicate index.
+        
+        Args:
+            index_folder: Directory holding one signature shard per document
+            num_perm: MinHash signature length
+            bands: LSH bands; num_perm / bands rows per band trade recall for precision
+            threshold: Estimated Jaccard similarity at which questions are duplicates
+            shingle_size: Character shingle length over the normalized question text
+            seed: Seed of the hash permutations; changing it invalidates stored shards
+            max_documents: Shards kept; the least recently indexed are removed above this
+            max_age: Seconds since a document was last indexed before its shard
+                is removed, or None to keep shards regardless of age
+        """
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        
+        self.index_folder = Path(index_folder)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_documents = max_documents
+        self.max_age = max_age
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self._MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self._MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        
+        # Signatures of all indexed questions, grown by doubling
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._count = 0
+        self._refs: List[str] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._entries_by_document: Dict[str, List[int]] = {}
+        self._dead: Set[int] = set()
+        self._loaded_shards: Dict[str, int] = {}  # Shard name -> mtime_ns it was loaded at
+        self._folder_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+        
+        self.index_folder.mkdir(parents=True, exist_ok=True)
+        self._load_new_shards()
+    
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+        
+        Args:
+            text: Question text with its options
+        
+        Returns:
+            uint32 array of num_perm minimum hash values
+        """
+        normalized = self._NON_WORD.sub(' ', text.lower()).strip()
+        k = self.shingle_size
+        shingles = {normalized[i:i + k] for i in range(max(len(normalized) - k + 1, 1))}
+        
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles)
+        ) % self._MERSENNE_PRIME
+        
+        # (a * h + b) mod p for every permutation and shingle, minimized over shingles
+        permuted = (np.outer(hashes, self._a) + self._b) % self._MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    def find_duplicates(self, document_hash: str, mcqs: List[MCQuestion]) -> List[Optional[str]]:
+        """
+        Match a document's questions against the index, then add them to it.
+        
+        Questions are also matched against earlier questions of the same document.
+        A document that was indexed before replaces its old entries, so
+        reprocessing it does not report its own questions as duplicates.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            mcqs: Parsed questions in document order
+        
+        Returns:
+            For each question, the reference ('<document>:<question id>') of the
+            earlier question it duplicates, or None
+        """
+        signatures = np.array(
+            [self.signature(self._question_text(mcq)) for mcq in mcqs], dtype=np.uint32
+        ).reshape(-1, self.num_perm)
+        refs = [f"{document_hash[:12]}:{mcq.id}" for mcq in mcqs]
+        
+        with self._lock:
+            self._load_new_shards()
+            
+            # Retire entries from an earlier run over the same document
+            self._retire(document_hash)
+            
+            duplicates = []
+            for signature, ref in zip(signatures, refs):
+                duplicates.append(self._query(signature))
+                self._insert(signature, ref, document_hash)
+            
+            self._write_shard(document_hash, signatures, refs)
+            self._compact_if_sparse()
+            over_limit = len(self._loaded_shards) > self.max_documents
+        
+        if over_limit:
+            self.evict()
+        
+        found = sum(1 for ref in duplicates if ref)
+        if found:
+            logger.info(f"Found {found} near-duplicate questions in document {document_hash[:12]}")
+        return duplicates
+    
+    def evict(self):
+        """Remove shards over the age and count limits, least recently indexed first, and drop their entries."""
+        shards = []
+        for shard_path in self.index_folder.glob('*.npz'):
+            try:
+                shards.append((shard_path.stat().st_mtime, shard_path))
+            except OSError:
+                continue
+        
+        shards.sort(reverse=True)
+        cutoff = time.time() - self.max_age if self.max_age is not None else None
+        expired = [
+            shard_path for rank, (mtime, shard_path) in enumerate(shards)
+            if rank >= self.max_documents or (cutoff is not None and mtime < cutoff)
+        ]
+        if not expired:
+            return
+        
+        for shard_path in expired:
+            shard_path.unlink(missing_ok=True)
+        
+        with self._lock:
+            for shard_path in expired:
+                if self._loaded_shards.pop(shard_path.name, None) is not None:
+                    self._retire(shard_path.stem)
+            self._compact_if_sparse()
+        logger.info(f"Evicted {len(expired)} documents from the duplicate index")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        with self._lock:
+            return {
+                'questions': self._count - len(self._dead),
+                'documents': len(self._loaded_shards),
+                'max_documents': self.max_documents,
+                'threshold': self.threshold
+            }
+    
+    def _question_text(self, mcq: MCQuestion) -> str:
+        """Text a question is compared on: its stem and its options in label order."""
+        options = ' '.join(opt.text for opt in sorted(mcq.options, key=lambda opt: opt.label.lower()))
+        return f"{mcq.question_text} {options}"
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Bucket key of each LSH band."""
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+    
+    def _query(self, signature: np.ndarray) -> Optional[str]:
+        """Return the most similar indexed question above the threshold. Caller holds the lock."""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        
+        candidates = sorted(candidates - self._dead)
+        if not candidates:
+            return None
+        
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.threshold:
+            return None
+        return self._refs[candidates[best]]
+    
+    def _insert(self, signature: np.ndarray, ref: str, document_hash: str):
+        """Append a signature and bucket it. Caller holds the lock."""
+        if self._count == len(self._signatures):
+            grown = np.empty((max(2 * self._count, 1024), self.num_perm), dtype=np.uint32)
+            grown[:self._count] = self._signatures[:self._count]
+            self._signatures = grown
+        
+        entry = self._count
+        self._signatures[entry] = signature
+        self._refs.append(ref)
+        self._entries_by_document.setdefault(document_hash, []).append(entry)
+        self._count += 1
+        
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(entry)
+    
+    def _retire(self, document_hash: str):
+        """Mark a document's entries as removed. Caller holds the lock."""
+        self._dead.update(self._entries_by_document.pop(document_hash, []))
+    
+    def _compact_if_sparse(self):
+        """Rebuild the signature array and buckets without retired entries once they are the majority. Caller holds the lock."""
+        if not self._dead or 2 * len(self._dead) < self._count:
+            return
+        
+        live = [entry for entry in range(self._count) if entry not in self._dead]
+        new_entry = {entry: i for i, entry in enumerate(live)}
+        
+        self._signatures = self._signatures[live]
+        self._refs = [self._refs[entry] for entry in live]
+        self._entries_by_document = {
+            document_hash: [new_entry[entry] for entry in entries]
+            for document_hash, entries in self._entries_by_document.items()
+        }
+        self._buckets = [{} for _ in range(self.bands)]
+        for entry, signature in enumerate(self._signatures):
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, []).append(entry)
+        
+        logger.debug("Compacted duplicate index from %d to %d entries", self._count, len(live))
+        self._count = len(live)
+        self._dead = set()
+    
+    def _write_shard(self, document_hash: str, signatures: np.ndarray, refs: List[str]):
+        """Persist a document's signatures atomically. Caller holds the lock."""
+        shard_path = self.index_folder / f"{document_hash}.npz"
+        tmp_path = shard_path.with_name(f"{document_hash}.{os.getpid()}.tmp")
+        
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, signatures=signatures, refs=np.array(refs, dtype=str))
+            tmp_path.replace(shard_path)
+            self._loaded_shards[shard_path.name] = shard_path.stat().st_mtime_ns
+        except Exception as e:
+            logger.warning(f"Could not write duplicate index shard: {e}")
+    
+    def _load_new_shards(self):
+        """
+        Bring the index up to date with the shard folder, including other workers' writes. Caller holds the lock.
+        
+        Shards are written by rename, which changes the folder's mtime, so the
+        folder is only listed when its mtime moved. Shards rewritten since they
+        were loaded are reloaded, and shards removed by eviction are dropped.
+        A folder mtime under a second old is not trusted, since another rename
+        within the same timestamp tick would not move it.
+        """
+        try:
+            folder_mtime = self.index_folder.stat().st_mtime_ns
+        except OSError as e:
+            logger.warning(f"Cannot read duplicate index folder: {e}")
+            return
+        if folder_mtime == self._folder_mtime:
+            return
+        self._folder_mtime = folder_mtime if time.time_ns() - folder_mtime > 1_000_000_000 else None
+        
+        shard_mtimes = {}
+        for shard_path in self.index_folder.glob('*.npz'):
+            try:
+                shard_mtimes[shard_path.name] = shard_path.stat().st_mtime_ns
+            except OSError:
+                continue
+        
+        for name in [name for name in self._loaded_shards if name not in shard_mtimes]:
+            del self._loaded_shards[name]
+            self._retire(Path(name).stem)
+        
+        for name, mtime in sorted(shard_mtimes.items()):
+            if self._loaded_shards.get(name) == mtime:
+                continue
+            shard_path = self.index_folder / name
+            try:
+                with np.load(shard_path, allow_pickle=False) as data:
+                    signatures = data['signatures']
+                    refs = data['refs'].tolist()
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable duplicate index shard {shard_path.name}: {e}")
+                continue
+            
+            if signatures.ndim != 2 or signatures.shape[1] != self.num_perm:
+                logger.warning(f"Skipping duplicate index shard {shard_path.name} with other settings")
+                continue
+            
+            document_hash = shard_path.stem
+            self._retire(document_hash)
+            for signature, ref in zip(signatures, refs):
+                self._insert(signature, ref, document_hash)
+            self._loaded_shards[name] = mtime
+        
+        self._compact_if_sparse()
\ No newline at end of file
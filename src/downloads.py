@@ -0,0 +1,212 @@
+import io
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from pathlib import Path
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip variants are written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink that hands out what zipfile wrote since the last drain."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class ExportDownloads:
+    """Serve export files efficiently: content ETags, precompressed variants and zip bundles."""
+    
+    # Content-Encoding -> file suffix of the precompressed variant, in order of preference
+    VARIANTS = {'br': '.br', 'gzip': '.gz'}
+    
+    def __init__(self, min_compress_size: int = 1024, gzip_level: int = 9, brotli_quality: int = 9,
+                 chunk_size: int = 1024 * 1024, etag_cache_size: int = 4096):
+        """
+        Initialize export downloads.
+        
+        Args:
+            min_compress_size: Files smaller than this get no compressed variants
+            gzip_level: gzip compression level of the variants
+            brotli_quality: Brotli quality of the variants (11 is slow on large exports)
+            chunk_size: Bytes read at a time when hashing and bundling
+            etag_cache_size: Number of file digests remembered
+        """
+        self.min_compress_size = min_compress_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.chunk_size = chunk_size
+        self.etag_cache_size = etag_cache_size
+        
+        # filename -> (size, mtime_ns, sha256); exports never change once written
+        self._digests: 'OrderedDict[str, Tuple[int, int, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def precompress(self, paths: Iterable[Path]) -> List[Path]:
+        """
+        Write compressed variants of freshly exported files, once, next to them.
+        
+        Args:
+            paths: Export files
+        
+        Returns:
+            Paths of the variants written
+        """
+        variants = []
+        for path in paths:
+            data = path.read_bytes()
+            self._remember(path, hashlib.sha256(data).hexdigest())
+            if len(data) < self.min_compress_size:
+                continue
+            
+            encoded = {'gzip': gzip.compress(data, compresslevel=self.gzip_level, mtime=0)}
+            if brotli is not None:
+                encoded['br'] = brotli.compress(data, quality=self.brotli_quality)
+            
+            for encoding, compressed in encoded.items():
+                # Not worth a variant unless it saves a tenth of the bytes
+                if len(compressed) > len(data) * 0.9:
+                    continue
+                variant_path = path.with_name(path.name + self.VARIANTS[encoding])
+                tmp_path = variant_path.with_name(f"{variant_path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(compressed)
+                tmp_path.replace(variant_path)
+                variants.append(variant_path)
+        
+        return variants
+    
+    def variant_paths(self, path: Path) -> List[Path]:
+        """Paths any compressed variants of an export file would have."""
+        return [path.with_name(path.name + suffix) for suffix in self.VARIANTS.values()]
+    
+    def select(self, path: Path, accept_encoding: Optional[str]) -> Tuple[Path, Optional[str], str]:
+        """
+        Pick the representation of an export file to send for a request.
+        
+        Args:
+            path: Export file
+            accept_encoding: Accept-Encoding header of the request
+        
+        Returns:
+            (path to send, Content-Encoding or None, strong ETag value without quotes);
+            each representation has its own ETag, derived from the content hash
+        """
+        digest = self.digest(path)
+        
+        available = [
+            encoding for encoding, suffix in self.VARIANTS.items()
+            if path.with_name(path.name + suffix).is_file()
+        ]
+        if available and accept_encoding:
+            encoding = parse_accept_header(accept_encoding).best_match(available)
+            if encoding:
+                return path.with_name(path.name + self.VARIANTS[encoding]), encoding, f"{digest}-{encoding}"
+        
+        return path, None, digest
+    
+    def digest(self, path: Path) -> str:
+        """
+        SHA-256 of an export file, hashed once per file and process.
+        
+        Args:
+            path: Export file
+        
+        Returns:
+            Hex digest
+        """
+        stat = path.stat()
+        with self._lock:
+            cached = self._digests.get(path.name)
+            if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._digests.move_to_end(path.name)
+                return cached[2]
+        
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+        
+        self._remember(path, hasher.hexdigest(), stat)
+        return hasher.hexdigest()
+    
+    def bundle_etag(self, paths: List[Path]) -> str:
+        """Strong ETag of a bundle, derived from its members' names and content hashes."""
+        members = '\n'.join(f"{path.name}:{self.digest(path)}" for path in paths)
+        return hashlib.sha256(members.encode('utf-8')).hexdigest()
+    
+    def iter_bundle(self, paths: List[Path]) -> Iterator[bytes]:
+        """
+        Stream a zip archive of export files without building it in memory or on disk.
+        
+        Args:
+            paths: Export files to include
+        
+        Returns:
+            Iterator over chunks of the zip archive
+        """
+        return (chunk for chunk in self._write_bundle(paths) if chunk)
+    
+    @staticmethod
+    def mimetype(path: Path) -> str:
+        """Content type of an export file, regardless of the variant sent."""
+        return mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get download statistics."""
+        with self._lock:
+            digests = len(self._digests)
+        return {
+            'cached_digests': digests,
+            'encodings': [encoding for encoding in self.VARIANTS if encoding != 'br' or brotli is not None]
+        }
+    
+    def _write_bundle(self, paths: List[Path]) -> Iterator[bytes]:
+        """Write a zip archive member by member, yielding whatever was written so far."""
+        sink = _ZipStream()
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for path in paths:
+                info = zipfile.ZipInfo.from_file(path, arcname=path.name)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, 'rb') as src, archive.open(info, 'w') as dest:
+                    while True:
+                        chunk = src.read(self.chunk_size)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        yield sink.drain()
+                yield sink.drain()
+        yield sink.drain()
+    
+    def _remember(self, path: Path, digest: str, stat: Optional[os.stat_result] = None):
+        """Cache a file's digest against its size and modification time."""
+        stat = stat or path.stat()
+        with self._lock:
+            self._digests[path.name] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._digests.move_to_end(path.name)
+            while len(self._digests) > self.etag_cache_size:
+                self._digests.popitem(last=False)
\ No newline at end of file
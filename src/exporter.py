@@ -54,7 +54,9 @@ class DataExporter:
                     'subject': mcq.subject,
                     'topic': mcq.topic,
                     'confidence': round(mcq.confidence, 3),
-                    'page_number': mcq.page_number
+                    'page_number': mcq.page_number,
+                    'question_number': mcq.question_number,
+                    'duplicate_of': mcq.duplicate_of
                 }
                 mcq_data.append(mcq_dict)
             
@@ -0,0 +1,289 @@
+import math
+import time
+import uuid
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+
+from .admission import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STAGES = ('done', 'failed')
+
+# Set in each pool process by _init_worker
+_progress_queue = None
+
+def _init_worker(progress_queue, initializer: Optional[Callable[[], Any]]):
+    """Pool process initializer: keep the progress queue and run the caller's initializer."""
+    global _progress_queue
+    _progress_queue = progress_queue
+    if initializer is not None:
+        initializer()
+
+def _report_progress(job_id: str, stage: str):
+    """Send a stage change of a job from a pool process to the event loop."""
+    _progress_queue.put((job_id, stage))
+
+def _run(fn: Callable, job_id: str, args: Sequence, kwargs: Dict[str, Any]):
+    """Run a job in a pool process, passing it a progress callback."""
+    _report_progress(job_id, 'started')
+    return fn(*args, progress=partial(_report_progress, job_id), **kwargs)
+
+@dataclass(eq=False)
+class Job:
+    """A submitted job with its progress history; compared by identity."""
+    job_id: str
+    created: float
+    status: str = 'pending'
+    stage: str = 'pending'
+    finished: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Job state without its result."""
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'stage': self.stage,
+            'created': self.created,
+            'finished': self.finished
+        }
+
+class JobManager:
+    """Run CPU-bound jobs in a process pool for an asyncio server and stream their progress."""
+    
+    def __init__(self, workers: int = 0, max_pending: int = 64, job_ttl: float = 3600,
+                 preload: Optional[List[str]] = None, initializer: Optional[Callable[[], Any]] = None):
+        """
+        Initialize job manager.
+        
+        Pool processes are forked from a forkserver that imports the preload
+        modules once, so each new process starts with the pipeline ready.
+        
+        Args:
+            workers: Pool processes; 0 uses one per CPU core
+            max_pending: Unfinished jobs allowed before submissions are rejected
+            job_ttl: Seconds finished jobs and their results are kept
+            preload: Modules the forkserver imports before forking pool processes
+            initializer: Picklable callable run once in each pool process
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.submitted = 0
+        self.rejected = 0
+        
+        self._context = multiprocessing.get_context('forkserver')
+        if preload:
+            self._context.set_forkserver_preload(preload)
+        self._initializer = initializer
+        
+        self._jobs: Dict[str, Job] = {}
+        self._pending = 0
+        self._durations: Deque[float] = deque(maxlen=50)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._progress_queue = None
+        self._relay: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the pool and the progress relay; call from the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._progress_queue = self._context.Queue()
+        self._executor = self._create_executor()
+        self._relay = threading.Thread(target=self._relay_progress, name='job-progress', daemon=True)
+        self._relay.start()
+        logger.info(f"Started job pool with {self.workers} processes")
+    
+    def stop(self):
+        """Stop the pool, cancelling jobs that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._relay is not None:
+            self._progress_queue.put(None)
+            self._relay.join()
+            self._relay = None
+    
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Job:
+        """
+        Run fn(*args, progress=callback, **kwargs) in a pool process.
+        
+        Args:
+            fn: Picklable module-level function accepting a progress callback
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        
+        Returns:
+            The submitted job
+        
+        Raises:
+            AdmissionRejected: If too many jobs are unfinished
+        """
+        self._prune()
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise AdmissionRejected('Processing queue is full', self._retry_after())
+        
+        job = Job(job_id=uuid.uuid4().hex, created=time.time())
+        executor = self._executor
+        try:
+            future = self._loop.run_in_executor(executor, _run, fn, job.job_id, args, kwargs)
+        except BrokenProcessPool:
+            # A pool process died and the failure has not reached _finish yet
+            executor = self._replace_executor(executor)
+            future = self._loop.run_in_executor(executor, _run, fn, job.job_id, args, kwargs)
+        
+        # Progress is relayed through the event loop, so it cannot arrive before this
+        self._jobs[job.job_id] = job
+        self._pending += 1
+        self.submitted += 1
+        self._publish(job, 'pending')
+        future.add_done_callback(partial(self._finish, job, executor))
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if it is unknown or expired."""
+        self._prune()
+        return self._jobs.get(job_id)
+    
+    async def events(self, job: Job, keepalive: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a job's past and future progress events until it finishes.
+        
+        Args:
+            job: Job to follow
+            keepalive: Seconds without events after which None is yielded, so
+                callers can keep idle connections alive
+        
+        Yields:
+            Event dictionaries with 'stage' and 'time', or None on keepalive
+        """
+        # Subscribe and snapshot the history together, so no event is missed or repeated
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            for event in list(job.events):
+                yield event
+                if event['stage'] in TERMINAL_STAGES:
+                    return
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                
+                yield event
+                if event['stage'] in TERMINAL_STAGES:
+                    return
+        finally:
+            job.subscribers.remove(queue)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job statistics."""
+        return {
+            'workers': self.workers,
+            'pending': self._pending,
+            'jobs': len(self._jobs),
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'max_pending': self.max_pending
+        }
+    
+    def _publish(self, job: Job, stage: str, **details: Any):
+        """Record a stage change and hand it to subscribers. Runs on the event loop."""
+        if job.status in TERMINAL_STAGES:
+            # Progress relayed after the job's result arrived
+            return
+        
+        event = {'seq': len(job.events), 'stage': stage, 'time': time.time(), **details}
+        job.stage = stage
+        if stage == 'started':
+            job.status = 'running'
+        elif stage in TERMINAL_STAGES:
+            job.status = stage
+            job.finished = event['time']
+        
+        job.events.append(event)
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Create a process pool whose processes report progress to this manager."""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, self._initializer)
+        )
+    
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Swap a broken pool for a new one, unless that already happened. Runs on the event loop."""
+        if broken is self._executor:
+            logger.error('A job pool process exited unexpectedly; starting a new pool')
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+        return self._executor
+    
+    def _finish(self, job: Job, executor: ProcessPoolExecutor, future: asyncio.Future):
+        """Record a job's result once its pool process returns. Runs on the event loop."""
+        self._pending -= 1
+        self._durations.append(time.time() - job.created)
+        
+        if future.cancelled():
+            job.error = 'Job was cancelled'
+            self._publish(job, 'failed')
+        elif isinstance(future.exception(), BrokenProcessPool):
+            # Every job of the broken pool ends here; the first one replaces the pool
+            job.error = 'The worker process running this job exited unexpectedly, e.g. out of memory'
+            logger.error(f"Job {job.job_id} lost its worker process")
+            self._publish(job, 'failed')
+            if self._executor is not None:
+                self._replace_executor(executor)
+        elif future.exception() is not None:
+            job.error = f"Job failed: {future.exception()}"
+            logger.error(f"Job {job.job_id} failed: {future.exception()}")
+            self._publish(job, 'failed')
+        else:
+            job.result = future.result()
+            self._publish(job, 'done')
+    
+    def _relay_progress(self):
+        """Forward progress from pool processes to the event loop until stopped."""
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                return
+            job_id, stage = item
+            self._loop.call_soon_threadsafe(self._relay_event, job_id, stage)
+    
+    def _relay_event(self, job_id: str, stage: str):
+        """Publish a relayed stage change if its job is still known. Runs on the event loop."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            self._publish(job, stage)
+    
+    def _prune(self):
+        """Forget finished jobs older than the TTL."""
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def _retry_after(self) -> int:
+        """Estimate seconds until a pending job finishes, for Retry-After hints."""
+        average = sum(self._durations) / len(self._durations) if self._durations else 10.0
+        return max(1, math.ceil(average / self.workers))
\ No newline at end of file
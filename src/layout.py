@@ -0,0 +1,257 @@
+import os
+import shutil
+import logging
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+from dataclasses import dataclass
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PageWords:
+    """Words of one page with their boxes in points (top-left origin)."""
+    width: float
+    texts: List[str]
+    boxes: np.ndarray  # float32 array of (x0, top, x1, bottom) rows
+    
+    @classmethod
+    def from_pdfplumber(cls, words: List[Dict[str, Any]], width: float) -> 'PageWords':
+        """Build from the dictionaries returned by pdfplumber's extract_words."""
+        boxes = np.array(
+            [(w['x0'], w['top'], w['x1'], w['bottom']) for w in words], dtype=np.float32
+        ).reshape(-1, 4)
+        return cls(width=float(width), texts=[w['text'] for w in words], boxes=boxes)
+
+class ColumnLayout:
+    """Order the words of multi-column pages for reading: left column, then right."""
+    
+    GUTTER_SEARCH = (0.3, 0.7)  # Fraction of the page width searched for a gutter
+    MIN_GUTTER_WIDTH = 4  # Points of white space required between columns
+    MAX_GUTTER_CROSSINGS = 0.1  # Share of lines allowed to span the gutter (headings, rules)
+    MIN_COLUMN_SHARE = 0.2  # Each column must hold at least this share of the words
+    
+    def detect_gutter(self, page: PageWords) -> Optional[float]:
+        """
+        Find the x position of the gutter between two text columns.
+        
+        Args:
+            page: Words of a page
+        
+        Returns:
+            Gutter x coordinate in points, or None for single-column pages
+        """
+        if len(page.texts) < 10:
+            return None
+        
+        x0 = np.clip(page.boxes[:, 0].astype(np.int64), 0, int(page.width))
+        x1 = np.clip(np.ceil(page.boxes[:, 2]).astype(np.int64), 0, int(page.width))
+        
+        # Number of words covering each 1pt column of the page
+        coverage = np.zeros(int(page.width) + 2, dtype=np.int64)
+        np.add.at(coverage, x0, 1)
+        np.add.at(coverage, x1, -1)
+        coverage = np.cumsum(coverage)
+        
+        num_lines = len(self._group_lines(page.boxes[:, 1], page.boxes[:, 3]))
+        lo, hi = (int(page.width * f) for f in self.GUTTER_SEARCH)
+        open_columns = coverage[lo:hi] <= max(1, num_lines * self.MAX_GUTTER_CROSSINGS)
+        
+        # Leftmost run of (nearly) empty columns in the middle of the page. Item
+        # numbers of the right column often hang into the gutter and leave a
+        # second, wider gap to their right, which is not the column boundary.
+        gutter, start = None, None
+        for i, is_open in enumerate(np.append(open_columns, False)):
+            if is_open and start is None:
+                start = i
+            elif not is_open and start is not None:
+                if i - start >= self.MIN_GUTTER_WIDTH:
+                    gutter = lo + (start + i) / 2
+                    break
+                start = None
+        
+        if gutter is None:
+            return None
+        
+        left_share = np.count_nonzero(page.boxes[:, 2] <= gutter) / len(page.texts)
+        right_share = np.count_nonzero(page.boxes[:, 0] >= gutter) / len(page.texts)
+        if min(left_share, right_share) < self.MIN_COLUMN_SHARE:
+            return None
+        
+        return gutter
+    
+    def to_text(self, page: PageWords) -> str:
+        """
+        Render a page's words as text in reading order.
+        
+        Lines crossing the gutter (chapter headings, full-width tables) split the
+        page into bands; within each band the left column is read before the right.
+        
+        Args:
+            page: Words of a page
+        
+        Returns:
+            Page text, one line per output line
+        """
+        if not page.texts:
+            return ''
+        
+        gutter = self.detect_gutter(page)
+        x0, x1 = page.boxes[:, 0], page.boxes[:, 2]
+        
+        output: List[str] = []
+        left_lines: List[str] = []
+        right_lines: List[str] = []
+        
+        for line in self._group_lines(page.boxes[:, 1], page.boxes[:, 3]):
+            line.sort(key=lambda i: x0[i])
+            
+            if gutter is None or any(x0[i] < gutter < x1[i] for i in line):
+                # Full-width line: flush the band above it
+                output.extend(left_lines + right_lines)
+                left_lines, right_lines = [], []
+                output.append(' '.join(page.texts[i] for i in line))
+                continue
+            
+            left = [page.texts[i] for i in line if x1[i] <= gutter]
+            right = [page.texts[i] for i in line if x0[i] >= gutter]
+            if left:
+                left_lines.append(' '.join(left))
+            if right:
+                right_lines.append(' '.join(right))
+        
+        output.extend(left_lines + right_lines)
+        return '\n'.join(output)
+    
+    def _group_lines(self, tops: np.ndarray, bottoms: np.ndarray) -> List[List[int]]:
+        """
+        Group words into lines by vertical position.
+        
+        A word joins the current line while its top lies above the middle of the
+        line's first word, which tolerates superscripts and mixed font sizes.
+        
+        Returns:
+            Lists of word positions per line, top to bottom
+        """
+        lines: List[List[int]] = []
+        line_mid = -np.inf
+        for i in np.argsort(tops, kind='stable'):
+            if tops[i] >= line_mid:
+                lines.append([])
+                line_mid = (tops[i] + bottoms[i]) / 2
+            lines[-1].append(int(i))
+        return lines
+
+class WordBoxCache:
+    """Persist word boxes per document page so layout analysis runs once per page."""
+    
+    def __init__(self, cache_folder: Path, max_size_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize word box cache.
+        
+        Args:
+            cache_folder: Directory holding one subdirectory of pages per document
+            max_size_bytes: Least recently used documents are evicted above this size
+        """
+        self.cache_folder = Path(cache_folder)
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+    
+    def get(self, document_hash: str, page_num: int) -> Optional[PageWords]:
+        """
+        Return cached words of a page, or None if the page was never extracted.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            page_num: 1-based page number
+        
+        Returns:
+            Cached page words or None
+        """
+        page_path = self._page_path(document_hash, page_num)
+        try:
+            with np.load(page_path, allow_pickle=False) as data:
+                words = PageWords(
+                    width=float(data['width']),
+                    texts=data['texts'].tolist(),
+                    boxes=data['boxes']
+                )
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        
+        # Record the access so eviction removes least recently used documents first
+        try:
+            os.utime(page_path.parent)
+        except OSError:
+            pass
+        
+        self.hits += 1
+        return words
+    
+    def put(self, document_hash: str, page_num: int, words: PageWords):
+        """
+        Store the words of a page.
+        
+        Args:
+            document_hash: SHA-256 of the document
+            page_num: 1-based page number
+            words: Words extracted from the page
+        """
+        page_path = self._page_path(document_hash, page_num)
+        tmp_path = page_path.with_name(f"{page_num}.{os.getpid()}.tmp")
+        
+        try:
+            page_path.parent.mkdir(exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    width=np.float32(words.width),
+                    texts=np.array(words.texts, dtype=str),
+                    boxes=words.boxes
+                )
+            tmp_path.replace(page_path)
+        except Exception as e:
+            logger.warning(f"Could not write word box cache entry: {e}")
+    
+    def evict(self):
+        """Remove least recently used documents until the cache is under its size limit."""
+        documents = []
+        total_size = 0
+        
+        with os.scandir(self.cache_folder) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    last_access = entry.stat().st_mtime
+                except OSError:
+                    continue
+                documents.append((last_access, entry.path, size))
+                total_size += size
+        
+        documents.sort()
+        for _, path, size in documents:
+            if total_size <= self.max_size_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+            logger.info(f"Evicted word boxes of document {Path(path).name}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        documents = sum(1 for entry in os.scandir(self.cache_folder) if entry.is_dir())
+        return {
+            'documents': documents,
+            'hits': self.hits,
+            'misses': self.misses,
+            'max_size_bytes': self.max_size_bytes
+        }
+    
+    def _page_path(self, document_hash: str, page_num: int) -> Path:
+        """Path of the cached words of a page."""
+        return self.cache_folder / document_hash / f"{page_num}.npz"
\ No newline at end of file
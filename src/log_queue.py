@@ -0,0 +1,137 @@
+import os
+import sys
+import fcntl
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler for a log file several processes append to.
+    
+    Rotation renames every backup, so two processes rotating at once would
+    shift each other's files. Rotating and reopening after a rotation hold a
+    lock on '<log file>.lock', and a process that gets the lock after another
+    one rotated reopens the new file instead of rotating again.
+    """
+    
+    def emit(self, record: logging.LogRecord):
+        """Reopen the file if another process rotated it, then write the record."""
+        if self.stream is not None and self._rotated_elsewhere():
+            # Wait for a rotation in progress, so the new file is not renamed away
+            with self._rotation_lock(fcntl.LOCK_SH):
+                self.stream.close()
+                self.stream = self._open()
+        super().emit(record)
+    
+    def doRollover(self):
+        """Rotate the files, unless another process did while this one waited for the lock."""
+        with self._rotation_lock(fcntl.LOCK_EX):
+            if self.stream is not None and self._rotated_elsewhere():
+                self.stream.close()
+                self.stream = self._open()
+            else:
+                super().doRollover()
+    
+    def _rotated_elsewhere(self) -> bool:
+        """Whether the open stream is no longer the file at the log path."""
+        try:
+            return not os.path.samestat(os.stat(self.baseFilename), os.fstat(self.stream.fileno()))
+        except OSError:
+            return True
+    
+    @contextmanager
+    def _rotation_lock(self, operation: int) -> Iterator[None]:
+        """Hold the lock file shared by all processes writing this log."""
+        with open(f"{self.baseFilename}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue stays in this process, so the record needs no flattening
+        return record
+
+class QueueLogging:
+    """Log through an in-process queue; handlers write from a background thread."""
+    
+    def __init__(self, log_file: Optional[str] = 'mcq_extractor.log', level: str = 'INFO',
+                 fmt: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        """
+        Initialize queue logging.
+        
+        Args:
+            log_file: Log file path, or None to log to stderr only
+            level: Root logger level
+            fmt: Record format of the file and stderr handlers
+            max_bytes: Size at which the log file is rotated; 0 never rotates
+            backup_count: Rotated log files kept
+        """
+        self.level = level
+        formatter = logging.Formatter(fmt)
+        
+        self.handlers: List[logging.Handler] = [logging.StreamHandler()]
+        if log_file:
+            self.handlers.append(SharedRotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+            ))
+        for handler in self.handlers:
+            handler.setFormatter(formatter)
+        
+        self.queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def install(self):
+        """Route all records through the queue and start the listener thread of this process."""
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        
+        self.start()
+        atexit.register(self.stop)
+        # A forked child inherits the queue but not the thread draining it
+        os.register_at_fork(after_in_child=self._restart_in_child)
+    
+    def start(self):
+        """Start the listener thread, unless this process already runs one."""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                return
+            self._listener = QueueListener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+    
+    def stop(self):
+        """Write out queued records and stop the listener thread of this process."""
+        with self._lock:
+            if self._listener is None or self._pid != os.getpid():
+                return
+            self._listener.stop()
+            self._listener = None
+        for handler in self.handlers:
+            handler.flush()
+    
+    def _restart_in_child(self):
+        """After fork: drop the parent's queue and listener, which may be mid-operation, and start afresh."""
+        self._lock = threading.Lock()
+        self._listener = None
+        self.queue_handler.queue = queue.SimpleQueue()
+        try:
+            self.start()
+        except RuntimeError as e:
+            # Threads cannot start while the interpreter shuts down
+            sys.stderr.write(f"Could not start the log listener: {e}\n")
\ No newline at end of file
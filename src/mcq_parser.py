@@ -1,7 +1,13 @@
 import re
+import time
+import bisect
 import logging
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Dict, Optional, Sequence, Tuple
+from dataclasses import dataclass, field, replace
 
 logger = logging.getLogger(__name__)
 
@@ -22,20 +28,56 @@ class MCQuestion:
     topic: Optional[str] = None
     confidence: float = 0.0
     page_number: Optional[int] = None
+    question_number: Optional[int] = None  # Number printed in the source, used to join answer keys
+    duplicate_of: Optional[str] = None  # '<document>:<question id>' of an earlier near-duplicate
+
+@dataclass
+class RawParse:
+    """Every question block of a document parsed before validation, independent of parser settings."""
+    blocks: List[Tuple[int, MCQuestion]] = field(default_factory=list)  # (text position, question)
+    answer_keys: List[Tuple[int, List[Tuple[int, str]]]] = field(default_factory=list)
 
 class MCQParser:
     """Parse multiple-choice questions from extracted text."""
     
-    def __init__(self, min_options: int = 2, max_options: int = 6):
+    MIN_ANSWER_KEY_ENTRIES = 3  # Consecutive 'N. (x)' entries that make an answer-key table
+    RAW_PARSE_VERSION = 3  # Bump when block splitting or block parsing changes, to invalidate stored parses
+    PAGE_BREAK = '\f'  # Separates the pages of extracted text
+    
+    def __init__(self, min_options: int = 2, max_options: int = 6, workers: int = 0,
+                 parallel_min_blocks: int = 4000, chunk_blocks: int = 500,
+                 min_confidence: float = 0.1, block_time_budget: float = 0.5,
+                 document_time_budget: float = 60.0, max_regex_block_chars: int = 50000):
         """
         Initialize MCQ parser.
         
         Args:
             min_options: Minimum number of options for a valid MCQ
             max_options: Maximum number of options for a valid MCQ
+            workers: Processes used to parse question blocks; 0 or 1 parses serially
+            parallel_min_blocks: Documents with fewer blocks are parsed serially,
+                where process overhead would outweigh the gain
+            chunk_blocks: Question blocks sent to a worker per task
+            min_confidence: Minimum parse confidence for a valid MCQ
+            block_time_budget: Seconds one block may take; once a block exceeds
+                it, the rest of the document is parsed with the linear scanner
+            document_time_budget: Seconds block parsing may take per document
+                before the rest of it is parsed with the linear scanner
+            max_regex_block_chars: Longer blocks always use the linear scanner
         """
         self.min_options = min_options
         self.max_options = max_options
+        self.min_confidence = min_confidence
+        self.block_time_budget = block_time_budget
+        self.document_time_budget = document_time_budget
+        self.max_regex_block_chars = max_regex_block_chars
+        self.workers = workers
+        self.parallel_min_blocks = parallel_min_blocks
+        self.chunk_blocks = chunk_blocks
+        
+        # Created on first parallel parse and reused across documents
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
         
         # Compile regex patterns for efficiency
         self._compile_patterns()
@@ -54,12 +96,19 @@ class MCQParser:
             re.MULTILINE | re.IGNORECASE
         )
         
-        # Pattern for MCQ options (A, B, C, D with various formats)
+        # Pattern for MCQ options (A, B, C, D with various formats); option text
+        # is stripped afterwards, so leading whitespace is not matched separately,
+        # which would let the two quantifiers split a whitespace run every way
         self.option_pattern = re.compile(
-            r'\(([a-dA-D])\)\s*([^(]+?)(?=\([a-dA-D]\)|\n\s*\d+\.|\n\s*(?:Answer|Ans)|\Z)',
+            r'\(([a-dA-D])\)([^(]+?)(?=\([a-dA-D]\)|\n\s*\d+\.|\n\s*(?:Answer|Ans)|\Z)',
             re.DOTALL
         )
         
+        # Option markers alone, for the linear scanner
+        self.option_marker_pattern = re.compile(r'\(([a-dA-D])\)')
+        self.whitespace_run_pattern = re.compile(r'\s*')
+        self.option_end_pattern = re.compile(r'\d+\.|Answer|Ans')
+        
         # Pattern to detect question text (before options)
         self.question_text_pattern = re.compile(
             r'(?:Q\.?\s*)?(?:\d+\.?\s*(?:\)|\.|\s)?)'  # Question number
@@ -69,79 +118,399 @@ class MCQParser:
         
         # Pattern for answer keys
         self.answer_pattern = re.compile(
-            r'(?:Answer|Ans)\.?\s*[:=\-\s]*([A-Z])\b',
+            r'(?:Answer|Ans)\.?[:=\-\s]*\(?([A-Z])\b',
             re.IGNORECASE
         )
+        
+        # Pattern for one entry of an answer-key table, e.g. '12. (c)' or '12) (c)'
+        self.answer_key_entry_pattern = re.compile(
+            r'(?<![\w.])(\d{1,4})\s*[.)]\s*\(([a-dA-D])\)'
+        )
+        
+        # Separators allowed between entries of one answer-key table
+        self.answer_key_gap_pattern = re.compile(r'[\s,;|]*')
+        
+        # Leading question number of a block
+        self.block_number_pattern = re.compile(r'\s*(?:Q\.?\s*|Question\s+)?(\d+)', re.IGNORECASE)
     
-    def parse_mcqs(self, text: str) -> List[MCQuestion]:
+    def parse_mcqs(self, text: str, page_numbers: Optional[Sequence[int]] = None) -> List[MCQuestion]:
         """
         Parse MCQs from text content.
         
         Args:
             text: Input text content
+            page_numbers: Page number of each PAGE_BREAK-separated page, see parse_raw
             
         Returns:
             List of parsed MCQ questions
         """
+        return self.finalize(self.parse_raw(text, page_numbers))
+    
+    def parse_raw(self, text: str, page_numbers: Optional[Sequence[int]] = None) -> RawParse:
+        """
+        Split text into question blocks and parse each one, without validating.
+        
+        The result does not depend on the parser settings, so it can be stored
+        and passed to finalize again when the settings change.
+        
+        Questions are given the page their block starts on when the text is
+        split into pages by PAGE_BREAK.
+        
+        Args:
+            text: Input text content
+            page_numbers: 1-based page number of each page of the text, for
+                extracts of selected pages; defaults to 1, 2, ...
+        
+        Returns:
+            Parsed blocks and answer-key tables
+        """
         try:
             logger.info("Starting MCQ parsing")
             
-            # Clean and normalize text
-            cleaned_text = self._clean_text(text)
+            # Clean pages separately to know where each starts; joined, they
+            # equal the whole text cleaned at once
+            pages = text.split(self.PAGE_BREAK)
+            cleaned_pages = [self._clean_text(page) for page in pages]
+            page_starts = []
+            position = 0
+            for cleaned_page in cleaned_pages:
+                page_starts.append(position)
+                if cleaned_page:
+                    position += len(cleaned_page) + 1
+            cleaned_text = '\n'.join(page for page in cleaned_pages if page)
+            
+            # Take answer-key tables out before splitting, so their entries
+            # are not mistaken for question blocks
+            cleaned_text, answer_keys, page_starts = self._extract_answer_keys(cleaned_text, page_starts)
             
             # Split text into potential question blocks
             question_blocks = self._split_into_question_blocks(cleaned_text)
             
-            mcqs = []
-            for i, block in enumerate(question_blocks, 1):
-                try:
-                    mcq = self._parse_single_mcq(block, i)
-                    if mcq and self._validate_mcq(mcq):
-                        mcqs.append(mcq)
-                        logger.debug(f"Successfully parsed MCQ {mcq.id}")
-                except Exception as e:
-                    logger.warning(f"Error parsing question block {i}: {str(e)}")
-                    continue
+            # Wall-clock deadline, so it holds across worker processes
+            deadline = time.time() + self.document_time_budget
+            if self.workers > 1 and len(question_blocks) >= self.parallel_min_blocks:
+                parsed = self._parse_blocks_parallel(cleaned_text, question_blocks, deadline)
+            else:
+                parsed = self._parse_blocks(
+                    ((i, block) for i, (_, block) in enumerate(question_blocks, 1)), deadline
+                )
             
-            logger.info(f"Successfully parsed {len(mcqs)} MCQs")
-            return mcqs
+            # Blocks are numbered from 1 in document order
+            blocks = [(question_blocks[i - 1][0], mcq) for i, mcq in parsed]
+            
+            if len(pages) > 1:
+                page_numbers = page_numbers or range(1, len(pages) + 1)
+                for position, mcq in blocks:
+                    # Last page starting at or before the block; empty pages share a start
+                    mcq.page_number = page_numbers[bisect.bisect_right(page_starts, position) - 1]
+            
+            return RawParse(blocks=blocks, answer_keys=answer_keys)
             
         except Exception as e:
             logger.error(f"Error during MCQ parsing: {str(e)}")
             raise
     
+    def finalize(self, raw: RawParse) -> List[MCQuestion]:
+        """
+        Validate parsed blocks against the current settings and resolve answer keys.
+        
+        Args:
+            raw: Result of parse_raw, possibly loaded from storage
+        
+        Returns:
+            List of valid MCQ questions, copied so callers may modify them
+        """
+        valid = [(position, mcq) for position, mcq in raw.blocks if self._validate_mcq(mcq)]
+        mcqs = [replace(mcq) for _, mcq in valid]
+        
+        if raw.answer_keys:
+            resolved = self._apply_answer_keys(mcqs, [position for position, _ in valid], raw.answer_keys)
+            logger.info(f"Resolved {resolved} answers from {len(raw.answer_keys)} answer-key sections")
+        
+        logger.info(f"Successfully parsed {len(mcqs)} MCQs")
+        return mcqs
+    
+    def close(self):
+        """Shut down the worker processes, if any were started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+    
+    def _parse_blocks(self, blocks, deadline: Optional[float] = None) -> List[Tuple[int, MCQuestion]]:
+        """
+        Parse question blocks without validating them, within the time budgets.
+        
+        A running regex cannot be interrupted, so budgets are checked between
+        blocks: after a block overruns, or past the deadline, the remaining
+        blocks are parsed with the linear scanner instead of the option regex.
+        
+        Args:
+            blocks: Iterable of (block number, block text)
+            deadline: time.time() after which the scanner is used
+        
+        Returns:
+            (block number, question) for each block with question text
+        """
+        parsed = []
+        scan_rest = False
+        for i, block in blocks:
+            started = time.time()
+            try:
+                mcq = self._parse_single_mcq(
+                    block, i, scan=scan_rest or len(block) > self.max_regex_block_chars
+                )
+                if mcq:
+                    parsed.append((i, mcq))
+            except Exception as e:
+                logger.warning("Error parsing question block %d: %s", i, e)
+                continue
+            
+            if not scan_rest:
+                finished = time.time()
+                if finished - started > self.block_time_budget:
+                    scan_rest = True
+                    logger.warning("Question block %d took %.2fs; scanning the remaining blocks linearly",
+                                   i, finished - started)
+                elif deadline is not None and finished > deadline:
+                    scan_rest = True
+                    logger.warning("Parsing time budget exhausted at block %d; "
+                                   "scanning the remaining blocks linearly", i)
+        return parsed
+    
+    def _parse_blocks_parallel(self, text: str, question_blocks: List[Tuple[int, str]],
+                               deadline: Optional[float] = None) -> List[Tuple[int, MCQuestion]]:
+        """
+        Parse question blocks in worker processes.
+        
+        The text is copied once into shared memory as UTF-8; each task carries
+        only block numbers and byte offsets. Chunks are merged in submission
+        order, so ids and ordering match a serial parse.
+        
+        Args:
+            text: Text the blocks were split from
+            question_blocks: (start position, block text) in document order
+            deadline: time.time() after which workers use the linear scanner
+        
+        Returns:
+            (block number, question) for each block with question text
+        """
+        encoded = text.encode('utf-8')
+        
+        # Character to byte offsets; identical for ASCII text
+        if len(encoded) == len(text):
+            spans = [(start, start + len(block)) for start, block in question_blocks]
+        else:
+            spans = []
+            char_pos = byte_pos = 0
+            for start, block in question_blocks:
+                byte_pos += len(text[char_pos:start].encode('utf-8'))
+                block_bytes = len(block.encode('utf-8'))
+                spans.append((byte_pos, byte_pos + block_bytes))
+                char_pos = start + len(block)
+                byte_pos += block_bytes
+        
+        tasks = [(i, start, end) for i, (start, end) in enumerate(spans, 1)]
+        chunks = [tasks[i:i + self.chunk_blocks] for i in range(0, len(tasks), self.chunk_blocks)]
+        
+        shm = SharedMemory(create=True, size=max(len(encoded), 1))
+        try:
+            shm.buf[:len(encoded)] = encoded
+            del encoded
+            
+            pool = self._get_pool()
+            futures = [
+                pool.submit(_parse_shared_chunk, shm.name, chunk, deadline,
+                            self.block_time_budget, self.max_regex_block_chars)
+                for chunk in chunks
+            ]
+            
+            parsed = []
+            for future in futures:
+                parsed.extend(future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+        
+        logger.info(f"Parsed {len(tasks)} blocks in {len(chunks)} chunks on {self.workers} processes")
+        return parsed
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the worker pool, starting it on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                # forkserver children do not inherit the web server's threads and locks
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+    
     def _clean_text(self, text: str) -> str:
-        """Clean and normalize text for better parsing."""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        """Clean and normalize text for better parsing, keeping line breaks."""
+        # Normalize line breaks
+        text = re.sub(r'\r\n?', '\n', text)
+        
+        # Remove extra whitespace within lines, then blank lines and line-end
+        # spaces; question and option splitting depend on the line breaks
+        text = re.sub(r'[^\S\n]+', ' ', text)
+        text = re.sub(r' ?\n\s*', '\n', text)
         
         # Fix common OCR errors
         text = re.sub(r'(?i)0ption', 'Option', text)
         text = re.sub(r'(?i)0uestion', 'Question', text)
         
-        # Normalize line breaks
-        text = re.sub(r'\r\n', '\n', text)
-        text = re.sub(r'\r', '\n', text)
-        
         return text.strip()
     
-    def _split_into_question_blocks(self, text: str) -> List[str]:
-        """Split text into individual question blocks."""
+    def _extract_answer_keys(self, text: str, offsets: Sequence[int] = ()
+                             ) -> Tuple[str, List[Tuple[int, List[Tuple[int, str]]]], List[int]]:
+        """
+        Find answer-key tables in one pass and cut them out of the text.
+        
+        A table is a run of at least MIN_ANSWER_KEY_ENTRIES 'N. (x)' entries
+        separated only by whitespace or list punctuation.
+        
+        Args:
+            text: Cleaned text
+            offsets: Sorted positions in the text (page starts) to translate
+        
+        Returns:
+            The text without answer-key tables, the tables as
+            (position in the returned text, [(question number, answer), ...]),
+            and the offsets translated to the returned text
+        """
+        tables = []
+        run: List[re.Match] = []
+        
+        def close_run():
+            if len(run) >= self.MIN_ANSWER_KEY_ENTRIES:
+                tables.append((run[0].start(), run[-1].end(),
+                               [(int(m.group(1)), m.group(2)) for m in run]))
+        
+        for match in self.answer_key_entry_pattern.finditer(text):
+            if run and not self.answer_key_gap_pattern.fullmatch(text, run[-1].end(), match.start()):
+                close_run()
+                run = []
+            run.append(match)
+        close_run()
+        
+        if not tables:
+            return text, [], list(offsets)
+        
+        pieces = []
+        answer_keys = []
+        cursor = 0
+        removed = 0
+        for start, end, entries in tables:
+            pieces.append(text[cursor:start])
+            # Tables are replaced by a line break
+            answer_keys.append((start - removed + len(answer_keys), entries))
+            removed += end - start
+            cursor = end
+        pieces.append(text[cursor:])
+        
+        # Offsets after a table move back by its length, less the line break
+        # replacing it; offsets inside a table move to where it was
+        shifted = []
+        for offset in offsets:
+            removed = 0
+            for i, (start, end, _) in enumerate(tables):
+                if offset < start:
+                    break
+                if offset < end:
+                    offset = start
+                    break
+                removed += end - start - 1
+            shifted.append(offset - removed)
+        
+        return '\n'.join(pieces), answer_keys, shifted
+    
+    def _apply_answer_keys(self, mcqs: List[MCQuestion], positions: List[int],
+                           answer_keys: List[Tuple[int, List[Tuple[int, str]]]]) -> int:
+        """
+        Fill missing answers from answer-key tables in a single merge pass.
+        
+        Question and key numbering may restart per chapter. Key entries form one
+        key section until a question number repeats or questions come between
+        two tables, so tables printed column by column (1, 11, 21, ..., 2, 12, ...)
+        or continued across pages stay one section, while keys printed after
+        chapters of continuously numbered questions do not merge. When questions
+        follow the first key, keys are printed after each chapter and a question
+        is answered by the first section after it; otherwise all keys are at the end of the book, questions are grouped into
+        chapters wherever their numbers drop, and sections pair with chapters in
+        order.
+        
+        Args:
+            mcqs: Parsed questions in document order
+            positions: Text position of each question
+            answer_keys: Tables returned by _extract_answer_keys
+        
+        Returns:
+            Number of answers filled in from the keys
+        """
+        # Key sections: (position, {question number: answer})
+        sections: List[Tuple[int, Dict[int, str]]] = []
+        questions_before = 0
+        for position, entries in answer_keys:
+            # Questions between the previous table and this one end the section
+            questions_until = bisect.bisect_left(positions, position)
+            if questions_until > questions_before:
+                sections.append((position, {}))
+            questions_before = questions_until
+            
+            for number, answer in entries:
+                if not sections or number in sections[-1][1]:
+                    sections.append((position, {}))
+                sections[-1][1][number] = answer
+        
+        # Key section answering each question
+        if bool(positions) and positions[-1] > sections[0][0]:
+            section_positions = [position for position, _ in sections]
+            targets = [bisect.bisect_left(section_positions, position) for position in positions]
+        else:
+            targets = []
+            chapter = 0
+            previous = None
+            for mcq in mcqs:
+                if mcq.question_number is not None:
+                    if previous is not None and mcq.question_number <= previous:
+                        chapter += 1
+                    previous = mcq.question_number
+                targets.append(chapter)
+        
+        resolved = 0
+        for mcq, target in zip(mcqs, targets):
+            if mcq.correct_answer or mcq.question_number is None or target >= len(sections):
+                continue
+            answer = sections[target][1].get(mcq.question_number)
+            if answer is None:
+                continue
+            
+            # Report the answer with the label as printed on the options
+            mcq.correct_answer = next(
+                (opt.label for opt in mcq.options if opt.label.lower() == answer.lower()), answer
+            )
+            resolved += 1
+        
+        return resolved
+    
+    def _split_into_question_blocks(self, text: str) -> List[Tuple[int, str]]:
+        """Split text into individual question blocks with their start positions."""
         # Find all question number positions
         question_matches = list(self.question_number_pattern.finditer(text))
         
         if not question_matches:
             # If no clear question numbers found, try alternative splitting
-            return self._alternative_split(text)
+            return [(0, block) for block in self._alternative_split(text)]
         
         blocks = []
         for i, match in enumerate(question_matches):
             start = match.start()
             end = question_matches[i + 1].start() if i + 1 < len(question_matches) else len(text)
             
-            block = text[start:end].strip()
+            raw_block = text[start:end]
+            block = raw_block.strip()
             if block:
-                blocks.append(block)
+                blocks.append((start + len(raw_block) - len(raw_block.lstrip()), block))
         
         return blocks
     
@@ -163,28 +532,29 @@ class MCQParser:
         
         return blocks
     
-    def _parse_single_mcq(self, block: str, question_id: int) -> Optional[MCQuestion]:
-        """Parse a single MCQ from a text block."""
+    def _parse_single_mcq(self, block: str, question_id: int, scan: bool = False) -> Optional[MCQuestion]:
+        """Parse a single MCQ from a text block; scan selects the linear option scanner."""
         
         # Extract question text
         question_text = self._extract_question_text(block)
         if not question_text:
             return None
         
-        # Extract options
-        options = self._extract_options(block)
-        if len(options) < self.min_options or len(options) > self.max_options:
-            return None
+        # Extract options; their number is checked at validation
+        options = self._scan_options(block) if scan else self._extract_options(block)
         
         # Extract answer if present
         correct_answer = self._extract_answer(block)
         
+        number_match = self.block_number_pattern.match(block)
+        
         return MCQuestion(
             id=f"Q{question_id:03d}",
             question_text=question_text,
             options=options,
             correct_answer=correct_answer,
-            confidence=self._calculate_confidence(question_text, options)
+            confidence=self._calculate_confidence(question_text, options),
+            question_number=int(number_match.group(1)) if number_match else None
         )
     
     def _extract_question_text(self, block: str) -> Optional[str]:
@@ -231,6 +601,44 @@ class MCQParser:
         
         return options
     
+    def _scan_options(self, block: str) -> List[MCQOption]:
+        """
+        Extract options like _extract_options, in time linear in the block length.
+        
+        Each option runs from its '(x)' marker to the next '(' if that starts
+        another marker, or to a line starting with a number or an answer, or to
+        the end of the block. As with option_pattern, an option whose text
+        reaches any other '(' is dropped.
+        """
+        options = []
+        for marker in self.option_marker_pattern.finditer(block):
+            start = marker.end()
+            stop = block.find('(', start)
+            limit = len(block) if stop < 0 else stop
+            
+            # Earliest line break past the first character, and before the limit,
+            # that starts a numbered line or an answer
+            end = None
+            newline = block.find('\n', start + 1, limit)
+            while newline >= 0:
+                # Line breaks within one whitespace run all lead to the same text
+                line_start = self.whitespace_run_pattern.match(block, newline, limit).end()
+                if self.option_end_pattern.match(block, line_start, limit):
+                    end = newline
+                    break
+                newline = block.find('\n', line_start, limit)
+            
+            if end is None:
+                if stop >= 0 and not self.option_marker_pattern.match(block, stop):
+                    continue
+                end = limit
+            
+            text = block[start:end].strip()
+            if text and len(text) > 1:  # Minimum option length
+                options.append(MCQOption(label=marker.group(1), text=text))
+        
+        return options
+    
     def _extract_answer(self, block: str) -> Optional[str]:
         """Extract correct answer from block."""
         answer_match = self.answer_pattern.search(block)
@@ -276,4 +684,38 @@ class MCQParser:
         if len(set(option_texts)) != len(option_texts):
             return False
         
-        return mcq.confidence >= 0.1  # Reduced from 0.3 for testing
\ No newline at end of file
+        return mcq.confidence >= self.min_confidence
+
+# Parser reused by each worker process; block parsing does not depend on its settings
+_worker_parser: Optional[MCQParser] = None
+
+def _parse_shared_chunk(shm_name: str, tasks: List[Tuple[int, int, int]], deadline: Optional[float] = None,
+                        block_time_budget: float = 0.5,
+                        max_regex_block_chars: int = 50000) -> List[Tuple[int, MCQuestion]]:
+    """
+    Parse a chunk of question blocks read from shared memory (runs in a worker process).
+    
+    Args:
+        shm_name: Name of the shared memory segment holding the UTF-8 text
+        tasks: (block number, byte start, byte end) per block
+        deadline: time.time() after which the linear scanner is used
+        block_time_budget: Seconds one block may take, see MCQParser
+        max_regex_block_chars: Longer blocks use the linear scanner
+    
+    Returns:
+        (block number, question) for each block with question text
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = MCQParser()
+    parser = _worker_parser
+    parser.block_time_budget = block_time_budget
+    parser.max_regex_block_chars = max_regex_block_chars
+    
+    # Workers share the parent's resource tracker; the parent unlinks the segment
+    shm = SharedMemory(name=shm_name)
+    try:
+        blocks = ((i, bytes(shm.buf[start:end]).decode('utf-8')) for i, start, end in tasks)
+        return parser._parse_blocks(blocks, deadline)
+    finally:
+        shm.close()
\ No newline at end of file
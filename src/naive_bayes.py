@@ -0,0 +1,194 @@
+import re
+import hashlib
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into the features the model is trained on: words and word bigrams.
+    
+    Args:
+        text: Question text with its options
+    
+    Returns:
+        Lowercase unigrams followed by bigrams
+    """
+    words = _NON_ALNUM.sub(' ', text.lower()).split()
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over word and bigram counts, stored as compact NumPy arrays."""
+    
+    def __init__(self, vocabulary: List[str], labels: List[Tuple[str, str]],
+                 log_prior: np.ndarray, log_likelihood: np.ndarray, version: Optional[str] = None):
+        """
+        Initialize model from trained arrays.
+        
+        Args:
+            vocabulary: Feature strings, one per row of log_likelihood
+            labels: (subject, topic) per class
+            log_prior: float32 array of log P(class)
+            log_likelihood: float32 array (features x classes) of log P(feature | class)
+            version: Identifier of the trained model, used to key caches
+        """
+        self.vocabulary = vocabulary
+        self.labels = labels
+        self.log_prior = log_prior.astype(np.float32)
+        self.log_likelihood = log_likelihood.astype(np.float32)
+        self.version = version or hashlib.sha256(self.log_likelihood.tobytes()).hexdigest()[:12]
+        
+        self._feature_index: Dict[str, int] = {feature: i for i, feature in enumerate(vocabulary)}
+    
+    @classmethod
+    def train(cls, texts: Iterable[str], labels: Iterable[Tuple[str, str]], alpha: float = 1.0,
+              min_count: int = 2, max_features: int = 50000) -> 'NaiveBayesModel':
+        """
+        Train a model from labeled questions.
+        
+        Args:
+            texts: Question texts with their options
+            labels: (subject, topic) of each question
+            alpha: Additive (Laplace) smoothing
+            min_count: Features seen fewer times in the corpus are dropped
+            max_features: Only the most frequent features are kept
+        
+        Returns:
+            Trained model
+        
+        Raises:
+            ValueError: If there is nothing to train on
+        """
+        documents = [Counter(tokenize(text)) for text in texts]
+        labels = [tuple(label) for label in labels]
+        if not documents or len(documents) != len(labels):
+            raise ValueError('Training needs one label per question and at least one question')
+        
+        corpus_counts = Counter()
+        for document in documents:
+            corpus_counts.update(document)
+        vocabulary = [
+            feature for feature, count in corpus_counts.most_common(max_features) if count >= min_count
+        ]
+        if not vocabulary:
+            raise ValueError('No feature occurs often enough to train on')
+        
+        classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(classes)}
+        feature_index = {feature: i for i, feature in enumerate(vocabulary)}
+        
+        # Feature counts per class, accumulated from (feature, class, count) triples
+        feature_ids, class_ids, counts = [], [], []
+        for document, label in zip(documents, labels):
+            for feature, count in document.items():
+                i = feature_index.get(feature)
+                if i is not None:
+                    feature_ids.append(i)
+                    class_ids.append(class_index[label])
+                    counts.append(count)
+        
+        class_feature_counts = np.zeros((len(vocabulary), len(classes)), dtype=np.float64)
+        np.add.at(class_feature_counts, (np.array(feature_ids), np.array(class_ids)), np.array(counts))
+        
+        smoothed = class_feature_counts + alpha
+        log_likelihood = np.log(smoothed / smoothed.sum(axis=0, keepdims=True))
+        
+        class_sizes = np.bincount([class_index[label] for label in labels], minlength=len(classes))
+        log_prior = np.log(class_sizes / class_sizes.sum())
+        
+        logger.info(f"Trained naive Bayes model on {len(documents)} questions: "
+                    f"{len(vocabulary)} features, {len(classes)} classes")
+        return cls(vocabulary, classes, log_prior, log_likelihood)
+    
+    @classmethod
+    def load(cls, model_path: Path) -> 'NaiveBayesModel':
+        """
+        Load a model saved with save.
+        
+        Args:
+            model_path: Path of the .npz model file
+        
+        Returns:
+            Loaded model
+        """
+        data = Path(model_path).read_bytes()
+        with np.load(model_path, allow_pickle=False) as arrays:
+            model = cls(
+                vocabulary=arrays['vocabulary'].tolist(),
+                labels=list(zip(arrays['subjects'].tolist(), arrays['topics'].tolist())),
+                log_prior=arrays['log_prior'],
+                log_likelihood=arrays['log_likelihood'],
+                version=hashlib.sha256(data).hexdigest()[:12]
+            )
+        logger.info(f"Loaded naive Bayes model {model_path} (version {model.version})")
+        return model
+    
+    def save(self, model_path: Path):
+        """
+        Save the model; log-likelihoods are stored as float16 to keep the file small.
+        
+        Args:
+            model_path: Path of the .npz model file
+        """
+        with open(model_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                vocabulary=np.array(self.vocabulary, dtype=str),
+                subjects=np.array([subject for subject, _ in self.labels], dtype=str),
+                topics=np.array([topic for _, topic in self.labels], dtype=str),
+                log_prior=self.log_prior,
+                log_likelihood=self.log_likelihood.astype(np.float16)
+            )
+    
+    def predict(self, texts: List[str]) -> List[Tuple[Optional[Tuple[str, str]], float]]:
+        """
+        Classify a batch of questions with one sparse product against the log-likelihood matrix.
+        
+        Args:
+            texts: Question texts with their options
+        
+        Returns:
+            Per question, the most probable (subject, topic) and its posterior
+            probability, or (None, 0.0) if the question has no known feature
+        """
+        feature_ids: List[int] = []
+        offsets = [0]
+        for text in texts:
+            feature_ids.extend(
+                i for i in (self._feature_index.get(feature) for feature in tokenize(text)) if i is not None
+            )
+            offsets.append(len(feature_ids))
+        
+        offsets = np.array(offsets)
+        known = np.diff(offsets) > 0
+        scores = np.tile(self.log_prior, (len(texts), 1))
+        
+        if feature_ids:
+            # Sum the rows of each question's features; questions without features are skipped
+            rows = self.log_likelihood[np.array(feature_ids)]
+            scores[known] += np.add.reduceat(rows, offsets[:-1][known], axis=0)
+        
+        # Posterior probabilities, stabilized by subtracting each row's maximum
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        
+        best = probabilities.argmax(axis=1)
+        return [
+            (self.labels[b], float(probabilities[i, b])) if known[i] else (None, 0.0)
+            for i, b in enumerate(best)
+        ]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get model statistics."""
+        return {
+            'version': self.version,
+            'features': len(self.vocabulary),
+            'classes': len(self.labels)
+        }
\ No newline at end of file
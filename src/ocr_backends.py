@@ -0,0 +1,129 @@
+import os
+import logging
+import subprocess
+import threading
+import pytesseract
+import numpy as np
+
+try:
+    import tesserocr
+except ImportError:  # Optional: requires the tesseract C++ library at build time
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+class OCRBackend:
+    """Interface for OCR engines that read raw 8-bit grayscale pixels."""
+    
+    name = 'base'
+    
+    def __init__(self, languages: str = 'eng'):
+        """
+        Initialize OCR backend.
+        
+        Args:
+            languages: Tesseract language codes, e.g. 'eng' or 'eng+hin'
+        """
+        self.languages = languages
+    
+    def recognize(self, gray: np.ndarray, psm: int = 6) -> str:
+        """
+        Recognize text in a grayscale image.
+        
+        Args:
+            gray: 2-D uint8 image
+            psm: Tesseract page segmentation mode
+        
+        Returns:
+            Recognized text
+        """
+        raise NotImplementedError
+
+class PytesseractBackend(OCRBackend):
+    """Run the tesseract executable configured for pytesseract, one process per page."""
+    
+    name = 'pytesseract'
+    
+    def recognize(self, gray: np.ndarray, psm: int = 6) -> str:
+        """Stream the pixels to tesseract's stdin as a binary PGM, without temp files."""
+        pixels = np.ascontiguousarray(gray)
+        height, width = pixels.shape
+        header = f"P5\n{width} {height}\n255\n".encode('ascii')
+        
+        process = subprocess.Popen(
+            [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout',
+             '-l', self.languages, '--psm', str(psm)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        process.stdin.write(header)
+        stdout, stderr = process.communicate(memoryview(pixels).cast('B'))
+        
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8', 'replace').strip())
+        
+        return stdout.decode('utf-8', 'replace')
+
+class TesserocrBackend(OCRBackend):
+    """In-process tesseract engine that loads language data once and is reused across pages."""
+    
+    name = 'tesserocr'
+    
+    def __init__(self, languages: str = 'eng'):
+        """
+        Initialize in-process OCR backend.
+        
+        Engines are created lazily, one per thread (the C-API is not thread-safe)
+        and per process, so an instance built before a fork is safe to use in workers.
+        
+        Args:
+            languages: Tesseract language codes
+        """
+        if tesserocr is None:
+            raise ImportError('tesserocr is not installed')
+        
+        super().__init__(languages)
+        self._local = threading.local()
+    
+    def recognize(self, gray: np.ndarray, psm: int = 6) -> str:
+        """Hand the pixel buffer directly to the engine."""
+        pixels = np.ascontiguousarray(gray)
+        height, width = pixels.shape
+        
+        api = self._engine()
+        api.SetPageSegMode(psm)
+        api.SetImageBytes(pixels.tobytes(), width, height, 1, width)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+    
+    def _engine(self):
+        """Return this thread's engine, creating it on first use in this process."""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            logger.info(f"Loading tesseract language data '{self.languages}' in process {pid}")
+            self._local.api = tesserocr.PyTessBaseAPI(lang=self.languages)
+            self._local.pid = pid
+        return self._local.api
+
+def create_ocr_backend(name: str = 'auto', languages: str = 'eng') -> OCRBackend:
+    """
+    Create an OCR backend by name.
+    
+    Args:
+        name: 'tesserocr', 'pytesseract', or 'auto' to prefer the in-process engine
+        languages: Tesseract language codes
+    
+    Returns:
+        OCR backend instance
+    """
+    if name in ('auto', 'tesserocr'):
+        if tesserocr is not None:
+            return TesserocrBackend(languages)
+        if name == 'tesserocr':
+            logger.warning("tesserocr is not installed, falling back to pytesseract")
+    
+    elif name != 'pytesseract':
+        raise ValueError(f"Unknown OCR backend: {name}")
+    
+    return PytesseractBackend(languages)
\ No newline at end of file
@@ -1,117 +1,566 @@
+import time
+import inspect
 import logging
 import io
-from typing import Optional, List
+import mmap
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, Optional, List, Sequence, Tuple
 from pathlib import Path
 import pdfplumber
-import pytesseract
-from PIL import Image
+import pypdfium2 as pdfium
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
 import cv2
 import numpy as np
 
+from .ocr_backends import create_ocr_backend
+from .layout import ColumnLayout, PageWords, WordBoxCache
+
 logger = logging.getLogger(__name__)
 
+# Lazy page iteration builds pdfplumber pages directly, which is not public API;
+# pdfplumber versions with another Page signature fall back to pdf.pages
+_LAZY_PAGES = {'page_number', 'initial_doctop'} <= set(inspect.signature(pdfplumber.page.Page).parameters)
+
+def parse_page_range(spec: str, num_pages: int) -> List[int]:
+    """
+    Parse a page range such as '1-5, 8, 12-' into sorted page numbers.
+    
+    Args:
+        spec: Comma-separated 1-based pages and inclusive ranges; open-ended
+            ranges run to the first or last page
+        num_pages: Number of pages in the document
+    
+    Returns:
+        Sorted, de-duplicated 1-based page numbers
+    
+    Raises:
+        ValueError: If the range is malformed or selects no pages
+    """
+    pages = set()
+    for part in spec.replace(' ', '').split(','):
+        if not part:
+            continue
+        
+        start, sep, end = part.partition('-')
+        if not (start or end) or not (start or '1').isdigit() or not (end or '1').isdigit():
+            raise ValueError(f"Invalid page range: {part}")
+        
+        first = int(start) if start else 1
+        last = (int(end) if end else num_pages) if sep else first
+        if first < 1 or first > last:
+            raise ValueError(f"Invalid page range: {part}")
+        
+        pages.update(range(first, min(last, num_pages) + 1))
+    
+    if not pages:
+        raise ValueError(f"Page range '{spec}' selects no pages of a {num_pages}-page document")
+    
+    return sorted(pages)
+
+def sample_pages(pages: Sequence[int], sample_size: int) -> List[int]:
+    """
+    Pick pages spread evenly across a selection, always including the first.
+    
+    Args:
+        pages: Candidate page numbers in order
+        sample_size: Maximum number of pages to pick
+    
+    Returns:
+        Selected page numbers in order
+    """
+    if len(pages) <= sample_size:
+        return list(pages)
+    
+    step = len(pages) / sample_size
+    return [pages[int(i * step)] for i in range(sample_size)]
+
+@dataclass
+class PDFExtraction:
+    """Text of a PDF and how it was obtained."""
+    text: str  # One entry per selected page, separated by PDFExtractor.PAGE_BREAK
+    num_pages: int = 0  # Pages in the whole document
+    ocr_pages: List[int] = field(default_factory=list)  # Pages whose text came from OCR
+
 class PDFExtractor:
     """Extract text from PDF files using pdfplumber with OCR fallback."""
     
-    def __init__(self, ocr_languages: str = 'eng', dpi: int = 300):
+    # Adaptive OCR tuning
+    PREVIEW_DPI = 100  # Resolution of the preview used to find text regions
+    MIN_DPI = 150
+    MAX_DPI = 400
+    TARGET_GLYPH_PX = 24  # Rendered glyph height tesseract reads most reliably
+    BLANK_INK_RATIO = 0.0005  # Pages with less ink than this are skipped
+    IMAGE_INK_RATIO = 0.6  # Regions denser than this are images, not text
+    MIN_REGION_INK = 20  # Ink pixels below which a region is a speck
+    MAX_OCR_REGIONS = 12  # Above this, OCR the union of all regions instead
+    
+    LAYOUT_MODES = ('plain', 'columns')
+    PAGE_BREAK = '\f'  # Between the pages of extracted text, so parsed questions keep their page
+    
+    def __init__(self, ocr_languages: str = 'eng', dpi: int = 300, ocr_backend: str = 'auto',
+                 adaptive_ocr: bool = False, use_mmap: bool = False, layout_mode: str = 'plain',
+                 word_cache: Optional[WordBoxCache] = None):
         """
         Initialize PDF extractor.
         
         Args:
             ocr_languages: Languages for OCR processing
             dpi: DPI for image conversion
+            ocr_backend: OCR engine ('tesserocr', 'pytesseract' or 'auto')
+            adaptive_ocr: Skip blank pages and OCR only text regions, at a DPI
+                chosen from the estimated glyph height
+            use_mmap: Parse the PDF from a read-only memory map instead of
+                buffered file reads
+            layout_mode: 'plain' for pdfplumber's text order, or 'columns' to
+                detect column gutters and read each column top to bottom
+            word_cache: Cache of per-page word boxes used in 'columns' mode, so
+                documents seen before skip PDF layout analysis
         """
+        if layout_mode not in self.LAYOUT_MODES:
+            raise ValueError(f"Unknown layout mode: {layout_mode}")
+        
         self.ocr_languages = ocr_languages
         self.dpi = dpi
+        self.adaptive_ocr = adaptive_ocr
+        self.use_mmap = use_mmap
+        self.layout_mode = layout_mode
+        self.word_cache = word_cache
+        self.column_layout = ColumnLayout()
+        
+        # Long-lived engine, reused across pages and requests
+        self.ocr = create_ocr_backend(ocr_backend, ocr_languages)
         
-    def extract_text(self, pdf_path: Path) -> str:
+    def extract_text(self, pdf_path: Path, use_ocr: bool = True,
+                     pages: Optional[Sequence[int]] = None, document_hash: Optional[str] = None) -> str:
         """
         Extract text from PDF file.
         
         Args:
             pdf_path: Path to PDF file
+            use_ocr: Fall back to OCR when the PDF has too little embedded text
+            pages: 1-based page numbers to extract, or None for all pages
+            document_hash: SHA-256 of the file, used to key cached word boxes
             
         Returns:
-            Extracted text content
+            Extracted text content, one entry per selected page (empty for
+            pages without text) separated by PAGE_BREAK
             
+        Raises:
+            Exception: If text extraction fails
+        """
+        return self.extract(pdf_path, use_ocr, pages, document_hash).text
+    
+    def extract(self, pdf_path: Path, use_ocr: bool = True,
+                pages: Optional[Sequence[int]] = None, document_hash: Optional[str] = None) -> PDFExtraction:
+        """
+        Extract text from PDF file, reporting which pages were OCR'd.
+        
+        Args:
+            pdf_path: Path to PDF file
+            use_ocr: Fall back to OCR when the PDF has too little embedded text
+            pages: 1-based page numbers to extract, or None for all pages
+            document_hash: SHA-256 of the file, used to key cached word boxes
+        
+        Returns:
+            The extracted text, as from extract_text, and the pages OCR'd
+        
         Raises:
             Exception: If text extraction fails
         """
         try:
             logger.info(f"Extracting text from {pdf_path}")
+            ocr_pages = []
             
-            # First try pdfplumber for text extraction
-            text = self._extract_with_pdfplumber(pdf_path)
-            
-            # If pdfplumber returns insufficient text, try OCR
-            if len(text.strip()) < 100:
-                logger.info("Insufficient text from pdfplumber, trying OCR")
-                text = self._extract_with_ocr(pdf_path)
+            # Open the file once and share it between text extraction and OCR
+            with self._open_pdf(pdf_path) as (stream, data):
+                # First try pdfplumber for text extraction
+                text, num_pages = self._extract_with_pdfplumber(data, pages, document_hash)
                 
+                # If pdfplumber returns insufficient text, try OCR
+                if use_ocr and len(text.strip()) < 100:
+                    logger.info("Insufficient text from pdfplumber, trying OCR")
+                    text, ocr_pages = self._extract_with_ocr(stream, pages)
+            
+            if self.word_cache is not None and document_hash:
+                self.word_cache.evict()
+            
             logger.info(f"Successfully extracted {len(text)} characters")
-            return text
+            return PDFExtraction(text, num_pages, ocr_pages)
             
         except Exception as e:
             logger.error(f"Error extracting text from {pdf_path}: {str(e)}")
             raise
     
-    def _extract_with_pdfplumber(self, pdf_path: Path) -> str:
-        """Extract text using pdfplumber."""
+    def preview(self, pdf_path: Path, sample_size: int = 5, use_ocr: bool = True,
+                ocr_sample_size: int = 2, pages: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Extract a small, evenly spread sample of pages and time it.
+        
+        The sample's embedded text decides whether the full job would need OCR,
+        the same way extract_text does. If so, only the first few sampled pages
+        are OCR'd to measure the per-page OCR time.
+        
+        Args:
+            pdf_path: Path to PDF file
+            sample_size: Number of pages to extract text from
+            use_ocr: Whether the full job may fall back to OCR
+            ocr_sample_size: Number of sampled pages to OCR when OCR is needed
+            pages: 1-based page numbers the full job would process, or None for all
+        
+        Returns:
+            Dictionary with the sampled text, the pages it came from, whether OCR
+            is needed and the estimated extraction time for the full selection
+        """
+        num_pages = self.get_pdf_info(pdf_path)['num_pages']
+        selected = list(pages) if pages else list(range(1, num_pages + 1))
+        sampled = sample_pages(selected, sample_size)
+        
+        with self._open_pdf(pdf_path) as (stream, data):
+            started = time.perf_counter()
+            text, _ = self._extract_with_pdfplumber(data, sampled)
+            seconds_per_page = (time.perf_counter() - started) / max(len(sampled), 1)
+            
+            # Same threshold as extract_text, scaled to the sample
+            needs_ocr = use_ocr and len(text.strip()) < 100 * len(sampled) / max(len(selected), 1)
+            ocr_seconds_per_page = None
+            
+            if needs_ocr:
+                sampled = sampled[:ocr_sample_size]
+                started = time.perf_counter()
+                text, _ = self._extract_with_ocr(stream, sampled)
+                ocr_seconds_per_page = (time.perf_counter() - started) / max(len(sampled), 1)
+                seconds_per_page += ocr_seconds_per_page
+        
+        return {
+            'num_pages': num_pages,
+            'selected_pages': len(selected),
+            'sampled_pages': sampled,
+            'text': text,
+            'needs_ocr': needs_ocr,
+            'ocr_seconds_per_page': ocr_seconds_per_page,
+            'estimated_extraction_seconds': seconds_per_page * len(selected)
+        }
+    
+    @contextmanager
+    def _open_pdf(self, pdf_path: Path) -> Iterator[Tuple[BinaryIO, BinaryIO]]:
+        """
+        Open a PDF file once for all extraction passes.
+        
+        Args:
+            pdf_path: Path to PDF file
+        
+        Yields:
+            The open file (for pdfium) and the stream pdfplumber should parse,
+            which is a read-only memory map of the same file when use_mmap is set
+        """
+        with open(pdf_path, 'rb') as stream:
+            if not self.use_mmap:
+                yield stream, stream
+                return
+            
+            # Pages are faulted in from the page cache on demand and never copied
+            # onto the heap; pdfium keeps reading through the file object since
+            # mmap has no readinto()
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield stream, data
+    
+    def _iter_pages(self, pdf, pages: Optional[Sequence[int]] = None) -> Iterator:
+        """
+        Yield pdfplumber pages one at a time without keeping earlier pages alive.
+        
+        pdf.pages builds and retains a Page for every page in the document, and
+        pdfminer caches every object it resolves, including decoded content
+        streams. Pages are created lazily here and the object cache is dropped
+        after each page, so memory stays flat however long the document is.
+        Both rely on pdfplumber and pdfminer internals; without them the pages
+        of pdf.pages are used, each closed after use.
+        
+        Args:
+            pdf: Open pdfplumber PDF
+            pages: 1-based page numbers to yield, or None for all pages
+        
+        Yields:
+            Tuples of (page number, page); callers must close each page
+        """
+        wanted = set(pages) if pages else None
+        last_page = max(wanted) if wanted else None
+        object_cache = getattr(pdf.doc, '_cached_objs', None)
+        
+        if _LAZY_PAGES:
+            doctop = 0
+            
+            def build_pages():
+                nonlocal doctop
+                for page_num, page_obj in enumerate(PDFPage.create_pages(pdf.doc), 1):
+                    if last_page is not None and page_num > last_page:
+                        return
+                    page = pdfplumber.page.Page(pdf, page_obj, page_number=page_num, initial_doctop=doctop)
+                    doctop += page.height
+                    yield page
+            
+            all_pages = build_pages()
+        else:
+            all_pages = iter(pdf.pages)
+        
+        for page_num, page in enumerate(all_pages, 1):
+            try:
+                if last_page is not None and page_num > last_page:
+                    break
+                if wanted is None or page_num in wanted:
+                    yield page_num, page
+            finally:
+                page.close()
+                # Shared objects (fonts, page tree nodes) are cheap to re-resolve
+                if isinstance(object_cache, dict):
+                    object_cache.clear()
+    
+    def _count_pages(self, pdf) -> int:
+        """Number of pages of an open pdfplumber PDF, read from the page tree without building pages."""
+        try:
+            return int(resolve1(resolve1(pdf.doc.catalog['Pages'])['Count']))
+        except (KeyError, TypeError, ValueError):
+            return len(pdf.pages)
+    
+    def _extract_with_pdfplumber(self, stream: BinaryIO, pages: Optional[Sequence[int]] = None,
+                                 document_hash: Optional[str] = None) -> Tuple[str, int]:
+        """Extract text using pdfplumber, one page in memory at a time; returns the text and the page count."""
         text_content = []
         
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
+        # Not closed through pdf.close(), which would materialize every page;
+        # the stream belongs to the caller
+        pdf = pdfplumber.open(stream)
+        try:
+            for page_num, page in self._iter_pages(pdf, pages):
                 try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(page_text)
-                        logger.debug(f"Extracted text from page {page_num}")
+                    if self.layout_mode == 'columns':
+                        page_text = self._extract_columns(page, page_num, document_hash)
+                    else:
+                        page_text = page.extract_text()
+                    logger.debug("Extracted text from page %d", page_num)
                 except Exception as e:
-                    logger.warning(f"Error extracting text from page {page_num}: {str(e)}")
-                    continue
+                    logger.warning("Error extracting text from page %d: %s", page_num, e)
+                    page_text = ''
+                text_content.append(page_text or '')
+            num_pages = self._count_pages(pdf)
+        finally:
+            pdf.flush_cache()
+        
+        return self.PAGE_BREAK.join(text_content), num_pages
+    
+    def _extract_columns(self, page, page_num: int, document_hash: Optional[str]) -> str:
+        """
+        Extract a page's text in column reading order from its word boxes.
+        
+        Args:
+            page: pdfplumber page
+            page_num: 1-based page number
+            document_hash: SHA-256 of the file, or None to bypass the word cache
+        
+        Returns:
+            Page text
+        """
+        use_cache = self.word_cache is not None and document_hash is not None
+        words = self.word_cache.get(document_hash, page_num) if use_cache else None
+        
+        if words is None:
+            words = PageWords.from_pdfplumber(page.extract_words(), page.width)
+            if use_cache:
+                self.word_cache.put(document_hash, page_num, words)
         
-        return '\n'.join(text_content)
+        return self.column_layout.to_text(words)
     
-    def _extract_with_ocr(self, pdf_path: Path) -> str:
-        """Extract text using OCR with pytesseract."""
+    def _extract_with_ocr(self, stream: BinaryIO, pages: Optional[Sequence[int]] = None) -> Tuple[str, List[int]]:
+        """Extract text using OCR with the configured backend; returns the text and the pages OCR'd."""
         text_content = []
+        ocr_pages = []
         
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
+        stream.seek(0)
+        document = pdfium.PdfDocument(stream)
+        try:
+            page_numbers = pages or range(1, len(document) + 1)
+            for page_num in page_numbers:
+                if page_num > len(document):
+                    break
+                page = document[page_num - 1]
                 try:
-                    # Convert page to image
-                    page_image = page.to_image(resolution=self.dpi)
-                    
-                    # Convert PIL image to numpy array for OpenCV processing
-                    img_array = np.array(page_image.original)
-                    
-                    # Preprocess image for better OCR results
-                    processed_img = self._preprocess_image(img_array)
-                    
-                    # Convert back to PIL Image
-                    pil_image = Image.fromarray(processed_img)
-                    
-                    # Perform OCR
-                    page_text = pytesseract.image_to_string(
-                        pil_image, 
-                        lang=self.ocr_languages,
-                        config='--psm 6'  # Uniform block of text
-                    )
-                    
-                    if page_text.strip():
-                        text_content.append(page_text)
-                        logger.debug(f"OCR extracted text from page {page_num}")
-                        
+                    page_text = self._ocr_page(page, page_num)
+                    logger.debug("OCR extracted text from page %d", page_num)
                 except Exception as e:
-                    logger.warning(f"Error during OCR on page {page_num}: {str(e)}")
-                    continue
+                    logger.warning("Error during OCR on page %d: %s", page_num, e)
+                    page_text = ''
+                finally:
+                    page.close()
+                text_content.append(page_text)
+                ocr_pages.append(page_num)
+        finally:
+            document.close()
+        
+        return self.PAGE_BREAK.join(text_content), ocr_pages
+    
+    def ocr_pages(self, pdf_path: Path, pages: Sequence[int], dpi: int, psm: int = 6) -> Dict[int, str]:
+        """
+        OCR whole pages with explicit settings, e.g. to retry pages that parsed poorly.
+        
+        Args:
+            pdf_path: Path to PDF file
+            pages: 1-based page numbers
+            dpi: Rendering resolution
+            psm: Tesseract page segmentation mode
+        
+        Returns:
+            Recognized text per page; pages that fail are left out
+        """
+        texts = {}
+        with open(pdf_path, 'rb') as stream:
+            document = pdfium.PdfDocument(stream)
+            try:
+                for page_num in pages:
+                    if page_num > len(document):
+                        continue
+                    page = document[page_num - 1]
+                    try:
+                        texts[page_num] = self._ocr_region(page, dpi, psm=psm)
+                    except Exception as e:
+                        logger.warning("Error during OCR on page %d: %s", page_num, e)
+                    finally:
+                        page.close()
+            finally:
+                document.close()
+        
+        return texts
+    
+    def _ocr_page(self, page, page_num: int) -> str:
+        """OCR a pdfium page, either whole or, in adaptive mode, only its text regions."""
+        if not self.adaptive_ocr:
+            return self._ocr_region(page, self.dpi)
         
-        return '\n'.join(text_content)
+        plan = self._plan_adaptive_ocr(page)
+        if plan is None:
+            logger.debug("Skipping blank page %d", page_num)
+            return ''
+        
+        dpi, crops = plan
+        if logger.isEnabledFor(logging.DEBUG):
+            width_pt, height_pt = page.get_size()
+            region_area = sum(
+                (width_pt - left - right) * (height_pt - bottom - top)
+                for left, bottom, right, top in crops
+            )
+            logger.debug("Page %d: OCR %d regions at %d DPI, %.0f%% of full-page pixels",
+                         page_num, len(crops), dpi,
+                         100 * region_area * dpi ** 2 / (width_pt * height_pt * self.dpi ** 2))
+        
+        texts = [self._ocr_region(page, dpi, crop) for crop in crops]
+        return '\n'.join(text for text in texts if text.strip())
+    
+    def _ocr_region(self, page, dpi: int, crop: Tuple[float, float, float, float] = (0, 0, 0, 0),
+                    psm: int = 6) -> str:
+        """
+        Render part of a page to grayscale and OCR it.
+        
+        Args:
+            page: pdfium page
+            dpi: Rendering resolution
+            crop: Margins to cut off in points, as (left, bottom, right, top)
+            psm: Tesseract page segmentation mode; 6 reads a uniform block of text
+        
+        Returns:
+            Recognized text
+        """
+        # Render straight to 8-bit grayscale; the array is a view of pdfium's buffer
+        bitmap = page.render(scale=dpi / 72, grayscale=True, crop=crop)
+        try:
+            gray = bitmap.to_numpy()
+            
+            # Binarize in place on the same buffer
+            processed_img = self._preprocess_image(gray)
+            
+            # Perform OCR on the raw pixels
+            return self.ocr.recognize(processed_img, psm=psm)
+        finally:
+            bitmap.close()
+    
+    def _plan_adaptive_ocr(self, page) -> Optional[Tuple[int, List[Tuple[float, float, float, float]]]]:
+        """
+        Find text regions and a suitable DPI from a low-resolution preview.
+        
+        Args:
+            page: pdfium page
+        
+        Returns:
+            None for blank pages, otherwise the DPI and the crop margins of each
+            text region in reading order
+        """
+        width_pt, height_pt = page.get_size()
+        scale = self.PREVIEW_DPI / 72
+        
+        bitmap = page.render(scale=scale, grayscale=True)
+        try:
+            _, ink = cv2.threshold(bitmap.to_numpy(), 160, 255, cv2.THRESH_BINARY_INV)
+        finally:
+            bitmap.close()
+        
+        if cv2.countNonZero(ink) < ink.size * self.BLANK_INK_RATIO:
+            return None
+        
+        # Glyph height: median height of glyph-sized connected components
+        _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        glyphs = heights[(heights >= 4) & (heights <= ink.shape[0] * 0.05) & (widths <= heights * 3)]
+        
+        if len(glyphs):
+            glyph_height_pt = float(np.median(glyphs)) / scale
+            dpi = self.TARGET_GLYPH_PX * 72 / glyph_height_pt
+        else:
+            dpi = self.dpi
+        dpi = int(min(max(dpi, self.MIN_DPI), self.MAX_DPI)) // 10 * 10
+        
+        # Merge glyphs into words, lines and blocks (about 0.25in x 0.1in gaps)
+        kernel = cv2.getStructuringElement(
+            cv2.MORPH_RECT, (max(3, int(18 * scale)), max(3, int(8 * scale)))
+        )
+        _, _, stats, _ = cv2.connectedComponentsWithStats(cv2.dilate(ink, kernel), connectivity=8)
+        
+        regions = []
+        for x, y, w, h, _ in stats[1:]:
+            region_ink = cv2.countNonZero(ink[y:y + h, x:x + w])
+            if region_ink < self.MIN_REGION_INK or region_ink > w * h * self.IMAGE_INK_RATIO:
+                continue
+            regions.append((x, y, x + w, y + h))
+        
+        if not regions:
+            return None
+        
+        if len(regions) > self.MAX_OCR_REGIONS:
+            regions = [(
+                min(r[0] for r in regions), min(r[1] for r in regions),
+                max(r[2] for r in regions), max(r[3] for r in regions)
+            )]
+        
+        regions.sort(key=lambda r: (r[1], r[0]))
+        
+        # Preview pixels (top-left origin) to pdfium crop margins in points, with a small pad
+        pad = 4
+        crops = []
+        for x0, y0, x1, y1 in regions:
+            left = max((x0 - pad) / scale, 0)
+            top = max((y0 - pad) / scale, 0)
+            right = max(width_pt - (x1 + pad) / scale, 0)
+            bottom = max(height_pt - (y1 + pad) / scale, 0)
+            crops.append((left, bottom, right, top))
+        
+        return dpi, crops
     
     def _preprocess_image(self, img_array: np.ndarray) -> np.ndarray:
         """
         Preprocess image for better OCR results.
         
+        Grayscale input is thresholded in place, so no additional page-sized
+        buffer is returned.
+        
         Args:
             img_array: Input image as numpy array
             
@@ -125,15 +574,11 @@ class PDFExtractor:
             gray = img_array
         
         # Apply adaptive thresholding for better text recognition
-        processed = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+        cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2, dst=gray
         )
         
-        # Apply morphological operations to clean up the image
-        kernel = np.ones((1, 1), np.uint8)
-        processed = cv2.morphologyEx(processed, cv2.MORPH_CLOSE, kernel)
-        
-        return processed
+        return gray
     
     def get_pdf_info(self, pdf_path: Path) -> dict:
         """
@@ -146,10 +591,12 @@ class PDFExtractor:
             Dictionary with PDF information
         """
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            # pdfium reads only the trailer, page tree and info dictionary here;
+            # pdfplumber would build a Page object for every page
+            with pdfium.PdfDocument(pdf_path) as document:
                 return {
-                    'num_pages': len(pdf.pages),
-                    'metadata': pdf.metadata or {},
+                    'num_pages': len(document),
+                    'metadata': {k: v for k, v in document.get_metadata_dict().items() if v},
                     'file_size': pdf_path.stat().st_size,
                     'filename': pdf_path.name
                 }
@@ -0,0 +1,170 @@
+import logging
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+
+from .mcq_parser import MCQParser, RawParse
+from .pdf_extractor import PDFExtractor
+
+logger = logging.getLogger(__name__)
+
+class PageRefiner:
+    """Re-OCR only the pages whose questions parsed poorly, keeping whichever text parses better."""
+    
+    def __init__(self, pdf_extractor: PDFExtractor, parser: MCQParser, confidence_threshold: float = 0.5,
+                 min_page_chars: int = 200, max_pages: int = 20,
+                 attempts: Sequence[Tuple[int, int]] = ((400, 6), (400, 4))):
+        """
+        Initialize page refiner.
+        
+        Args:
+            pdf_extractor: Extractor used to OCR the weak pages
+            parser: Parser used to find and score questions
+            confidence_threshold: Pages with a question below this confidence are weak
+            min_page_chars: Pages with at least this much text but no valid
+                question are weak too
+            max_pages: At most this many of the weakest pages are re-OCR'd per document
+            attempts: (DPI, tesseract page segmentation mode) to try per weak
+                page, in order, until the page has no weak question left
+        """
+        self.pdf_extractor = pdf_extractor
+        self.parser = parser
+        self.confidence_threshold = confidence_threshold
+        self.min_page_chars = min_page_chars
+        self.max_pages = max_pages
+        self.attempts = [tuple(attempt) for attempt in attempts]
+        
+        self.pages_retried = 0
+        self.pages_improved = 0
+    
+    def settings(self) -> Dict[str, Any]:
+        """Settings that change the refined text, for keying stored artifacts."""
+        return {
+            'confidence_threshold': self.confidence_threshold,
+            'min_page_chars': self.min_page_chars,
+            'max_pages': self.max_pages,
+            'attempts': self.attempts
+        }
+    
+    def worst_case_pages(self, num_pages: int) -> List[Tuple[int, int]]:
+        """
+        Most pages refinement can re-OCR for a document, for admission control.
+        
+        Args:
+            num_pages: Pages OCR'd in the first pass
+        
+        Returns:
+            (DPI, pages) of every attempt, if every attempt retried max_pages pages
+        """
+        return [(dpi, min(num_pages, self.max_pages)) for dpi, _ in self.attempts]
+    
+    def refine(self, pdf_path: Path, text: str, raw: RawParse,
+               page_numbers: Optional[Sequence[int]] = None,
+               ocr_pages: Optional[Collection[int]] = None) -> Optional[Tuple[str, RawParse]]:
+        """
+        Re-OCR weak pages and merge the pages that improved back into the text.
+        
+        Args:
+            pdf_path: Path to the PDF the text was extracted from
+            text: Extracted text, pages separated by PDFExtractor.PAGE_BREAK
+            raw: parse_raw result of the text
+            page_numbers: Page number of each page of the text; defaults to 1, 2, ...
+            ocr_pages: Pages whose text came from OCR; only these are retried.
+                Embedded text does not get better from OCR. None retries any page
+        
+        Returns:
+            The refined text and its raw parse, or None if no page improved
+        """
+        pages = text.split(self.parser.PAGE_BREAK)
+        page_numbers = list(page_numbers or range(1, len(pages) + 1))
+        if len(pages) != len(page_numbers):
+            logger.warning('Page count of the text does not match its page numbers; skipping refinement')
+            return None
+        
+        weak = self.find_weak_pages(pages, page_numbers, raw, ocr_pages)
+        if not weak:
+            return None
+        
+        logger.info(f"Re-OCR of {len(weak)} weak pages of {pdf_path.name}: {weak}")
+        index_of = {page_num: i for i, page_num in enumerate(page_numbers)}
+        original = {page_num: pages[index_of[page_num]] for page_num in weak}
+        scores = {page_num: self._score(original[page_num]) for page_num in weak}
+        
+        remaining = list(weak)
+        for dpi, psm in self.attempts:
+            if not remaining:
+                break
+            texts = self.pdf_extractor.ocr_pages(pdf_path, remaining, dpi=dpi, psm=psm)
+            self.pages_retried += len(texts)
+            
+            for page_num, page_text in texts.items():
+                score = self._score(page_text)
+                # More valid questions, or as many with more total confidence
+                if score[:2] > scores[page_num][:2]:
+                    logger.debug("Page %d improved at %d DPI, psm %d: %s -> %s",
+                                 page_num, dpi, psm, scores[page_num][:2], score[:2])
+                    pages[index_of[page_num]] = page_text
+                    scores[page_num] = score
+            
+            # Pages without weak questions need no further attempt
+            remaining = [page_num for page_num in remaining if scores[page_num][2]]
+        
+        improved = [page_num for page_num in weak if pages[index_of[page_num]] != original[page_num]]
+        self.pages_improved += len(improved)
+        logger.info(f"Re-OCR improved {len(improved)} of {len(weak)} weak pages")
+        if not improved:
+            return None
+        
+        refined_text = self.parser.PAGE_BREAK.join(pages)
+        return refined_text, self.parser.parse_raw(refined_text, page_numbers)
+    
+    def find_weak_pages(self, pages: List[str], page_numbers: List[int], raw: RawParse,
+                        ocr_pages: Optional[Collection[int]] = None) -> List[int]:
+        """
+        Find pages with low-confidence questions, or with text but no valid question.
+        
+        A page has text worth retrying if it has at least min_page_chars, or if a
+        question block starting on it failed validation.
+        
+        Args:
+            pages: Text of each page
+            page_numbers: Page number of each page
+            raw: parse_raw result of the pages' text
+            ocr_pages: Only these pages may be weak; None allows any page
+        
+        Returns:
+            Page numbers of the weakest pages, at most max_pages, in page order
+        """
+        mcqs = self.parser.finalize(raw)
+        lowest: Dict[int, float] = {}
+        for mcq in mcqs:
+            if mcq.page_number is not None:
+                lowest[mcq.page_number] = min(lowest.get(mcq.page_number, 1.0), mcq.confidence)
+        
+        with_blocks = {mcq.page_number for _, mcq in raw.blocks}
+        
+        candidates = []
+        for page_num, page_text in zip(page_numbers, pages):
+            if ocr_pages is not None and page_num not in ocr_pages:
+                continue
+            if page_num in lowest:
+                if lowest[page_num] < self.confidence_threshold:
+                    candidates.append((lowest[page_num], page_num))
+            elif page_num in with_blocks or len(page_text.strip()) >= self.min_page_chars:
+                candidates.append((0.0, page_num))
+        
+        candidates.sort()
+        return sorted(page_num for _, page_num in candidates[:self.max_pages])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get refinement statistics."""
+        return {
+            'pages_retried': self.pages_retried,
+            'pages_improved': self.pages_improved,
+            'confidence_threshold': self.confidence_threshold
+        }
+    
+    def _score(self, page_text: str) -> Tuple[int, float, bool]:
+        """Valid questions on a page, their total confidence, and whether any is still weak."""
+        mcqs = self.parser.finalize(self.parser.parse_raw(page_text))
+        weak = not mcqs or any(mcq.confidence < self.confidence_threshold for mcq in mcqs)
+        return len(mcqs), sum(mcq.confidence for mcq in mcqs), weak
\ No newline at end of file
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """Cache pipeline results keyed by document hash and processing settings."""
+    
+    def __init__(self, cache_folder: Path, output_folder: Path,
+                 ttl_seconds: int = 7 * 24 * 3600, max_size_bytes: int = 1024 * 1024 * 1024,
+                 file_remover: Optional[Callable[[Path], None]] = None):
+        """
+        Initialize result cache.
+        
+        Args:
+            cache_folder: Directory holding one JSON entry per cached result
+            output_folder: Directory containing the export files entries refer to
+            ttl_seconds: Maximum age of an entry before it is evicted
+            max_size_bytes: Maximum combined size of entries and their export files
+            file_remover: Callable used to delete export files of evicted entries
+        """
+        self.cache_folder = Path(cache_folder)
+        self.output_folder = Path(output_folder)
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.file_remover = file_remover or self._remove_file
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(document_hash: str, **settings: Any) -> str:
+        """
+        Build a cache key from a document hash and the settings that affect the output.
+        
+        Args:
+            document_hash: SHA-256 of the uploaded document
+            **settings: Pipeline settings (parser options, keyword version, flags)
+        
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        payload = json.dumps({'document': document_hash, 'settings': settings}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return cached results for a key, or None if missing, expired or incomplete.
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Cached results data or None
+        """
+        entry_path = self._entry_path(key)
+        entry = self._read_entry(entry_path)
+        
+        if entry is None:
+            self._count(hit=False)
+            return None
+        
+        expired = time.time() - entry['created'] > self.ttl_seconds
+        missing = any(not (self.output_folder / name).exists() for name in entry['files'])
+        
+        if expired or missing:
+            self._evict(entry_path, entry)
+            self._count(hit=False)
+            return None
+        
+        # Record the access so size-based eviction removes least recently used entries first
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        
+        self._count(hit=True)
+        return entry['results']
+    
+    def put(self, key: str, results: Dict[str, Any], files: List[str]):
+        """
+        Store results for a key and evict old entries if over budget.
+        
+        Args:
+            key: Cache key from make_key
+            results: Results data to return on later hits
+            files: Names of export files in the output folder the results refer to
+        """
+        entry = {
+            'created': time.time(),
+            'files': files,
+            'results': results
+        }
+        
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_name(f"{key}.{os.getpid()}.tmp")
+        
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            tmp_path.replace(entry_path)
+        except Exception as e:
+            logger.warning(f"Could not write result cache entry: {e}")
+            return
+        
+        self.evict()
+    
+    def evict(self):
+        """Evict expired entries, then least recently used ones until under the size limit."""
+        now = time.time()
+        entries = []
+        total_size = 0
+        
+        for entry_path in self.cache_folder.glob('*.json'):
+            entry = self._read_entry(entry_path)
+            if entry is None:
+                continue
+            
+            if now - entry['created'] > self.ttl_seconds:
+                self._evict(entry_path, entry)
+                continue
+            
+            size = self._entry_size(entry_path, entry)
+            try:
+                last_access = entry_path.stat().st_mtime
+            except OSError:
+                continue
+            
+            entries.append((last_access, entry_path, entry, size))
+            total_size += size
+        
+        entries.sort(key=lambda item: item[0])
+        for _, entry_path, entry, size in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            self._evict(entry_path, entry)
+            total_size -= size
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        entry_count = sum(1 for _ in self.cache_folder.glob('*.json'))
+        return {
+            'entries': entry_count,
+            'hits': self.hits,
+            'misses': self.misses,
+            'ttl_seconds': self.ttl_seconds,
+            'max_size_bytes': self.max_size_bytes
+        }
+    
+    def _entry_path(self, key: str) -> Path:
+        """Path of the JSON file for a cache key."""
+        return self.cache_folder / f"{key}.json"
+    
+    def _read_entry(self, entry_path: Path) -> Optional[Dict[str, Any]]:
+        """Read an entry, treating unreadable or concurrently removed files as missing."""
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _entry_size(self, entry_path: Path, entry: Dict[str, Any]) -> int:
+        """Size of an entry plus the export files it keeps alive."""
+        size = 0
+        for path in [entry_path] + [self.output_folder / name for name in entry['files']]:
+            try:
+                size += path.stat().st_size
+            except OSError:
+                continue
+        return size
+    
+    def _evict(self, entry_path: Path, entry: Dict[str, Any]):
+        """Remove an entry and its export files."""
+        try:
+            entry_path.unlink()
+        except OSError:
+            # Another worker evicted it first
+            return
+        
+        for name in entry['files']:
+            self.file_remover(self.output_folder / name)
+        
+        logger.info(f"Evicted result cache entry {entry_path.stem}")
+    
+    def _remove_file(self, path: Path):
+        """Default export file remover."""
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    
+    def _count(self, hit: bool):
+        """Update hit/miss counters."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
\ No newline at end of file
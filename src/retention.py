@@ -0,0 +1,208 @@
+import os
+import re
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from pathlib import Path
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class IndexedFile:
+    """An export file tracked by the retention index."""
+    size: int
+    mtime: float
+    group: str
+
+class RetentionManager:
+    """Keep OUTPUT_FOLDER bounded by age and size, with an in-memory index of export files."""
+    
+    # Files of one export share the 'mcq_export_<id>_<timestamp>' prefix and are evicted together
+    _GROUP_PATTERN = re.compile(r'^(mcq_export_[A-Za-z0-9]+_\d{8}_\d{6})')
+    
+    def __init__(self, output_folder: Path, max_age_seconds: int = 24 * 3600,
+                 max_total_bytes: int = 2 * 1024 * 1024 * 1024, sweep_interval: int = 300,
+                 extra_sweeps: Iterable[Callable[[], Any]] = ()):
+        """
+        Initialize retention manager.
+        
+        Args:
+            output_folder: Directory containing export files
+            max_age_seconds: Export files older than this are removed
+            max_total_bytes: Oldest exports are removed while the folder exceeds this size
+            sweep_interval: Seconds between background sweeps
+            extra_sweeps: Other cleanups run by the sweeper thread after each sweep
+        """
+        self.output_folder = Path(output_folder)
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self.sweep_interval = sweep_interval
+        self.extra_sweeps = list(extra_sweeps)
+        
+        self._index: Dict[str, IndexedFile] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self.rebuild_index()
+    
+    def rebuild_index(self):
+        """Rebuild the index from a single scan of the output folder."""
+        index = {}
+        with os.scandir(self.output_folder) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                index[entry.name] = IndexedFile(
+                    size=stat.st_size, mtime=stat.st_mtime, group=self._group_of(entry.name)
+                )
+        
+        with self._lock:
+            self._index = index
+    
+    def register(self, paths: Iterable[Path]):
+        """
+        Add newly written export files to the index.
+        
+        Args:
+            paths: Paths of files inside the output folder
+        """
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            with self._lock:
+                self._index[path.name] = IndexedFile(
+                    size=stat.st_size, mtime=stat.st_mtime, group=self._group_of(path.name)
+                )
+    
+    def lookup(self, filename: str) -> Optional[Path]:
+        """
+        Resolve a download filename to a path without scanning the folder.
+        
+        Args:
+            filename: Name of an export file
+        
+        Returns:
+            Path to the file, or None if it is not a known export
+        """
+        if not filename or filename != Path(filename).name:
+            return None
+        
+        with self._lock:
+            if filename in self._index:
+                return self.output_folder / filename
+        
+        # Written by another worker since our last sweep; one stat, not a scan
+        path = self.output_folder / filename
+        if path.is_file():
+            self.register([path])
+            return path
+        
+        return None
+    
+    def remove(self, path: Path):
+        """
+        Delete an export file and drop it from the index.
+        
+        Args:
+            path: Path of a file inside the output folder
+        """
+        with self._lock:
+            self._index.pop(path.name, None)
+        
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove export file {path.name}: {e}")
+    
+    def sweep(self) -> int:
+        """
+        Evict expired exports, then the oldest exports until under the size limit.
+        
+        Returns:
+            Number of files removed
+        """
+        # Pick up files written or removed by other workers
+        self.rebuild_index()
+        
+        with self._lock:
+            groups: Dict[str, List[str]] = {}
+            group_mtime: Dict[str, float] = {}
+            group_size: Dict[str, int] = {}
+            for name, info in self._index.items():
+                groups.setdefault(info.group, []).append(name)
+                group_mtime[info.group] = max(group_mtime.get(info.group, 0.0), info.mtime)
+                group_size[info.group] = group_size.get(info.group, 0) + info.size
+        
+        now = time.time()
+        total_size = sum(group_size.values())
+        removed = 0
+        
+        # Oldest exports first
+        for group in sorted(groups, key=lambda g: group_mtime[g]):
+            expired = now - group_mtime[group] > self.max_age_seconds
+            if not expired and total_size <= self.max_total_bytes:
+                break
+            
+            for name in groups[group]:
+                self.remove(self.output_folder / name)
+                removed += 1
+            total_size -= group_size[group]
+        
+        if removed:
+            logger.info(f"Retention sweep removed {removed} export files")
+        return removed
+    
+    def start(self):
+        """Start the background sweeper thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='output-retention', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background sweeper thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about tracked export files."""
+        with self._lock:
+            total_size = sum(info.size for info in self._index.values())
+            file_count = len(self._index)
+        
+        return {
+            'files': file_count,
+            'total_bytes': total_size,
+            'max_total_bytes': self.max_total_bytes,
+            'max_age_seconds': self.max_age_seconds
+        }
+    
+    def _run(self):
+        """Sweeper loop."""
+        while not self._stop_event.wait(self.sweep_interval):
+            for task in [self.sweep, *self.extra_sweeps]:
+                try:
+                    task()
+                except Exception as e:
+                    logger.error(f"Error during retention sweep: {str(e)}")
+    
+    def _group_of(self, filename: str) -> str:
+        """Export group a file belongs to; unrecognized files form their own group."""
+        match = self._GROUP_PATTERN.match(filename)
+        return match.group(1) if match else filename
\ No newline at end of file
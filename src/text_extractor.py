@@ -0,0 +1,118 @@
+import gzip
+import codecs
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class TextExtractor:
+    """Load pre-extracted text dumps (plain or gzip-compressed) without PDF processing."""
+    
+    def __init__(self, encoding: str = 'utf-8', chunk_size: int = 1024 * 1024,
+                 max_text_bytes: Optional[int] = None):
+        """
+        Initialize text extractor.
+        
+        Args:
+            encoding: Encoding of the text dumps
+            chunk_size: Number of bytes decompressed per read for gzip files
+            max_text_bytes: Largest decompressed size of a gzip file, or None
+                for no limit; a small archive can expand to gigabytes
+        """
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.max_text_bytes = max_text_bytes
+    
+    def extract_text(self, text_path: Path) -> str:
+        """
+        Extract text from a plain or gzip-compressed text file.
+        
+        Args:
+            text_path: Path to the .txt or .txt.gz file
+        
+        Returns:
+            Decoded text content
+        
+        Raises:
+            ValueError: If a gzip file decompresses past max_text_bytes
+            Exception: If the file cannot be read
+        """
+        try:
+            logger.info(f"Loading text from {text_path}")
+            
+            if text_path.suffix.lower() == '.gz':
+                text = self._read_gzip(text_path)
+            else:
+                text = self._read_mapped(text_path)
+            
+            logger.info(f"Successfully loaded {len(text)} characters")
+            return text
+        
+        except Exception as e:
+            logger.error(f"Error loading text from {text_path}: {str(e)}")
+            raise
+    
+    def text_size(self, text_path: Path) -> int:
+        """
+        Estimate the uncompressed size of a text file without reading it.
+        
+        For gzip files this is the size recorded in the trailer (ISIZE), which
+        covers only the last member and wraps at 4GB, so it is kept between the
+        compressed size and max_text_bytes.
+        
+        Args:
+            text_path: Path to the .txt or .txt.gz file
+        
+        Returns:
+            Size in bytes
+        """
+        size = text_path.stat().st_size
+        if text_path.suffix.lower() != '.gz' or size < 4:
+            return size
+        
+        with open(text_path, 'rb') as f:
+            f.seek(-4, 2)
+            isize, = struct.unpack('<I', f.read(4))
+        
+        size = max(size, isize)
+        return min(size, self.max_text_bytes) if self.max_text_bytes else size
+    
+    def _read_mapped(self, text_path: Path) -> str:
+        """Decode a plain text file straight from a memory map."""
+        with open(text_path, 'rb') as f:
+            if text_path.stat().st_size == 0:
+                return ''
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    # Skip a UTF-8 byte order mark without copying the buffer
+                    start = len(codecs.BOM_UTF8) if view[:3] == codecs.BOM_UTF8 else 0
+                    return str(view[start:], self.encoding, 'replace')
+                finally:
+                    view.release()
+    
+    def _read_gzip(self, text_path: Path) -> str:
+        """Decompress and decode a gzip file incrementally."""
+        decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        chunks = []
+        total = 0
+        
+        with gzip.open(text_path, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                total += len(data)
+                if self.max_text_bytes and total > self.max_text_bytes:
+                    raise ValueError(f"Decompressed text exceeds the limit of "
+                                     f"{self.max_text_bytes // (1024 * 1024)}MB")
+                chunks.append(decoder.decode(data))
+        
+        chunks.append(decoder.decode(b'', final=True))
+        text = ''.join(chunks)
+        
+        return text[1:] if text.startswith('\ufeff') else text
\ No newline at end of file
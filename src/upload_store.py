@@ -0,0 +1,334 @@
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import AsyncIterable, BinaryIO, Dict, Tuple
+from pathlib import Path
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 of a file without reading it into memory at once."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+class UploadError(ValueError):
+    """Raised when an upload or upload chunk is rejected."""
+    
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+@dataclass
+class StoredUpload:
+    """A file written to the upload folder together with its content hash."""
+    path: Path
+    sha256: str
+    size: int
+
+class UploadStore:
+    """Stream uploads to disk in chunks, hashing on the fly, with resumable sessions."""
+    
+    _UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+    
+    def __init__(self, upload_folder: Path, chunk_size: int = 1024 * 1024,
+                 max_upload_size: int = 512 * 1024 * 1024, session_ttl: int = 24 * 3600):
+        """
+        Initialize upload store.
+        
+        Args:
+            upload_folder: Directory where uploads and partial uploads are written
+            chunk_size: Number of bytes copied per read
+            max_upload_size: Maximum total size of a chunked upload
+            session_ttl: Seconds without a chunk after which an unfinished upload is removed
+        """
+        self.upload_folder = Path(upload_folder)
+        self.sessions_folder = self.upload_folder / '.sessions'
+        self.chunk_size = chunk_size
+        self.max_upload_size = max_upload_size
+        self.session_ttl = session_ttl
+        
+        # upload_id -> (running hash, bytes hashed so far) for in-order chunks
+        self._hashers: Dict[str, Tuple[object, int]] = {}
+        self._lock = threading.Lock()
+        
+        self.sessions_folder.mkdir(parents=True, exist_ok=True)
+    
+    def save_stream(self, stream: BinaryIO, filename: str) -> StoredUpload:
+        """
+        Copy a stream to the upload folder chunk by chunk, hashing as it is written.
+        
+        Args:
+            stream: Readable binary stream
+            filename: Target file name inside the upload folder
+        
+        Returns:
+            The stored upload with its SHA-256 digest
+        """
+        path = self.upload_folder / filename
+        hasher = hashlib.sha256()
+        size = 0
+        
+        with open(path, 'wb') as f:
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        
+        logger.info(f"Stored upload {filename} ({size} bytes)")
+        return StoredUpload(path=path, sha256=hasher.hexdigest(), size=size)
+    
+    async def save_chunks(self, chunks: AsyncIterable[bytes], filename: str) -> StoredUpload:
+        """
+        Write chunks received by an asyncio server to the upload folder, hashing as they arrive.
+        
+        File writes run in a thread, so the event loop keeps serving other connections.
+        
+        Args:
+            chunks: Asynchronous iterable of request body chunks
+            filename: Target file name inside the upload folder
+        
+        Returns:
+            The stored upload with its SHA-256 digest
+        
+        Raises:
+            UploadError: If the upload exceeds the maximum upload size
+        """
+        path = self.upload_folder / filename
+        hasher = hashlib.sha256()
+        size = 0
+        
+        f = await asyncio.to_thread(open, path, 'wb')
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_upload_size:
+                    raise UploadError('File too large', status_code=413)
+                hasher.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            f.close()
+            path.unlink(missing_ok=True)
+            raise
+        f.close()
+        
+        logger.info(f"Stored upload {filename} ({size} bytes)")
+        return StoredUpload(path=path, sha256=hasher.hexdigest(), size=size)
+    
+    def create_session(self, filename: str, total_size: int) -> Dict:
+        """
+        Start a resumable chunked upload.
+        
+        Args:
+            filename: Sanitized name of the file being uploaded
+            total_size: Expected size of the complete file in bytes
+        
+        Returns:
+            Session metadata including the new upload id
+        """
+        if total_size <= 0:
+            raise UploadError('Upload size must be positive')
+        if total_size > self.max_upload_size:
+            raise UploadError('File too large', status_code=413)
+        
+        upload_id = uuid.uuid4().hex
+        session = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'size': total_size,
+            'received': 0,
+            'created': time.time()
+        }
+        
+        self._part_path(upload_id).touch()
+        self._write_session(session)
+        
+        with self._lock:
+            self._hashers[upload_id] = (hashlib.sha256(), 0)
+        
+        logger.info(f"Started chunked upload {upload_id} for {filename} ({total_size} bytes)")
+        return session
+    
+    def get_session(self, upload_id: str) -> Dict:
+        """Return metadata for an upload session, including bytes received so far."""
+        session_path = self._session_path(upload_id)
+        if not session_path.exists():
+            raise UploadError('Unknown upload', status_code=404)
+        
+        with open(session_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def append_chunk(self, upload_id: str, offset: int, stream: BinaryIO) -> Dict:
+        """
+        Write a chunk at the given offset of a partial upload.
+        
+        Args:
+            upload_id: Upload session id
+            offset: Byte offset of the chunk; must equal the bytes received so far
+            stream: Readable binary stream with the chunk data
+        
+        Returns:
+            Updated session metadata
+        """
+        self.get_session(upload_id)
+        
+        try:
+            f = open(self._part_path(upload_id), 'r+b')
+        except FileNotFoundError:
+            raise UploadError('Unknown upload', status_code=404)
+        
+        with f:
+            # Chunks of one upload are written one at a time, across threads and workers
+            fcntl.flock(f, fcntl.LOCK_EX)
+            session = self.get_session(upload_id)
+            
+            # Only in-order chunks are accepted; clients resume from 'received'
+            if offset != session['received']:
+                raise UploadError(f"Expected offset {session['received']}", status_code=409)
+            
+            # Taken out while the chunk is written, and put back only once the chunk
+            # is recorded, so a failed chunk never leaves its bytes in the hash
+            with self._lock:
+                hasher, hashed = self._hashers.pop(upload_id, (None, -1))
+            if hashed != offset:
+                hasher = None
+            
+            written = 0
+            f.seek(offset)
+            f.truncate()
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                if offset + written + len(chunk) > session['size']:
+                    raise UploadError('Chunk exceeds declared upload size')
+                f.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                written += len(chunk)
+            f.flush()
+            
+            session['received'] = offset + written
+            self._write_session(session)
+            
+            if hasher is not None:
+                with self._lock:
+                    self._hashers[upload_id] = (hasher, session['received'])
+        
+        return session
+    
+    def complete_session(self, upload_id: str, filename: str) -> StoredUpload:
+        """
+        Finalize a chunked upload and move it into place.
+        
+        Args:
+            upload_id: Upload session id
+            filename: Target file name inside the upload folder
+        
+        Returns:
+            The stored upload with its SHA-256 digest
+        """
+        self.get_session(upload_id)
+        part_path = self._part_path(upload_id)
+        try:
+            f = open(part_path, 'rb')
+        except FileNotFoundError:
+            raise UploadError('Unknown upload', status_code=404)
+        
+        with f:
+            # Wait for a chunk still being written
+            fcntl.flock(f, fcntl.LOCK_EX)
+            session = self.get_session(upload_id)
+            if session['received'] != session['size']:
+                raise UploadError(f"Upload incomplete: {session['received']} of {session['size']} bytes",
+                                  status_code=409)
+            
+            with self._lock:
+                hasher, hashed = self._hashers.pop(upload_id, (None, -1))
+            
+            if hashed == session['size']:
+                digest = hasher.hexdigest()
+            else:
+                # Chunks arrived at another worker or before a restart; hash from disk
+                digest = hash_file(part_path, self.chunk_size)
+            
+            path = self.upload_folder / filename
+            part_path.replace(path)
+            self._session_path(upload_id).unlink()
+        
+        logger.info(f"Completed chunked upload {upload_id} as {filename}")
+        return StoredUpload(path=path, sha256=digest, size=session['size'])
+    
+    def expire_sessions(self) -> int:
+        """
+        Remove unfinished uploads that received no chunk for longer than the session TTL.
+        
+        Returns:
+            Number of sessions removed
+        """
+        cutoff = time.time() - self.session_ttl
+        removed = 0
+        for part_path in self.sessions_folder.glob('*.part'):
+            upload_id = part_path.stem
+            try:
+                with open(part_path, 'rb') as f:
+                    # Skip uploads with a chunk in flight
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    session_path = self.sessions_folder / f"{upload_id}.json"
+                    try:
+                        with open(session_path, 'r', encoding='utf-8') as session_file:
+                            created = json.load(session_file).get('created', 0)
+                    except (OSError, ValueError):
+                        created = 0
+                    # Last activity is the last chunk written, or the start of the upload
+                    if max(created, os.fstat(f.fileno()).st_mtime) > cutoff:
+                        continue
+                    session_path.unlink(missing_ok=True)
+                    part_path.unlink(missing_ok=True)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                logger.warning(f"Could not expire upload {upload_id}: {e}")
+                continue
+            
+            with self._lock:
+                self._hashers.pop(upload_id, None)
+            removed += 1
+        
+        if removed:
+            logger.info(f"Expired {removed} abandoned chunked uploads")
+        return removed
+    
+    def _session_path(self, upload_id: str) -> Path:
+        """Path of the session metadata file."""
+        if not self._UPLOAD_ID_PATTERN.match(upload_id):
+            raise UploadError('Unknown upload', status_code=404)
+        return self.sessions_folder / f"{upload_id}.json"
+    
+    def _part_path(self, upload_id: str) -> Path:
+        """Path of the partial upload data."""
+        return self.sessions_folder / f"{upload_id}.part"
+    
+    def _write_session(self, session: Dict):
+        """Atomically persist session metadata."""
+        session_path = self._session_path(session['upload_id'])
+        tmp_path = session_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        tmp_path.replace(session_path)
\ No newline at end of file
@@ -4,6 +4,11 @@
 let uploadedFile = null;
 let isProcessing = false;
 
+// Files above the single-request limit are sent as resumable chunks
+const MAX_SINGLE_UPLOAD_SIZE = 16 * 1024 * 1024; // 16MB
+const MAX_CHUNKED_UPLOAD_SIZE = 512 * 1024 * 1024; // 512MB
+const CHUNK_RETRIES = 3;
+
 // Initialize application
 document.addEventListener('DOMContentLoaded', function() {
     initializeTooltips();
@@ -49,6 +54,12 @@ function initializeFileUpload() {
     if (uploadForm) {
         uploadForm.addEventListener('submit', handleFormSubmit);
     }
+    
+    // Preview handler
+    const previewBtn = document.getElementById('previewBtn');
+    if (previewBtn) {
+        previewBtn.addEventListener('click', handlePreview);
+    }
 }
 
 // Drag over handler
@@ -98,16 +109,20 @@ function handleFileSelection(file) {
 
 // Validate selected file
 function validateFile(file) {
-    const maxSize = 16 * 1024 * 1024; // 16MB
-    const allowedTypes = ['application/pdf'];
+    const maxSize = MAX_CHUNKED_UPLOAD_SIZE;
+    const allowedExtensions = ['pdf', 'txt', 'txt.gz'];
+    const name = file.name.toLowerCase();
+    // Compressed text is only accepted as .txt.gz; other .gz files are not text
+    const extension = name.endsWith('.txt.gz') ? 'txt.gz' : name.split('.').pop();
     
-    if (!allowedTypes.includes(file.type)) {
-        showAlert('Please select a PDF file.', 'error');
+    // Browsers report inconsistent MIME types for text/gzip, so check the extension
+    if (!allowedExtensions.includes(extension)) {
+        showAlert('Please select a PDF or text file.', 'error');
         return false;
     }
     
     if (file.size > maxSize) {
-        showAlert('File size must be less than 16MB.', 'error');
+        showAlert('File size must be less than 512MB.', 'error');
         return false;
     }
     
@@ -184,16 +199,156 @@ function handleFormSubmit(e) {
     
     const fileInput = document.getElementById('file');
     if (!fileInput.files[0] && !uploadedFile) {
-        showAlert('Please select a PDF file to upload.', 'error');
+        showAlert('Please select a PDF or text file to upload.', 'error');
         return;
     }
     
     startProcessing();
     
+    const file = fileInput.files[0] || uploadedFile;
+    if (file.size > MAX_SINGLE_UPLOAD_SIZE) {
+        uploadInChunks(file, e.target).catch(error => {
+            isProcessing = false;
+            showAlert(`Upload failed: ${error.message}`, 'error');
+        });
+        return;
+    }
+    
     // Submit the form
     e.target.submit();
 }
 
+// Extract and parse a few sample pages to estimate the full job
+async function handlePreview() {
+    const fileInput = document.getElementById('file');
+    const file = fileInput.files[0] || uploadedFile;
+    const previewBtn = document.getElementById('previewBtn');
+    const previewResult = document.getElementById('previewResult');
+    
+    if (!file) {
+        showAlert('Please select a PDF file to preview.', 'error');
+        return;
+    }
+    if (!file.name.toLowerCase().endsWith('.pdf')) {
+        showAlert('Preview is only available for PDF files.', 'error');
+        return;
+    }
+    if (file.size > MAX_SINGLE_UPLOAD_SIZE) {
+        showAlert('Preview is limited to files up to 16MB.', 'error');
+        return;
+    }
+    
+    const form = document.getElementById('uploadForm');
+    const formData = new FormData(form);
+    formData.set('file', file);
+    
+    previewBtn.disabled = true;
+    try {
+        const response = await fetch('/api/preview', { method: 'POST', body: formData });
+        const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.error || `HTTP ${response.status}`);
+        }
+        
+        previewResult.innerHTML = `
+            <strong>${result.questions_in_sample}</strong> questions found on sample pages
+            ${result.sampled_pages.join(', ')}.
+            Estimated <strong>~${result.estimated_questions}</strong> questions in
+            ${result.selected_pages} of ${result.num_pages} pages,
+            ${result.needs_ocr ? 'requiring OCR, ' : ''}about ${formatDuration(result.estimated_seconds)}.
+        `;
+        previewResult.classList.remove('d-none');
+    } catch (error) {
+        showAlert(`Preview failed: ${error.message}`, 'error');
+    } finally {
+        previewBtn.disabled = false;
+    }
+}
+
+// Format seconds as a short human-readable duration
+function formatDuration(seconds) {
+    if (seconds < 60) {
+        return `${Math.max(1, Math.round(seconds))} seconds`;
+    }
+    return `${Math.round(seconds / 60)} minutes`;
+}
+
+// Upload a large file in resumable chunks, then submit the form to process it
+async function uploadInChunks(file, form) {
+    // Resume an interrupted upload of the same file if the server still has it
+    const resumeKey = `mcq-upload:${file.name}:${file.size}:${file.lastModified}`;
+    let session = null;
+    const savedId = localStorage.getItem(resumeKey);
+    
+    if (savedId) {
+        const response = await fetch(`/api/uploads/${savedId}`);
+        if (response.ok) {
+            session = await response.json();
+        }
+    }
+    
+    if (!session) {
+        const response = await fetch('/api/uploads', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size })
+        });
+        session = await response.json();
+        if (!response.ok) {
+            throw new Error(session.error || 'Could not start upload');
+        }
+        localStorage.setItem(resumeKey, session.upload_id);
+    }
+    
+    const chunkSize = session.chunk_size || (8 * 1024 * 1024);
+    let offset = session.received;
+    
+    while (offset < file.size) {
+        const chunk = file.slice(offset, offset + chunkSize);
+        offset = await sendChunk(session.upload_id, offset, chunk);
+    }
+    
+    localStorage.removeItem(resumeKey);
+    
+    // Process the assembled file with the selected options
+    form.action = `/upload/${session.upload_id}/complete`;
+    form.querySelector('input[type="file"]').disabled = true;
+    form.submit();
+}
+
+// Send one chunk, retrying transient failures; returns the new offset
+async function sendChunk(uploadId, offset, chunk) {
+    let lastError = null;
+    
+    for (let attempt = 0; attempt < CHUNK_RETRIES; attempt++) {
+        try {
+            const response = await fetch(`/api/uploads/${uploadId}`, {
+                method: 'PUT',
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                    'Upload-Offset': String(offset)
+                },
+                body: chunk
+            });
+            const result = await response.json();
+            
+            if (response.ok) {
+                return result.received;
+            }
+            if (response.status === 409) {
+                // Server has a different offset; resume from what it received
+                const status = await (await fetch(`/api/uploads/${uploadId}`)).json();
+                return status.received;
+            }
+            lastError = new Error(result.error || `HTTP ${response.status}`);
+        } catch (error) {
+            lastError = error;
+        }
+    }
+    
+    throw lastError;
+}
+
 // Start processing animation
 function startProcessing() {
     isProcessing = true;
@@ -0,0 +1,77 @@
+"""Answers printed in answer-key tables are joined to their questions."""
+
+import sys
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.mcq_parser import MCQParser  # noqa: E402
+from src.pdf_extractor import PDFExtractor  # noqa: E402
+
+BOOK = 'Tech Practice Book_repaired-1-80'
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+def answered(text):
+    parser = MCQParser()
+    raw = parser.parse_raw(text)
+    mcqs = parser.finalize(raw)
+    return raw, mcqs, [mcq for mcq in mcqs if mcq.correct_answer]
+
+def test_key_tables_of_bundled_text():
+    text = (ROOT / f'{BOOK}.txt').read_text(encoding='utf-8-sig').replace('\x0c', '\n')
+    raw, mcqs, with_answer = answered(text)
+    
+    assert len(raw.answer_keys) >= 5
+    assert len(mcqs) > 200
+    # Only a handful of questions print their answer inline; the rest come from the key tables
+    assert len(with_answer) > 0.8 * len(mcqs)
+
+def test_key_tables_of_bundled_pdf():
+    pdf_path = ROOT / f'{BOOK}.pdf'
+    if not pdf_path.exists():
+        pytest.skip(f'{pdf_path.name} is not bundled')
+    text = PDFExtractor().extract_text(pdf_path, use_ocr=False)
+    raw, mcqs, with_answer = answered(text)
+    
+    assert len(raw.answer_keys) >= 5
+    assert len(with_answer) > 0.8 * len(mcqs)
+
+def question(number):
+    return (f"{number}. Which material is used for conductor number {number}?\n"
+            "(a) Copper (b) Silver\n(c) Aluminium (d) Steel")
+
+def test_keys_pair_with_the_chapter_before_them():
+    text = '\n'.join([
+        question(1), question(2), question(3),
+        'Answer Key',
+        '1. (b) 2. (a) 3. (a)',
+        question(1), question(2), question(3),
+        'Answer Key',
+        # Out of order, as in tables printed column by column: still one section
+        '1. (a) 3. (b) 2. (b)',
+    ])
+    _, mcqs, _ = answered(text)
+    
+    assert [mcq.correct_answer for mcq in mcqs] == ['b', 'a', 'a', 'a', 'b', 'b']
+
+def test_keys_after_chapters_of_continuous_numbering():
+    text = '\n'.join([
+        question(1), question(2), question(3),
+        'Answer Key',
+        '1. (b) 2. (a) 3. (a)',
+        question(4), question(5), question(6),
+        'Answer Key',
+        '4. (c) 5. (d) 6. (b)',
+    ])
+    _, mcqs, _ = answered(text)
+    
+    assert [mcq.correct_answer for mcq in mcqs] == ['b', 'a', 'a', 'c', 'd', 'b']
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""Parse time stays linear on adversarial input (small sizes of tools/parser_stress.py)."""
+
+import sys
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'tools'))
+
+import parser_stress  # noqa: E402
+
+SIZES = [2000, 8000]
+# Looser than the tool's default; tiny inputs time noisily on shared machines
+MAX_GROWTH = 3.0
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+def test_option_regexes_scale_linearly():
+    assert parser_stress.check_scaling(parser_stress.regex_parser(), SIZES, MAX_GROWTH, repeat=3) == []
+
+def test_scanner_scales_linearly():
+    assert parser_stress.check_scaling(parser_stress.scanner_parser(), SIZES, MAX_GROWTH, repeat=3) == []
+
+def test_scanner_matches_option_regex():
+    assert parser_stress.check_scanner(parser_stress.MCQParser(), blocks=2000, seed=1) == []
\ No newline at end of file
@@ -0,0 +1,450 @@
+"""
+Load-test the web app with uploads, downloads and stats requests at rising concurrency.
+
+Usage:
+    python tools/loadtest.py
+    python tools/loadtest.py --concurrency 1 2 4 8 --duration 30 --files "Tech Practice Book_repaired-1-80.txt"
+    python tools/loadtest.py --url http://127.0.0.1:5000 --server-pid 12345 --json report.json
+
+Without --url, the app is started with gunicorn.conf.py on a free local port
+and stopped afterwards. Each stage runs as many client threads as its
+concurrency for --duration seconds. Each client picks endpoints at random by
+the --mix weights and uses its own keep-alive connection. By default a few
+random bytes are appended to every upload, so uploads measure processing
+rather than the result cache. Each stage reports throughput, latency
+percentiles per endpoint, the HTTP error rate, how many uploads produced
+exports, and the peak RSS of the server's processes. RSS is read from /proc,
+so it is only reported on Linux.
+
+Besides the documents shipped with the repository, a generated text document
+of --fixture-questions questions is uploaded, so there are always exports to
+download. The run stops if the warm-up produces no exports while the mix
+includes downloads, rather than measuring uploads in their place.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Sample documents shipped with the repository
+DEFAULT_FILES = sorted(path for path in ROOT.iterdir()
+                       if path.suffix.lower() in ('.pdf', '.txt') and path.name != 'requirements.txt')
+
+DOWNLOAD_LINK = re.compile(r'href="(/download/(?!bundle/)[^"]+)"')
+
+FIXTURE_WORDS = ('voltage', 'current', 'resistor', 'capacitor', 'transformer', 'motor', 'circuit', 'phase',
+                 'frequency', 'insulation', 'conductor', 'battery', 'relay', 'fuse', 'meter', 'winding',
+                 'torque', 'load', 'power', 'earth', 'cable', 'switch', 'generator', 'diode')
+
+ENDPOINTS = ('upload', 'download', 'stats')
+
+class Client:
+    """One keep-alive HTTP connection to the app, reopened when the server closes it."""
+    
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+    
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """Send a request and read the whole response; returns (status, body)."""
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers or {})
+                response = self.conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Idle keep-alive connection closed by the server; retry once on a new one
+                self.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                self.close()
+            return response.status, data
+    
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+class RssSampler:
+    """Sample the resident memory of a process and its descendants in a background thread."""
+    
+    def __init__(self, root_pid: Optional[int], interval: float = 0.5):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_process = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def available(self) -> bool:
+        return self.root_pid is not None and Path(f"/proc/{self.root_pid}/status").exists()
+    
+    def start(self):
+        if self.available:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def reset(self) -> Tuple[int, int]:
+        """Return (peak total, peak single process) RSS in bytes since the last reset."""
+        peaks = self.peak_total, self.peak_process
+        self.peak_total = self.peak_process = 0
+        return peaks
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            sizes = [rss for rss in map(self._rss, self._process_tree()) if rss]
+            if sizes:
+                self.peak_total = max(self.peak_total, sum(sizes))
+                self.peak_process = max(self.peak_process, max(sizes))
+    
+    def _process_tree(self) -> List[int]:
+        """The root process and all its descendants."""
+        children: Dict[int, List[int]] = {}
+        for entry in Path('/proc').iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                # The command name may contain spaces; fields after it are fixed
+                stat = (entry / 'stat').read_text()
+                ppid = int(stat.rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry.name))
+        
+        tree, stack = [], [self.root_pid]
+        while stack:
+            pid = stack.pop()
+            tree.append(pid)
+            stack.extend(children.get(pid, []))
+        return tree
+    
+    @staticmethod
+    def _rss(pid: int) -> int:
+        try:
+            for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return 0
+
+class LoadTest:
+    """Drive the app's endpoints from client threads and record every request."""
+    
+    def __init__(self, host: str, port: int, files: List[Path], mix: Dict[str, float], form: Dict[str, str],
+                 unique_uploads: bool = True, timeout: float = 600):
+        self.host = host
+        self.port = port
+        self.documents = [(path.name, path.read_bytes()) for path in files]
+        self.mix = mix
+        self.form = form
+        self.unique_uploads = unique_uploads
+        self.timeout = timeout
+        
+        self.download_paths: List[str] = []
+        self._lock = threading.Lock()
+    
+    def upload(self, client: Client, rng: random.Random,
+               document: Optional[Tuple[str, bytes]] = None) -> Tuple[bool, bool]:
+        """
+        Upload a document through the HTML form route; its export links become download targets.
+        
+        Returns (HTTP success, produced exports). The route answers 200 with the
+        results page, or redirects back to the form when nothing was extracted.
+        """
+        filename, data = document or rng.choice(self.documents)
+        if self.unique_uploads:
+            # A trailing comment line changes the hash without changing what is parsed
+            data += (b'\n%' if filename.lower().endswith('.pdf') else b'\n') + uuid.uuid4().hex.encode() + b'\n'
+        
+        body, content_type = encode_multipart(self.form, filename, data)
+        status, response = client.request('POST', '/upload', body, {'Content-Type': content_type})
+        
+        links = DOWNLOAD_LINK.findall(response.decode('utf-8', 'replace')) if status == 200 else []
+        if links:
+            with self._lock:
+                self.download_paths.extend(links)
+        return status < 400, bool(links)
+    
+    def download(self, client: Client, rng: random.Random) -> Tuple[bool, Optional[bool]]:
+        """Download an export produced by an earlier upload."""
+        with self._lock:
+            path = rng.choice(self.download_paths)
+        status, _ = client.request('GET', path, headers={'Accept-Encoding': 'br, gzip'})
+        return status == 200, None
+    
+    def stats(self, client: Client, rng: random.Random) -> Tuple[bool, Optional[bool]]:
+        status, _ = client.request('GET', '/api/stats')
+        return status == 200, None
+    
+    def run_stage(self, concurrency: int, duration: float, seed: int) -> List[Tuple[str, float, bool, Optional[bool]]]:
+        """Run client threads for a while; returns (endpoint, seconds, ok, produced exports) per request."""
+        records: List[Tuple[str, float, bool, Optional[bool]]] = []
+        deadline = time.monotonic() + duration
+        endpoints = [endpoint for endpoint in ENDPOINTS if self.mix.get(endpoint)]
+        weights = [self.mix[endpoint] for endpoint in endpoints]
+        
+        def client_loop(index):
+            rng = random.Random(seed * 1000 + index)
+            client = Client(self.host, self.port, self.timeout)
+            local = []
+            try:
+                while time.monotonic() < deadline:
+                    endpoint = rng.choices(endpoints, weights)[0]
+                    started = time.perf_counter()
+                    try:
+                        ok, exported = getattr(self, endpoint)(client, rng)
+                    except (OSError, http.client.HTTPException):
+                        client.close()
+                        ok, exported = False, (False if endpoint == 'upload' else None)
+                    local.append((endpoint, time.perf_counter() - started, ok, exported))
+            finally:
+                client.close()
+                with self._lock:
+                    records.extend(local)
+        
+        threads = [threading.Thread(target=client_loop, args=(i,), name=f"client-{i}") for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return records
+
+def fixture_document(questions: int, seed: int = 1) -> Tuple[str, bytes]:
+    """
+    Generate a text document that parses into questions, with an answer key.
+    
+    Args:
+        questions: Number of questions
+        seed: Seed of the word choices
+    
+    Returns:
+        (filename, content)
+    """
+    rng = random.Random(seed)
+    lines = []
+    answers = []
+    for number in range(1, questions + 1):
+        topic = ' '.join(rng.sample(FIXTURE_WORDS, 3))
+        options = rng.sample(FIXTURE_WORDS, 4)
+        lines.append(f"{number}. Which term best completes the statement about {topic} in question {number}?")
+        lines.append(f"(a) {options[0]} (b) {options[1]}")
+        lines.append(f"(c) {options[2]} (d) {options[3]}")
+        answers.append(f"{number}. ({rng.choice('abcd')})")
+    lines.append('Answer Key')
+    lines.append(' '.join(answers))
+    return 'loadtest_fixture.txt', ('\n'.join(lines) + '\n').encode('utf-8')
+
+def encode_multipart(fields: Dict[str, str], filename: str, data: bytes) -> Tuple[bytes, str]:
+    """Encode form fields and one file as multipart/form-data; returns (body, content type)."""
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        for name, value in fields.items()
+    ]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))]
+
+def summarize(concurrency: int, duration: float, records: List[Tuple[str, float, bool, Optional[bool]]],
+              rss: Tuple[int, int]) -> Dict:
+    """Throughput, HTTP error rate, uploads with exports and latency percentiles of one stage."""
+    stage = {
+        'concurrency': concurrency,
+        'requests': len(records),
+        'throughput': len(records) / duration,
+        'error_rate': sum(1 for _, _, ok, _ in records if not ok) / len(records) if records else 0.0,
+        'rss_total_bytes': rss[0] or None,
+        'rss_max_process_bytes': rss[1] or None,
+        'endpoints': {}
+    }
+    for endpoint in ENDPOINTS:
+        latencies = sorted(seconds for name, seconds, _, _ in records if name == endpoint)
+        if not latencies:
+            continue
+        stage['endpoints'][endpoint] = {
+            'requests': len(latencies),
+            'errors': sum(1 for name, _, ok, _ in records if name == endpoint and not ok),
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99)
+        }
+        if endpoint == 'upload':
+            stage['endpoints'][endpoint]['with_exports'] = sum(
+                1 for name, _, _, exported in records if name == endpoint and exported
+            )
+    return stage
+
+def print_stage(stage: Dict):
+    rss = ''
+    if stage['rss_total_bytes']:
+        rss = (f", server RSS {stage['rss_total_bytes'] / 2 ** 20:.0f} MiB"
+               f" (largest process {stage['rss_max_process_bytes'] / 2 ** 20:.0f} MiB)")
+    print(f"concurrency {stage['concurrency']:3d}: {stage['requests']} requests, "
+          f"{stage['throughput']:.2f} req/s, {stage['error_rate']:.1%} errors{rss}")
+    for endpoint, numbers in stage['endpoints'].items():
+        exports = f" with exports={numbers['with_exports']}" if 'with_exports' in numbers else ''
+        print(f"    {endpoint:9s} n={numbers['requests']:<6d} errors={numbers['errors']:<5d} "
+              + ' '.join(f"{q}={numbers[q] * 1000:8.1f}ms" for q in ('p50', 'p95', 'p99')) + exports)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(port: int, workers: Optional[int], log_path: Path) -> subprocess.Popen:
+    """Start the app under gunicorn with the production configuration."""
+    env = dict(os.environ, PORT=str(port))
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    with open(log_path, 'ab') as log:
+        return subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+
+def wait_ready(host: str, port: int, server: Optional[subprocess.Popen], timeout: float = 120):
+    """Poll the health endpoint until the app answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            sys.exit(f"Server exited with status {server.returncode} before becoming ready")
+        try:
+            status, _ = Client(host, port, timeout=5).request('GET', '/api/health')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    sys.exit(f"Server at {host}:{port} did not become ready within {timeout:.0f}s")
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse endpoint weights such as 'upload=1,download=4,stats=1'."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name.strip()!r}; expected one of {ENDPOINTS}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Test a running server instead of starting one')
+    parser.add_argument('--server-pid', type=int, help='Master process of a running server, for RSS with --url')
+    parser.add_argument('--workers', type=int, help='Gunicorn workers of the started server (default: gunicorn.conf.py)')
+    parser.add_argument('--server-log', type=Path, default=Path('loadtest_server.log'),
+                        help='Output of the started server')
+    parser.add_argument('--files', nargs='+', type=Path, default=DEFAULT_FILES, help='Documents to upload')
+    parser.add_argument('--fixture-questions', type=int, default=200,
+                        help='Questions in the generated document uploaded besides --files; 0 leaves it out')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 2, 4, 8], help='Client threads per stage')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per stage')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('upload=1,download=4,stats=1'),
+                        help='Endpoint weights')
+    parser.add_argument('--use-ocr', action='store_true', help='Request OCR for uploaded PDFs')
+    parser.add_argument('--no-classify', action='store_true', help='Upload without auto classification')
+    parser.add_argument('--cached-uploads', action='store_true',
+                        help='Upload documents unchanged, so repeats are served from the result cache')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds before a request is abandoned')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', type=Path, help='Also write the report as JSON')
+    args = parser.parse_args()
+    
+    missing = [str(path) for path in args.files if not path.is_file()]
+    if missing:
+        parser.error(f"Files not found: {', '.join(missing)}")
+    
+    server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname or '127.0.0.1', target.port or 80
+        server_pid = args.server_pid
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = start_server(port, args.workers, args.server_log.resolve())
+        server_pid = server.pid
+    
+    form = {'auto_classify': 'off' if args.no_classify else 'on'}
+    if args.use_ocr:
+        form['use_ocr'] = 'on'
+    
+    sampler = RssSampler(server_pid)
+    try:
+        wait_ready(host, port, server)
+        test = LoadTest(host, port, args.files, args.mix, form,
+                        unique_uploads=not args.cached_uploads, timeout=args.timeout)
+        if args.fixture_questions:
+            test.documents.append(fixture_document(args.fixture_questions, args.seed))
+        
+        # One upload first, so downloads have exports to fetch from the first stage on
+        print(f"Warming up with one upload of each of {len(test.documents)} documents")
+        client = Client(host, port, args.timeout)
+        for document in test.documents:
+            ok, exported = test.upload(client, random.Random(args.seed), document)
+            if not ok:
+                print(f"Warm-up upload of {document[0]} failed")
+            elif not exported:
+                print(f"Warm-up upload of {document[0]} produced no exports")
+        client.close()
+        
+        if args.mix.get('download') and not test.download_paths:
+            sys.exit('No warm-up upload produced exports, so downloads cannot be measured; '
+                     'check the server log, or drop download from --mix')
+        
+        sampler.start()
+        if not sampler.available:
+            print('Server RSS not reported: pass --server-pid with --url, on Linux')
+        report = []
+        for stage_number, concurrency in enumerate(args.concurrency):
+            sampler.reset()
+            started = time.monotonic()
+            records = test.run_stage(concurrency, args.duration, args.seed + stage_number)
+            stage = summarize(concurrency, time.monotonic() - started, records, sampler.reset())
+            print_stage(stage)
+            report.append(stage)
+    finally:
+        sampler.stop()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=90)
+    
+    if args.json:
+        args.json.write_text(json.dumps({'files': [path.name for path in args.files], 'stages': report}, indent=2))
+        print(f"Report written to {args.json}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
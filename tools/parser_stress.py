@@ -0,0 +1,124 @@
+"""
+Check that MCQ parsing stays linear on adversarial input.
+
+Usage:
+    python tools/parser_stress.py
+    python tools/parser_stress.py --sizes 5000 20000 40000 --max-growth 8
+    python -m pytest tests/test_parser_stress.py
+
+Each generator builds text meant to make the parser's regexes backtrack. The
+parse time of every generator is measured at growing sizes, once with the
+option regexes and once with the linear option scanner; a run fails if
+either time grows much faster than the input. The regex path runs without
+time budgets or block size cap, so it never falls back to the scanner and
+its own scaling is what gets timed. The scanner is also compared with the
+option regex on random blocks, which must give the same options.
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.mcq_parser import MCQParser  # noqa: E402
+
+DEFAULT_SIZES = [2000, 8000, 32000]
+
+GENERATORS = {
+    'long_word': lambda n: '1. ' + 'x' * n,
+    'unclosed_parens': lambda n: '1. Q? (a) ' + 'x (' * (n // 3),
+    'repeated_options': lambda n: '1. Q? ' + '(a) b' * (n // 5),
+    'whitespace_run': lambda n: '1. Q? (a)' + ' ' * n + '(z',
+    'newline_run': lambda n: '1. Q? (a) b' + '\n' * n + 'c',
+    'digits': lambda n: '1' * n,
+    'numbered_dots': lambda n: '1. ' + '1.' * (n // 2),
+    'answer_table': lambda n: ' '.join(f"{i}. (a)" for i in range(n // 7)),
+    'answer_labels': lambda n: 'Ans ' * (n // 4),
+    'question_labels': lambda n: 'Q ' * (n // 2),
+    'numbered_lines': lambda n: '\n1' * (n // 2),
+}
+
+# Building blocks of random option blocks for the scanner comparison
+FRAGMENTS = ['(a)', '(b)', '(C)', '(d)', '(e)', '(', ')', ' ', '  ', '\n', '\n ', '1.', '12.', '3',
+             'Ans', 'Answer', 'ans', 'x', 'word', '.']
+
+def time_parse(parser, text, repeat):
+    """Best of several parse times of a text, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parser.parse_raw(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def regex_parser():
+    """Parser that parses every block with the option regexes, however long it takes."""
+    return MCQParser(block_time_budget=float('inf'), document_time_budget=float('inf'),
+                     max_regex_block_chars=float('inf'))
+
+def scanner_parser():
+    """Parser that parses every block with the linear option scanner."""
+    return MCQParser(max_regex_block_chars=0)
+
+def check_scaling(parser, sizes, max_growth, repeat, label=''):
+    """Time every generator at every size; return the names of those that grew too fast."""
+    failed = []
+    for name, generate in GENERATORS.items():
+        times = [time_parse(parser, generate(size), repeat) for size in sizes]
+        # Time growth per step over input growth per step, ignoring timer noise on tiny inputs
+        growth = max(
+            (later / max(earlier, 1e-4)) / (larger / smaller)
+            for earlier, later, smaller, larger in zip(times, times[1:], sizes, sizes[1:])
+        )
+        status = 'ok' if growth <= max_growth else 'SLOW'
+        print(f"{label}{name:18s} " + ' '.join(f"{t * 1000:9.1f}ms" for t in times) + f"  growth {growth:5.2f}  {status}")
+        if status != 'ok':
+            failed.append(name)
+    return failed
+
+def check_scanner(parser, blocks, seed):
+    """Compare the linear scanner with the option regex on random blocks; return mismatching blocks."""
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(blocks):
+        block = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 40)))
+        expected = [(opt.label, opt.text) for opt in parser._extract_options(block)]
+        scanned = [(opt.label, opt.text) for opt in parser._scan_options(block)]
+        if expected != scanned:
+            mismatches.append(block)
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Input sizes in characters')
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help='Allowed parse time growth relative to input growth per step')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the fastest counts')
+    parser.add_argument('--scanner-blocks', type=int, default=20000, help='Random blocks for the scanner comparison')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    sizes = sorted(args.sizes)
+    
+    print('Option regexes:')
+    failed = check_scaling(regex_parser(), sizes, args.max_growth, args.repeat, label='  ')
+    print('Linear scanner:')
+    failed += check_scaling(scanner_parser(), sizes, args.max_growth, args.repeat, label='  ')
+    mismatches = check_scanner(MCQParser(), args.scanner_blocks, args.seed)
+    print(f"Scanner matched the option regex on {args.scanner_blocks - len(mismatches)} "
+          f"of {args.scanner_blocks} random blocks")
+    for block in mismatches[:5]:
+        print(f"  mismatch: {block!r}")
+    
+    if failed or mismatches:
+        print(f"FAILED: {len(failed)} superlinear inputs, {len(mismatches)} scanner mismatches")
+        sys.exit(1)
+    print('All parser inputs scaled linearly')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Train the naive Bayes classifier backend from labeled JSON exports.
+
+Usage:
+    python tools/train_classifier.py outputs/mcq_export_*.json -o data/classifier_model.npz
+
+Questions without a subject, or classified as General, are skipped. Enable the
+model with CLASSIFIER_BACKEND=naive_bayes.
+"""
+
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.naive_bayes import NaiveBayesModel  # noqa: E402
+
+def load_examples(paths):
+    """Read (text, (subject, topic)) pairs from exported JSON files."""
+    examples = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            mcqs = json.load(f).get('mcqs', [])
+        for mcq in mcqs:
+            if not mcq.get('subject') or mcq['subject'] == 'General':
+                continue
+            options_text = ' '.join(opt['text'] for opt in mcq.get('options', []))
+            examples.append((f"{mcq['question_text']} {options_text}", (mcq['subject'], mcq.get('topic') or '')))
+    return examples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('exports', nargs='+', type=Path, help='JSON exports with subject/topic labels')
+    parser.add_argument('-o', '--output', type=Path, default=Path('data/classifier_model.npz'))
+    parser.add_argument('--alpha', type=float, default=1.0, help='Additive smoothing')
+    parser.add_argument('--min-count', type=int, default=2, help='Drop rarer features')
+    parser.add_argument('--max-features', type=int, default=50000)
+    parser.add_argument('--holdout', type=float, default=0.1, help='Share of questions held out for evaluation')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    examples = load_examples(args.exports)
+    if not examples:
+        parser.error('No labeled questions found in the exports')
+    
+    random.Random(args.seed).shuffle(examples)
+    held_out = int(len(examples) * args.holdout)
+    test, train = examples[:held_out], examples[held_out:]
+    
+    model = NaiveBayesModel.train(
+        [text for text, _ in train], [label for _, label in train],
+        alpha=args.alpha, min_count=args.min_count, max_features=args.max_features
+    )
+    
+    if test:
+        predictions = model.predict([text for text, _ in test])
+        correct = sum(1 for (label, _), (_, expected) in zip(predictions, test) if label == expected)
+        print(f"Held-out accuracy: {correct / len(test):.1%} on {len(test)} questions")
+    
+    # Retrain on everything before saving
+    if test:
+        model = NaiveBayesModel.train(
+            [text for text, _ in examples], [label for _, label in examples],
+            alpha=args.alpha, min_count=args.min_count, max_features=args.max_features
+        )
+    
+    model.save(args.output)
+    print(f"Saved {len(model.vocabulary)} features x {len(model.labels)} classes to {args.output} "
+          f"({args.output.stat().st_size / 1024:.0f} KB)")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file